@@ -114,3 +114,27 @@ CREATE TABLE Multas (
     data_pagamento DATE,
     FOREIGN KEY (emprestimo_id) REFERENCES Emprestimos(emprestimo_id)
 );
+
+-- Resumo do catálogo: uma linha por livro com autores, categoria e cópias disponíveis,
+-- mantida pela camada de serviços (catalog_summary.py) para as listas e buscas de livros
+CREATE TABLE catalogo_resumo (
+    livro_id INT PRIMARY KEY,
+    titulo VARCHAR(200) NOT NULL,
+    isbn VARCHAR(13),
+    ano_publicacao INT,
+    editora VARCHAR(100),
+    quantidade_copias INT DEFAULT 0,
+    localizacao_estante VARCHAR(50),
+    autores TEXT,
+    categoria VARCHAR(50),
+    autor_ids TEXT,
+    categoria_id INT
+);
+
+CREATE INDEX idx_catalogo_resumo_titulo ON catalogo_resumo (titulo);
+CREATE INDEX idx_catalogo_resumo_isbn ON catalogo_resumo (isbn);
+CREATE INDEX idx_catalogo_resumo_categoria ON catalogo_resumo (categoria_id);
+
+-- Índices de busca textual: títulos e editoras dos livros e nomes dos autores
+CREATE FULLTEXT INDEX ft_livros_titulo_editora ON Livros (titulo, editora);
+CREATE FULLTEXT INDEX ft_autores_nome ON Autores (nome);
@@ -1,10 +1,17 @@
-from db_utils import create_insert_query, insert_data, create_read_query, read_data
+import catalog_summary
+from db_utils import (
+    create_insert_query,
+    insert_data,
+    insert_many,
+    run_in_transaction,
+)
 from validate_utils import (
     validate_isbn,
     validate_year,
     validate_location,
-    check_author_exists,
+    find_missing_authors,
 )
+from reference_cache import invalidate_authors, invalidate_categories
 
 
 # Função para ler a entrada de dados da categoria, nome e descricao
@@ -19,6 +26,7 @@ def add_category(connection):
     query = create_insert_query("categorias", ["nome", "descricao"])
     values = read_category_data()
     insert_data(connection, query, values)
+    invalidate_categories()
 
 
 # Função para ler os dados de um autor, nome, nacionalidade
@@ -33,6 +41,7 @@ def add_author(connection):
     query = create_insert_query("autores", ["nome", "nacionalidade"])
     values = read_author_data()
     insert_data(connection, query, values)
+    invalidate_authors()
 
 
 # Função para ler os dados de um livro, título, isbn, ano_publicacao, editora, quantidade_copias, localizacao_estante
@@ -45,17 +54,21 @@ def read_book_data(connection):
 
     contador_autores = int(input("Quantidade de autores: ").strip())
     lista_autores = []
-    while contador_autores > 0:
+    while len(lista_autores) < contador_autores:
         if not (autor_id := input("Autor ID: ").strip()).isdigit() or len(autor_id) > 4:
             print(
                 "Autor ID inválida - tente novamente (digitos exatos sem 0 a esquerda)\n 1"
             )
             continue
-        if not check_author_exists(connection, int(autor_id)):
-            print("Autor ID inválido - tente novamente (autor não cadastrado)\n 1")
-            continue
         lista_autores.append(int(autor_id))
-        contador_autores -= 1
+
+        # Todos os autores informados são verificados com uma única consulta
+        if len(lista_autores) == contador_autores:
+            autores_ausentes = find_missing_authors(connection, lista_autores)
+            if autores_ausentes:
+                ausentes = ", ".join(str(a) for a in sorted(autores_ausentes))
+                print(f"Autor ID inválido - tente novamente (autor não cadastrado: {ausentes})\n 1")
+                lista_autores = [a for a in lista_autores if a not in autores_ausentes]
 
 
     titulo = input("Titulo: ").strip()
@@ -96,9 +109,8 @@ def read_book_data(connection):
     )
 
 
-# Função para adicionar um novo livro na tabela de livros, categoria_id, titulo, isbn, ano_publicacao, editora, quantidade_copias, localizacao_estante
-def add_book(connection):
-    # Adiciona livro no banco de dados
+# Função para inserir o livro e seus relacionamentos usando o livro_id gerado (lastrowid)
+def insert_book(connection, values):
     query = create_insert_query(
         "livros",
         [
@@ -110,22 +122,23 @@ def add_book(connection):
             "localizacao_estante",
         ],
     )
-    values = read_book_data(connection)
-    insert_data(connection, query, values[2:])
-
-    # Obtem o livro_id do livro adicionado
-    query = create_read_query("livros", ["livro_id"])
-    result = read_data(connection, query)
-    result.sort() # type: ignore
-    livro_id = result[-1][0] # type: ignore
+    livro_id = insert_data(connection, query, values[2:])
 
     # Preenche a tabela livroscategorias com o livro_id e a categoria_id
     query = create_insert_query("livroscategorias", ["livro_id", "categoria_id"])
     values_livroscategorias = (livro_id, values[0])
     insert_data(connection, query, values_livroscategorias)
 
-    # Preenche a tabela livrosautores com o livro_id e o autor_id
-    for autor_id in values[1]:
-        query = create_insert_query("livrosautores", ["livro_id", "autor_id"])
-        values_livrosautores = (livro_id, autor_id)
-        insert_data(connection, query, values_livrosautores)
+    # Preenche a tabela livrosautores com o livro_id e o autor_id em um único lote
+    query = create_insert_query("livrosautores", ["livro_id", "autor_id"])
+    values_livrosautores = [(livro_id, autor_id) for autor_id in values[1]]
+    insert_many(connection, query, values_livrosautores)
+    catalog_summary.refresh_books(connection, [livro_id])
+    return livro_id
+
+
+# Função para adicionar um novo livro na tabela de livros, categoria_id, titulo, isbn, ano_publicacao, editora, quantidade_copias, localizacao_estante
+def add_book(connection):
+    # Livro, categoria e autores gravados em uma única transação
+    values = read_book_data(connection)
+    return run_in_transaction(connection, insert_book, values)
@@ -0,0 +1,554 @@
+"""
+Servidor HTTP local com API JSON para os balcões de atendimento.
+
+Um único processo mantém o pool de conexões e o cache das tabelas de
+referência aquecidos; os clientes de cada balcão fazem requisições HTTP em vez
+de abrir as próprias conexões. O laço asyncio cuida apenas do protocolo: cada
+requisição roda as funções de services.py em uma thread de trabalho, com uma
+conexão emprestada do pool.
+
+Exemplo: python api_server.py --porta 8080 --backend sqlite --sqlite-path :memory:
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from urllib.parse import parse_qs, urlsplit
+from dotenv import load_dotenv
+from db_utils import (
+    POOL_SIZE,
+    Error,
+    IntegrityError,
+    close_connection_pool,
+    get_database_connection,
+    get_pool_stats,
+    get_transaction_stats,
+    release_database_connection,
+    use_backend,
+)
+from db_backends import DUPLICATE_ENTRY_ERRNO, MySQLBackend, SQLiteBackend
+import reference_cache
+import services
+from validate_utils import (
+    find_missing_ids,
+    validate_cep,
+    validate_email,
+    validate_phone,
+    validate_uf,
+)
+
+
+# Carrega variáveis de ambiente
+load_dotenv()
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+
+# Limite do corpo das requisições (bytes)
+MAX_BODY_SIZE = 1024 * 1024
+
+# Quantidade máxima de livros por página em GET /livros
+MAX_PAGE_SIZE = 500
+
+_STATUS_TEXT = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class ApiError(Exception):
+    """Erro de requisição, devolvido ao cliente com o status HTTP informado"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _rows(columns, rows):
+    return [dict(zip(columns, row)) for row in rows or []]
+
+
+def _require(body, *fields):
+    missing = [name for name in fields if body.get(name) in (None, "")]
+    if missing:
+        raise ApiError(400, f"Campos obrigatórios: {', '.join(missing)}")
+    return [body[name] for name in fields]
+
+
+# Função para ler campos obrigatórios de texto, sem os espaços das pontas
+def _require_text(body, *fields):
+    values = _require(body, *fields)
+    for name, value in zip(fields, values):
+        if not isinstance(value, str):
+            raise ApiError(400, f"{name} deve ser um texto")
+    return [value.strip() for value in values]
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+# Função para ler um campo obrigatório que deve ser uma lista não vazia de ids inteiros
+def _require_ids(body, field):
+    (ids,) = _require(body, field)
+    if not isinstance(ids, list) or not ids or not all(_is_id(value) for value in ids):
+        raise ApiError(400, f"{field} deve ser uma lista não vazia de ids inteiros")
+    return ids
+
+
+# Função para ler um campo opcional que, se informado, deve ser uma lista de ids inteiros
+def _optional_ids(body, field):
+    ids = body.get(field)
+    if ids is None:
+        return []
+    if not isinstance(ids, list) or not all(_is_id(value) for value in ids):
+        raise ApiError(400, f"{field} deve ser uma lista de ids inteiros")
+    return ids
+
+
+# Função para ler um parâmetro inteiro da query string, recusando valores abaixo de minimum
+def _query_int(query, name, default, minimum=1):
+    value = query.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ApiError(400, f"{name} deve ser um número inteiro")
+    if number < minimum:
+        raise ApiError(400, f"{name} deve ser no mínimo {minimum}")
+    return number
+
+
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(str(value))
+    except ValueError:
+        raise ApiError(400, f"Data inválida: {value}")
+
+
+# Rotas: cada função recebe (connection, params, query, body) e retorna (status, dados)
+def list_authors(connection, params, query, body):
+    return 200, [{"autor_id": row[0], "nome": row[1]} for row in reference_cache.get_authors(connection)]
+
+
+def list_categories(connection, params, query, body):
+    return 200, [
+        {"categoria_id": row[0], "nome": row[1]} for row in reference_cache.get_categories(connection)
+    ]
+
+
+def list_books(connection, params, query, body):
+    after_id = _query_int(query, "apos", 0, minimum=0)
+    limit = min(_query_int(query, "limite", 100), MAX_PAGE_SIZE)
+    return 200, _rows(services.BOOK_COLUMNS, services.list_books(connection, after_id, limit))
+
+
+def search_books(connection, params, query, body):
+    text = query.get("q", "").strip()
+    if not text:
+        raise ApiError(400, "Informe o texto da busca em q")
+    page = _query_int(query, "pagina", 1)
+    limit = min(_query_int(query, "limite", 20), MAX_PAGE_SIZE)
+    result = services.search_books(connection, text, ((page - 1) * limit,), limit)
+    return 200, {
+        "livros": _rows(services.BOOK_LIST_COLUMNS, result.rows),
+        "proxima_pagina": page + 1 if result.next_key else None,
+    }
+
+
+def get_book(connection, params, query, body):
+    book = services.get_book(connection, params["id"])
+    if book is None:
+        raise ApiError(404, "Livro não encontrado")
+    return 200, book
+
+
+# Função para validar ids pelo cache de referência. O cache é carregado uma vez por processo,
+# então os ids ausentes dele são conferidos no banco (registros criados pelo Tk ou por outro
+# processo) e, se algum existir, o cache é descartado para ser relido
+def _missing_references(connection, table, ids):
+    missing = table.missing(connection, ids)
+    if not missing:
+        return missing
+    confirmed = find_missing_ids(connection, table.table, table.id_column, missing)
+    if confirmed != missing:
+        table.invalidate()
+    return confirmed
+
+
+def create_book(connection, params, query, body):
+    fields = _require(
+        body, "titulo", "isbn", "ano_publicacao", "editora",
+        "quantidade_copias", "localizacao_estante",
+    )
+    autor_ids = tuple(_optional_ids(body, "autor_ids"))
+    categoria_id = body.get("categoria_id")
+    if categoria_id is not None and not _is_id(categoria_id):
+        raise ApiError(400, "categoria_id deve ser um id inteiro")
+    missing = _missing_references(connection, reference_cache.authors, autor_ids)
+    if missing:
+        raise ApiError(400, f"Autores inexistentes: {sorted(missing)}")
+    if categoria_id is not None and _missing_references(
+        connection, reference_cache.categories, (categoria_id,)
+    ):
+        raise ApiError(400, f"Categoria inexistente: {categoria_id}")
+
+    book = services.BookInput(
+        titulo=fields[0],
+        isbn=fields[1],
+        ano_publicacao=int(fields[2]),
+        editora=fields[3],
+        quantidade_copias=int(fields[4]),
+        localizacao_estante=fields[5],
+        autor_ids=autor_ids,
+        categoria_id=categoria_id,
+    )
+    return 201, {"livro_id": services.save_book(connection, book)}
+
+
+def books_for_reserve(connection, params, query, body):
+    return 200, _rows(services.RESERVE_BOOK_COLUMNS, services.books_for_reserve(connection))
+
+
+def get_user(connection, params, query, body):
+    user = services.get_user(connection, params["id"])
+    if user is None:
+        raise ApiError(404, "Usuário não encontrado")
+    return 200, user
+
+
+def create_user(connection, params, query, body):
+    nome, email, telefone = _require_text(body, "nome", "email", "telefone")
+    address = body.get("endereco")
+    if not isinstance(address, dict):
+        raise ApiError(400, "endereco deve ser um objeto com logradouro, cep, cidade e estado")
+    logradouro, cep, cidade, estado = _require_text(address, "logradouro", "cep", "cidade", "estado")
+    complemento = address.get("complemento") or ""
+    bairro = address.get("bairro") or ""
+    if not isinstance(complemento, str) or not isinstance(bairro, str):
+        raise ApiError(400, "complemento e bairro devem ser textos")
+
+    # As mesmas validações do formulário de cadastro (interface.py)
+    if not validate_email(email):
+        raise ApiError(400, "Email inválido!")
+    if not validate_phone(telefone):
+        raise ApiError(400, "Telefone inválido! Use formato: 11912345678")
+    if not validate_cep(cep):
+        raise ApiError(400, "CEP inválido!")
+    if not validate_uf(estado):
+        raise ApiError(400, "UF inválida!")
+
+    numero = address.get("numero")
+    if numero in (None, ""):
+        numero = None
+    elif _is_id(numero) or (isinstance(numero, str) and numero.strip().isdigit()):
+        numero = int(numero)
+    else:
+        raise ApiError(400, "numero deve ser um número inteiro")
+
+    user = services.UserInput(nome=nome, email=email, telefone=telefone)
+    address = services.AddressInput(
+        logradouro=logradouro,
+        numero=numero,
+        complemento=complemento,
+        bairro=bairro,
+        cep=cep,
+        cidade=cidade,
+        estado=estado,
+    )
+    return 201, {"usuario_id": services.create_user(connection, user, address)}
+
+
+def delete_user(connection, params, query, body):
+    result = services.delete_user(connection, params["id"])
+    if not result.removido:
+        raise ApiError(404 if result.mensagem == services.USER_NOT_FOUND else 409, result.mensagem)
+    return 200, {"usuario_id": result.usuario_id}
+
+
+def user_loans(connection, params, query, body):
+    if query.get("ativos") in ("1", "true"):
+        return 200, _rows(services.ACTIVE_LOAN_COLUMNS, services.active_loans(connection, params["id"]))
+    return 200, _rows(services.LOAN_COLUMNS, services.user_loans(connection, params["id"]))
+
+
+def user_fines(connection, params, query, body):
+    return 200, _rows(services.FINE_COLUMNS, services.user_fines(connection, params["id"]))
+
+
+def create_loan(connection, params, query, body):
+    livro_id, usuario_id, data_devolucao = _require(body, "livro_id", "usuario_id", "data_devolucao")
+    result = services.checkout(connection, livro_id, usuario_id, _parse_date(data_devolucao))
+    if not result.ok:
+        raise ApiError(404 if result.mensagem == services.BOOK_NOT_FOUND else 409, result.mensagem)
+    return 201, {"emprestimo_id": result.emprestimo_id}
+
+
+def create_basket_loan(connection, params, query, body):
+    livro_ids = _require_ids(body, "livro_ids")
+    usuario_id, data_devolucao = _require(body, "usuario_id", "data_devolucao")
+    results = services.checkout_many(connection, livro_ids, usuario_id, _parse_date(data_devolucao))
+    items = [
+        {
+            "livro_id": result.livro_id,
+            "ok": result.ok,
+            "mensagem": result.mensagem,
+            "emprestimo_id": result.emprestimo_id,
+        }
+        for result in results
+    ]
+    # 201 se ao menos um livro foi emprestado; cada item informa o próprio resultado
+    return (201 if any(result.ok for result in results) else 409), {"itens": items}
+
+
+def return_loan(connection, params, query, body):
+    result = services.return_loan(connection, params["id"])
+    if not result.devolvido:
+        raise ApiError(409, "Empréstimo inexistente ou já devolvido")
+    return 200, {
+        "emprestimo_id": result.emprestimo_id,
+        "dias_atraso": result.dias_atraso,
+        "multa": result.multa,
+    }
+
+
+def create_reservation(connection, params, query, body):
+    livro_id, usuario_id = _require(body, "livro_id", "usuario_id")
+    result = services.create_reservation(connection, livro_id, usuario_id)
+    if not result.ok:
+        raise ApiError(409, result.mensagem)
+    return 201, {"reserva_id": result.reserva_id, "mensagem": result.mensagem}
+
+
+def pay_fines(connection, params, query, body):
+    multa_ids = _require_ids(body, "multa_ids")
+    return 200, {"quitadas": services.pay_fines(connection, multa_ids)}
+
+
+def server_status(connection, params, query, body):
+    return 200, {
+        "pool": get_pool_stats(),
+        "transacoes": get_transaction_stats(),
+        "cache": reference_cache.get_reference_cache_stats(),
+    }
+
+
+ROUTES = [
+    ("GET", r"/status", server_status),
+    ("GET", r"/autores", list_authors),
+    ("GET", r"/categorias", list_categories),
+    ("GET", r"/livros", list_books),
+    ("POST", r"/livros", create_book),
+    ("GET", r"/livros/reserva", books_for_reserve),
+    ("GET", r"/livros/busca", search_books),
+    ("GET", r"/livros/(?P<id>\d+)", get_book),
+    ("POST", r"/usuarios", create_user),
+    ("GET", r"/usuarios/(?P<id>\d+)", get_user),
+    ("DELETE", r"/usuarios/(?P<id>\d+)", delete_user),
+    ("GET", r"/usuarios/(?P<id>\d+)/emprestimos", user_loans),
+    ("GET", r"/usuarios/(?P<id>\d+)/multas", user_fines),
+    ("POST", r"/emprestimos", create_loan),
+    ("POST", r"/emprestimos/cesta", create_basket_loan),
+    ("POST", r"/emprestimos/(?P<id>\d+)/devolucao", return_loan),
+    ("POST", r"/reservas", create_reservation),
+    ("POST", r"/multas/pagamento", pay_fines),
+]
+_COMPILED_ROUTES = [(method, re.compile(pattern + "$"), handler) for method, pattern, handler in ROUTES]
+
+
+def _match_route(method, path):
+    allowed = False
+    for route_method, pattern, handler in _COMPILED_ROUTES:
+        match = pattern.match(path)
+        if match:
+            if route_method == method:
+                return handler, match.groupdict()
+            allowed = True
+    raise ApiError(405 if allowed else 404, "Método não permitido" if allowed else "Rota não encontrada")
+
+
+# Função executada na thread de trabalho: empresta uma conexão do pool e chama a rota
+def _run_handler(handler, params, query, body):
+    connection = get_database_connection()
+    if not connection:
+        raise ApiError(503, "Banco de dados indisponível")
+    try:
+        return handler(connection, params, query, body)
+    finally:
+        release_database_connection(connection)
+
+
+class ApiServer:
+    """Servidor HTTP/1.1 (keep-alive) sobre asyncio, com as consultas em threads de trabalho"""
+
+    def __init__(self, host=API_HOST, port=API_PORT, max_workers=None):
+        self.host = host
+        self.port = port
+        # Uma thread por conexão do pool: mais threads apenas esperariam por conexões
+        self.workers = ThreadPoolExecutor(
+            max_workers=max_workers or POOL_SIZE, thread_name_prefix="api-db"
+        )
+        self.server = None
+
+    async def dispatch(self, method, target, body):
+        """Resolve a rota e executa a operação; retorna (status, dados)"""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            handler, params = _match_route(method, url.path.rstrip("/") or "/")
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.workers, _run_handler, handler, params, query, body
+            )
+        except ApiError as e:
+            return e.status, {"erro": e.message}
+        except (ValueError, TypeError, KeyError) as e:
+            return 400, {"erro": f"Requisição inválida: {e}"}
+        except IntegrityError as e:
+            # Erro do cliente (valor duplicado ou referência inexistente); a mensagem do
+            # banco fica só no log
+            print(f"Violação de integridade na API ({method} {url.path}): {e}")
+            if e.errno == DUPLICATE_ENTRY_ERRNO:
+                return 409, {"erro": "Registro já cadastrado com um destes valores"}
+            return 400, {"erro": "Dados inconsistentes: referência inexistente ou campo obrigatório ausente"}
+        except Error as e:
+            print(f"Erro de banco na API ({method} {url.path}): {e}")
+            return 500, {"erro": "Erro no banco de dados"}
+        except Exception as e:
+            # Qualquer outra falha ainda devolve uma resposta, em vez de derrubar a conexão
+            print(f"Erro inesperado na API ({method} {url.path}): {e!r}")
+            return 500, {"erro": "Erro interno do servidor"}
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.send(writer, 400, {"erro": "Linha de requisição inválida"}, False)
+                    break
+
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version.upper() == "HTTP/1.1"
+                )
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self.send(writer, 400, {"erro": "Content-Length inválido"}, False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self.send(writer, 413, {"erro": "Corpo da requisição muito grande"}, False)
+                    break
+
+                raw_body = await reader.readexactly(length) if length else b""
+                try:
+                    body = json.loads(raw_body) if raw_body else {}
+                    if not isinstance(body, dict):
+                        raise ValueError("o corpo deve ser um objeto JSON")
+                except ValueError as e:
+                    status, payload = 400, {"erro": f"JSON inválido: {e}"}
+                else:
+                    status, payload = await self.dispatch(method.upper(), target, body)
+
+                await self.send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, default=_json_default, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        # Porta 0 escolhe uma porta livre: guarda a porta real
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        print(f"API ouvindo em http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.workers.shutdown(wait=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON local da biblioteca.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--porta", type=int, default=API_PORT)
+    parser.add_argument("--backend", choices=["sqlite", "mysql"],
+                        help="banco usado (padrão: DB_BACKEND do .env)")
+    parser.add_argument("--sqlite-path", help="arquivo do banco SQLite (\":memory:\" para memória)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.backend == "mysql":
+        use_backend(MySQLBackend())
+    elif args.backend == "sqlite" or args.sqlite_path:
+        use_backend(SQLiteBackend(args.sqlite_path) if args.sqlite_path else SQLiteBackend())
+
+    server = ApiServer(args.host, args.porta)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nAPI encerrada")
+    finally:
+        server.close()
+        close_connection_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+import argparse
+import datetime
+import json
+import platform
+import random
+import sys
+import time
+from db_utils import (
+    get_database_connection,
+    read_data,
+    use_backend,
+    get_pool_stats,
+    get_statement_stats,
+    get_transaction_stats,
+)
+from db_backends import MySQLBackend, SQLiteBackend, get_backend
+from generate_data import ESCALAS, PALAVRAS, DatasetGenerator, clear_tables, populate
+from interface_books import BooksManagementInterface
+from interface_borrow import BorrowManagementInterface
+from interface_categories import CategoriesManagementInterface
+from read_update_delete_user import read_user, read_user_address, read_users_page, stream_users
+import services
+
+
+# Repetições de cada caso; as leituras completas de tabela rodam menos vezes
+REPETICOES = 20
+REPETICOES_LEITURA_COMPLETA = 3
+
+# Livros por empréstimo em cesta
+CESTA = 3
+
+# Aumento de p50 (fração) acima do qual um caso é considerado regressão
+TOLERANCIA = 0.20
+
+# Diferenças absolutas abaixo deste valor (ms) são ruído de medição, não regressão
+DIFERENCA_MINIMA_MS = 1.0
+
+
+class BenchmarkContext:
+    """Estado compartilhado pelos casos: conexão, telas (sem Tk) e ids sorteados"""
+
+    def __init__(self, connection, sizes, seed):
+        self.connection = connection
+        self.sizes = sizes
+        self.rng = random.Random(seed)
+        self.books = BooksManagementInterface(connection)
+        self.borrow = BorrowManagementInterface(connection)
+        self.categories = CategoriesManagementInterface(connection)
+        self.book_index = None
+        self.active_loans = None
+
+    def random_user(self):
+        return self.rng.randint(1, self.sizes["usuarios"])
+
+    def random_book(self):
+        return self.rng.randint(1, self.sizes["livros"])
+
+    def random_word(self):
+        return self.rng.choice(PALAVRAS).lower()
+
+
+def _count_batches(batches):
+    return sum(len(batch) for batch in batches)
+
+
+# Casos medidos: cada um executa o caminho de dados de uma tela e retorna a quantidade de linhas
+def case_load_users(ctx):
+    return _count_batches(stream_users(ctx.connection))
+
+
+def case_users_first_page(ctx):
+    return len(read_users_page(ctx.connection).rows)
+
+
+def case_fetch_books_from_database(ctx):
+    return _count_batches(ctx.books.query_books(ctx.connection))
+
+
+def case_books_first_page(ctx):
+    return len(ctx.books.query_books_page(ctx.connection).rows)
+
+
+def case_filter_books(ctx):
+    if ctx.book_index is None:
+        ctx.book_index = ctx.books.build_book_index(ctx.connection)
+    return len(ctx.book_index.search(ctx.random_word()))
+
+
+def case_search_books(ctx):
+    return len(services.search_books(ctx.connection, ctx.random_word()).rows)
+
+
+def case_fetch_user_fines(ctx):
+    return len(ctx.borrow.fetch_user_fines(ctx.connection, ctx.random_user()) or [])
+
+
+def case_user_fines_first_page(ctx):
+    return len(services.user_fines_page(ctx.connection, ctx.random_user()).rows)
+
+
+def case_fetch_books_for_reserve(ctx):
+    return len(ctx.borrow.fetch_books_for_reserve(ctx.connection) or [])
+
+
+def case_create_loan_entry(ctx):
+    return_date = datetime.date.today() + datetime.timedelta(days=14)
+    return int(services.checkout(ctx.connection, ctx.random_book(), ctx.random_user(), return_date).ok)
+
+
+def case_checkout_basket(ctx):
+    return_date = datetime.date.today() + datetime.timedelta(days=14)
+    books = [ctx.random_book() for _ in range(CESTA)]
+    results = services.checkout_many(ctx.connection, books, ctx.random_user(), return_date)
+    return sum(result.ok for result in results)
+
+
+def case_process_return(ctx):
+    if not ctx.active_loans:
+        query = """
+            SELECT emprestimo_id FROM emprestimos
+            WHERE status_emprestimo = 'Ativo'
+            ORDER BY emprestimo_id DESC
+        """
+        ctx.active_loans = [row[0] for row in read_data(ctx.connection, query) or []]
+    if not ctx.active_loans:
+        return 0
+    return int(services.return_loan(ctx.connection, ctx.active_loans.pop()).devolvido)
+
+
+def case_read_user(ctx):
+    return len(read_user(ctx.connection, usuario_id=ctx.random_user()) or [])
+
+
+def case_read_user_address(ctx):
+    return len(read_user_address(ctx.connection, usuario_id=ctx.random_user()) or [])
+
+
+def case_search_categories(ctx):
+    term = str(ctx.rng.randint(1, ctx.sizes["categorias"]))
+    return len(ctx.categories.search_categories_data(ctx.connection, term) or [])
+
+
+# (nome, função, leitura completa de tabela)
+CASOS = [
+    ("load_users", case_load_users, True),
+    ("users_first_page", case_users_first_page, False),
+    ("fetch_books_from_database", case_fetch_books_from_database, True),
+    ("books_first_page", case_books_first_page, False),
+    ("filter_books", case_filter_books, False),
+    ("search_books", case_search_books, False),
+    ("fetch_user_fines", case_fetch_user_fines, False),
+    ("user_fines_first_page", case_user_fines_first_page, False),
+    ("fetch_books_for_reserve", case_fetch_books_for_reserve, True),
+    ("create_loan_entry", case_create_loan_entry, False),
+    ("checkout_basket", case_checkout_basket, False),
+    ("process_return", case_process_return, False),
+    ("read_user", case_read_user, False),
+    ("read_user_address", case_read_user_address, False),
+    ("search_categories", case_search_categories, False),
+]
+
+
+def _percentile(ordered, fraction):
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Função para medir um caso: uma execução de aquecimento e depois as repetições
+def run_case(ctx, func, repetitions):
+    func(ctx)
+    latencies = []
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        case_start = time.perf_counter()
+        rows += func(ctx)
+        latencies.append((time.perf_counter() - case_start) * 1000)
+    total = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        "repeticoes": repetitions,
+        "linhas": rows,
+        "ops_s": round(repetitions / total, 2) if total else None,
+        "media_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(_percentile(ordered, 0.50), 3),
+        "p95_ms": round(_percentile(ordered, 0.95), 3),
+        "p99_ms": round(_percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+# Função para popular o banco na escala pedida e medir todos os casos
+def run_scale(scale, seed, repetitions, full_scan_repetitions, only=None):
+    sizes = ESCALAS[scale]
+    connection = get_database_connection()
+    if not connection:
+        raise RuntimeError("Não foi possível conectar ao banco de dados")
+
+    try:
+        print(f"\n== Escala {scale}: populando o banco ==")
+        clear_tables(connection)
+        populate(connection, DatasetGenerator(sizes, seed=seed))
+
+        ctx = BenchmarkContext(connection, sizes, seed)
+        results = {}
+        for name, func, full_scan in CASOS:
+            if only and name not in only:
+                continue
+            reps = full_scan_repetitions if full_scan else repetitions
+            results[name] = run_case(ctx, func, reps)
+            stats = results[name]
+            print(
+                f"{name:<28} p50={stats['p50_ms']:>9.2f}ms  p95={stats['p95_ms']:>9.2f}ms  "
+                f"{stats['ops_s']:>9.1f} ops/s"
+            )
+        return results
+    finally:
+        connection.close()
+
+
+# Função para comparar os resultados com um baseline salvo, retornando as regressões
+def compare_results(results, baseline, tolerance=TOLERANCIA, min_diff_ms=DIFERENCA_MINIMA_MS):
+    regressions = []
+    print("\n== Comparação com o baseline (p50) ==")
+    for scale, cases in results["resultados"].items():
+        base_cases = baseline.get("resultados", {}).get(scale, {})
+        for name, stats in cases.items():
+            base = base_cases.get(name)
+            if not base or not base["p50_ms"]:
+                continue
+            ratio = stats["p50_ms"] / base["p50_ms"]
+            marker = ""
+            if ratio > 1 + tolerance and stats["p50_ms"] - base["p50_ms"] >= min_diff_ms:
+                marker = "  << REGRESSÃO"
+                regressions.append((scale, name, ratio))
+            print(
+                f"{scale:<9} {name:<28} {base['p50_ms']:>9.2f}ms -> "
+                f"{stats['p50_ms']:>9.2f}ms  ({ratio:.2f}x){marker}"
+            )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mede latência e vazão dos caminhos de dados das telas, sem interface gráfica."
+    )
+    parser.add_argument("--escalas", nargs="+", choices=ESCALAS, default=["pequena"],
+                        help="escalas do conjunto de dados (padrão: pequena)")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite",
+                        help="banco usado (padrão: sqlite em memória)")
+    parser.add_argument("--sqlite-path", default=":memory:", help="arquivo do banco SQLite")
+    parser.add_argument("--permitir-limpar", action="store_true",
+                        help="confirma que o banco MySQL configurado pode ser apagado e repopulado")
+    parser.add_argument("--casos", nargs="+", choices=[name for name, _, _ in CASOS],
+                        help="medir apenas estes casos")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--repeticoes-leitura", type=int, default=REPETICOES_LEITURA_COMPLETA,
+                        help="repetições dos casos que leem a tabela inteira")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", default="benchmark_results.json",
+                        help="arquivo JSON com os resultados")
+    parser.add_argument("--baseline", help="arquivo JSON de um resultado anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="aumento de p50 aceito antes de acusar regressão (0.20 = 20%%)")
+    parser.add_argument("--diferenca-minima", type=float, default=DIFERENCA_MINIMA_MS,
+                        help="diferença de p50 (ms) abaixo da qual não há regressão")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.backend == "mysql":
+        if not args.permitir_limpar:
+            print("O benchmark apaga e repopula o banco: use --permitir-limpar com o MySQL")
+            return 2
+        use_backend(MySQLBackend())
+    else:
+        use_backend(SQLiteBackend(args.sqlite_path))
+
+    results = {
+        "meta": {
+            "data": datetime.datetime.now().isoformat(timespec="seconds"),
+            "backend": get_backend().name,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+        },
+        "resultados": {},
+    }
+    for scale in args.escalas:
+        results["resultados"][scale] = run_scale(
+            scale, args.seed, args.repeticoes, args.repeticoes_leitura, args.casos
+        )
+    results["meta"]["pool"] = get_pool_stats()
+    results["meta"]["statements"] = get_statement_stats()
+    results["meta"]["transacoes"] = get_transaction_stats()
+
+    with open(args.saida, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {args.saida}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare_results(
+            results, baseline, args.tolerancia, args.diferenca_minima
+        )
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima de {args.tolerancia:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Resumo do catálogo: a tabela catalogo_resumo guarda uma linha por livro com os
+nomes dos autores, a categoria e as cópias disponíveis, para que as listas e
+buscas de livros leiam uma única tabela em vez de juntar livros, autores e
+categorias (com GROUP_CONCAT e GROUP BY) a cada consulta.
+
+A tabela é mantida pela camada de serviços, na mesma transação de cada gravação
+de livros, autores, categorias e empréstimos. Depois de cargas feitas por fora
+(generate_data, scripts SQL, bancos criados antes da tabela) ela é reconstruída com:
+
+    python catalog_summary.py
+"""
+
+import argparse
+import functools
+import time
+from db_utils import (
+    delete_data,
+    get_database_connection,
+    insert_data,
+    read_data,
+    run_in_transaction,
+    update_data,
+)
+
+
+# Colunas do resumo: as da lista de livros (services.BOOK_LIST_COLUMNS) seguidas dos
+# ids de autores e categoria usados pelo formulário de atualização
+SUMMARY_COLUMNS = (
+    "livro_id", "titulo", "isbn", "ano_publicacao", "editora", "quantidade_copias",
+    "localizacao_estante", "autores", "categoria", "autor_ids", "categoria_id",
+)
+
+# Quantidade máxima de livro_ids em cada IN (...) de uma atualização
+REFRESH_CHUNK = 500
+
+# Linhas do resumo calculadas a partir das tabelas normalizadas; {where} filtra os livros.
+# Um livro em várias categorias fica com a de menor id: o nome vem da mesma categoria
+# escolhida, para que rename_category (por categoria_id) atualize as linhas certas.
+_SUMMARY_SOURCE = """
+    SELECT
+        s.livro_id,
+        s.titulo,
+        s.isbn,
+        s.ano_publicacao,
+        s.editora,
+        s.quantidade_copias,
+        s.localizacao_estante,
+        s.autores,
+        c.nome AS categoria,
+        s.autor_ids,
+        s.categoria_id
+    FROM (
+        SELECT
+            l.livro_id,
+            l.titulo,
+            l.isbn,
+            l.ano_publicacao,
+            l.editora,
+            l.quantidade_copias,
+            l.localizacao_estante,
+            GROUP_CONCAT(DISTINCT a.nome SEPARATOR ', ') AS autores,
+            GROUP_CONCAT(DISTINCT a.autor_id SEPARATOR ',') AS autor_ids,
+            MIN(lc.categoria_id) AS categoria_id
+        FROM livros l
+        LEFT JOIN livrosautores la ON l.livro_id = la.livro_id
+        LEFT JOIN autores a ON la.autor_id = a.autor_id
+        LEFT JOIN livroscategorias lc ON l.livro_id = lc.livro_id
+        WHERE {where}
+        GROUP BY
+            l.livro_id,
+            l.titulo,
+            l.isbn,
+            l.ano_publicacao,
+            l.editora,
+            l.quantidade_copias,
+            l.localizacao_estante
+    ) s
+    LEFT JOIN categorias c ON s.categoria_id = c.categoria_id
+"""
+_INSERT_SUMMARY = f"INSERT INTO catalogo_resumo ({', '.join(SUMMARY_COLUMNS)})"
+
+# Reconstrução completa da tabela (também usada ao criar o banco SQLite)
+REBUILD_STATEMENTS = [
+    "DELETE FROM catalogo_resumo",
+    _INSERT_SUMMARY + _SUMMARY_SOURCE.format(where="1 = 1"),
+]
+
+# Recalcula uma faixa de livro_id (preenchimento em lotes pelas migrações)
+REFRESH_RANGE_STATEMENTS = (
+    "DELETE FROM catalogo_resumo WHERE livro_id > %s AND livro_id <= %s",
+    _INSERT_SUMMARY + _SUMMARY_SOURCE.format(where="l.livro_id > %s AND l.livro_id <= %s"),
+)
+
+SYNC_COPIES_QUERY = """
+    UPDATE catalogo_resumo
+    SET quantidade_copias = (
+        SELECT quantidade_copias FROM livros WHERE livro_id = %s
+    )
+    WHERE livro_id = %s
+"""
+RENAME_CATEGORY_QUERY = """
+    UPDATE catalogo_resumo
+    SET categoria = %s
+    WHERE categoria_id = %s
+"""
+
+
+# Queries de atualização para n livros; o mesmo objeto de query é reaproveitado pelos cursores preparados
+@functools.lru_cache(maxsize=None)
+def _refresh_statements(size):
+    placeholders = ", ".join(["%s"] * size)
+    return (
+        f"DELETE FROM catalogo_resumo WHERE livro_id IN ({placeholders})",
+        _INSERT_SUMMARY + _SUMMARY_SOURCE.format(where=f"l.livro_id IN ({placeholders})"),
+    )
+
+
+# Query que copia o estoque de n livros para o resumo
+@functools.lru_cache(maxsize=None)
+def _sync_copies_statement(size):
+    placeholders = ", ".join(["%s"] * size)
+    return f"""
+        UPDATE catalogo_resumo
+        SET quantidade_copias = (
+            SELECT quantidade_copias FROM livros WHERE livros.livro_id = catalogo_resumo.livro_id
+        )
+        WHERE livro_id IN ({placeholders})
+    """
+
+
+# Função para recalcular as linhas do resumo dos livros informados (livros removidos saem do resumo)
+def refresh_books(connection, livro_ids):
+    livro_ids = sorted({int(livro_id) for livro_id in livro_ids})
+    for start in range(0, len(livro_ids), REFRESH_CHUNK):
+        chunk = livro_ids[start:start + REFRESH_CHUNK]
+        delete_query, insert_query = _refresh_statements(len(chunk))
+        delete_data(connection, delete_query, chunk)
+        insert_data(connection, insert_query, chunk)
+    return len(livro_ids)
+
+
+# Função para recalcular o resumo dos livros com livro_id na faixa (low, high]
+def refresh_range(connection, low, high):
+    delete_query, insert_query = REFRESH_RANGE_STATEMENTS
+    delete_data(connection, delete_query, (low, high))
+    insert_data(connection, insert_query, (low, high))
+
+
+# Função para atualizar as cópias disponíveis de um livro no resumo após um empréstimo ou devolução
+def sync_copies(connection, livro_id):
+    update_data(connection, SYNC_COPIES_QUERY, (livro_id, livro_id))
+
+
+# Função para atualizar as cópias disponíveis de vários livros no resumo (empréstimo em cesta)
+def sync_copies_many(connection, livro_ids):
+    livro_ids = sorted({int(livro_id) for livro_id in livro_ids})
+    for start in range(0, len(livro_ids), REFRESH_CHUNK):
+        chunk = livro_ids[start:start + REFRESH_CHUNK]
+        update_data(connection, _sync_copies_statement(len(chunk)), chunk)
+
+
+# Função para recalcular o resumo dos livros de um autor (após alterar o nome dele)
+def refresh_author(connection, autor_id):
+    rows = read_data(
+        connection, "SELECT livro_id FROM livrosautores WHERE autor_id = %s", (int(autor_id),)
+    ) or []
+    return refresh_books(connection, [row[0] for row in rows])
+
+
+# Função para trocar o nome de uma categoria em todos os livros dela no resumo
+def rename_category(connection, categoria_id, nome):
+    update_data(connection, RENAME_CATEGORY_QUERY, (nome, int(categoria_id)))
+
+
+def _rebuild(connection):
+    for statement in REBUILD_STATEMENTS:
+        update_data(connection, statement, None)
+    return read_data(connection, "SELECT COUNT(*) FROM catalogo_resumo")[0][0]
+
+
+# Função para reconstruir o resumo inteiro em uma transação, retornando o número de livros
+def rebuild(connection):
+    return run_in_transaction(connection, _rebuild)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Reconstrói a tabela catalogo_resumo a partir de livros, autores e categorias."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    parse_args(argv)
+    connection = get_database_connection()
+    if not connection:
+        return
+
+    try:
+        start = time.perf_counter()
+        total = rebuild(connection)
+        print(f"catalogo_resumo: {total} livros em {time.perf_counter() - start:.1f}s")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Teste de carga dos empréstimos: vários balcões (threads que emprestam uma
+conexão do pool a cada pedido) emprestando ao mesmo tempo poucos títulos disputados, com
+menos cópias do que pedidos. No final confere que nenhum estoque ficou
+negativo e que cada cópia baixada corresponde a exatamente um empréstimo.
+
+    python checkout_load.py                                   SQLite em arquivo temporário
+    python checkout_load.py --backend mysql --permitir-limpar banco MySQL do .env
+
+Retorna 1 se encontrar alguma inconsistência.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+import catalog_summary
+from db_backends import MySQLBackend, SQLiteBackend
+from db_utils import (
+    get_database_connection,
+    get_pool_stats,
+    get_transaction_stats,
+    read_data,
+    run_in_transaction,
+    update_data,
+    use_backend,
+)
+from generate_data import ESCALAS, DatasetGenerator, clear_tables, populate
+import services
+
+
+# Títulos disputados, cópias de cada um, balcões simultâneos e pedidos por balcão
+TITULOS = 5
+COPIAS = 20
+BALCOES = 16
+PEDIDOS = 25
+
+# Livros por pedido (com mais de um, os pedidos usam o empréstimo em cesta)
+CESTA = 1
+
+ERRO = "erro"
+
+
+# Função para deixar os títulos disputados com o mesmo número de cópias
+def _stock_titles(connection, livro_ids, copies):
+    def stock(connection):
+        for livro_id in livro_ids:
+            update_data(
+                connection,
+                "UPDATE livros SET quantidade_copias = %s WHERE livro_id = %s",
+                (copies, livro_id),
+            )
+        catalog_summary.refresh_books(connection, livro_ids)
+
+    run_in_transaction(connection, stock)
+
+
+def _last_loan_id(connection):
+    result = read_data(connection, "SELECT MAX(emprestimo_id) FROM emprestimos")
+    return (result[0][0] if result else None) or 0
+
+
+# Função para fazer um pedido: um empréstimo simples ou uma cesta de títulos distintos
+def _request(connection, rng, livro_ids, basket, usuario_id, return_date):
+    if basket == 1:
+        return [services.checkout(connection, rng.choice(livro_ids), usuario_id, return_date)]
+    books = rng.sample(livro_ids, min(basket, len(livro_ids)))
+    return services.checkout_many(connection, books, usuario_id, return_date)
+
+
+# Função de cada balcão: espera a largada e faz os pedidos em títulos sorteados,
+# emprestando uma conexão do pool a cada pedido, como a API
+def _desk(barrier, livro_ids, users, requests, basket, seed, outcomes, latencies, lock):
+    rng = random.Random(seed)
+    return_date = datetime.date.today() + datetime.timedelta(days=14)
+    local_outcomes = Counter()
+    local_latencies = []
+    try:
+        barrier.wait()
+        for _ in range(requests):
+            start = time.perf_counter()
+            connection = get_database_connection()
+            try:
+                results = _request(
+                    connection, rng, livro_ids, basket, rng.randint(1, users), return_date
+                )
+                for result in results:
+                    local_outcomes[(result.livro_id, result.ok)] += 1
+            except Exception as e:
+                print(f"Erro no pedido de empréstimo: {e}")
+                local_outcomes[(None, ERRO)] += 1
+            finally:
+                if connection:
+                    connection.close()
+            local_latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        with lock:
+            outcomes.update(local_outcomes)
+            latencies.extend(local_latencies)
+
+
+# Função para conferir estoque, empréstimos e resumo de cada título, retornando as inconsistências
+def verify(connection, livro_ids, copies, first_loan_id, outcomes):
+    problems = []
+    for livro_id in livro_ids:
+        stock = read_data(
+            connection, "SELECT quantidade_copias FROM livros WHERE livro_id = %s", (livro_id,)
+        )[0][0]
+        loans = read_data(
+            connection,
+            "SELECT COUNT(*) FROM emprestimos WHERE livro_id = %s AND emprestimo_id > %s",
+            (livro_id, first_loan_id),
+        )[0][0]
+        summary = read_data(
+            connection,
+            "SELECT quantidade_copias FROM catalogo_resumo WHERE livro_id = %s",
+            (livro_id,),
+        )[0][0]
+        granted = outcomes[(livro_id, True)]
+        print(
+            f"livro {livro_id:>6}: {granted:>4} emprestados, {outcomes[(livro_id, False)]:>4} "
+            f"indisponíveis, estoque {copies} -> {stock}"
+        )
+        if stock < 0:
+            problems.append(f"livro {livro_id}: estoque negativo ({stock})")
+        if copies - stock != loans or loans != granted:
+            problems.append(
+                f"livro {livro_id}: {copies - stock} cópias baixadas, {loans} empréstimos gravados, "
+                f"{granted} confirmados"
+            )
+        if summary != stock:
+            problems.append(f"livro {livro_id}: catalogo_resumo com {summary} cópias, livros com {stock}")
+    return problems
+
+
+def _percentile(ordered, fraction):
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(sizes, seed, titles, copies, desks, requests, basket=CESTA):
+    connection = get_database_connection()
+    if not connection:
+        raise RuntimeError("Não foi possível conectar ao banco de dados")
+
+    try:
+        clear_tables(connection)
+        populate(connection, DatasetGenerator(sizes, seed=seed))
+        livro_ids = list(range(1, min(titles, sizes["livros"]) + 1))
+        _stock_titles(connection, livro_ids, copies)
+        first_loan_id = _last_loan_id(connection)
+
+        outcomes = Counter()
+        latencies = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(desks)
+        threads = [
+            threading.Thread(
+                target=_desk,
+                args=(
+                    barrier, livro_ids, sizes["usuarios"], requests, basket,
+                    seed + n, outcomes, latencies, lock,
+                ),
+            )
+            for n in range(desks)
+        ]
+        print(
+            f"\n== {desks} balcões, {desks * requests} pedidos de {basket} livro(s) em "
+            f"{len(livro_ids)} títulos de {copies} cópias =="
+        )
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        total = time.perf_counter() - start
+
+        problems = verify(connection, livro_ids, copies, first_loan_id, outcomes)
+    finally:
+        connection.close()
+
+    ordered = sorted(latencies)
+    errors = sum(count for (_, kind), count in outcomes.items() if kind == ERRO)
+    print(
+        f"\n{len(latencies)} pedidos em {total:.2f}s ({len(latencies) / total:.1f} ops/s), "
+        f"p50={_percentile(ordered, 0.50):.2f}ms p95={_percentile(ordered, 0.95):.2f}ms "
+        f"max={ordered[-1]:.2f}ms, {errors} erros"
+    )
+    print(f"Transações: {get_transaction_stats()}")
+    print(f"Pool: {get_pool_stats()}")
+    if errors:
+        problems.append(f"{errors} pedidos terminaram em erro")
+    return problems
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Empréstimos simultâneos em títulos disputados, conferindo o estoque no final."
+    )
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite",
+                        help="banco usado (padrão: sqlite em arquivo temporário)")
+    parser.add_argument("--sqlite-path",
+                        help="arquivo do banco SQLite (padrão: arquivo temporário; o banco em "
+                             "memória não aceita escritas concorrentes)")
+    parser.add_argument("--permitir-limpar", action="store_true",
+                        help="confirma que o banco MySQL configurado pode ser apagado e repopulado")
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--titulos", type=int, default=TITULOS, help="títulos disputados")
+    parser.add_argument("--copias", type=int, default=COPIAS, help="cópias de cada título disputado")
+    parser.add_argument("--balcoes", type=int, default=BALCOES, help="threads emprestando ao mesmo tempo")
+    parser.add_argument("--pedidos", type=int, default=PEDIDOS, help="empréstimos pedidos por balcão")
+    parser.add_argument("--cesta", type=int, default=CESTA,
+                        help="livros por pedido (acima de 1 usa o empréstimo em cesta)")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.backend == "mysql":
+        if not args.permitir_limpar:
+            print("O teste de carga apaga e repopula o banco: use --permitir-limpar com o MySQL")
+            return 2
+        use_backend(MySQLBackend())
+    else:
+        path = args.sqlite_path or os.path.join(tempfile.mkdtemp(), "checkout_load.db")
+        use_backend(SQLiteBackend(path))
+
+    problems = run(
+        ESCALAS[args.escala], args.seed, args.titulos, args.copias, args.balcoes, args.pedidos,
+        args.cesta,
+    )
+    if problems:
+        print(f"\n{len(problems)} inconsistência(s):")
+        for problem in problems:
+            print(f"    - {problem}")
+        return 1
+    print("\nEstoque consistente: nenhuma cópia emprestada duas vezes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from db_utils import create_insert_query, insert_data, create_read_query, read_data
+from db_utils import create_insert_query, insert_data, run_in_transaction
 from validate_utils import validate_email, validate_phone, validate_cep, validate_uf
 import datetime
 
@@ -30,41 +30,34 @@ def read_user_full_address():
     return (logradouro, numero, complemento, bairro, cep, cidade, estado)
 
 
-# Função ler usuario_id da tabela usuarios e endereço_id da tabela endereco
-def get_usuario_id_endereco_id(connection):
-
-    query = create_read_query("usuarios", ["usuario_id"])
-    result = read_data(connection, query)
-    result.sort()
-    usuario_id = result[-1][0]
-    query = create_read_query("endereco", ["endereco_id"])
-    result = read_data(connection, query)
-    result.sort()
-    endereco_id = result[-1][0]
-    return (usuario_id, endereco_id)
+# Função para inserir usuário, endereço e relacionamento usando os ids gerados (lastrowid)
+def insert_user_with_address(connection, user_values, address_values):
+    query = create_insert_query(
+        "usuarios", ["nome", "email", "telefone", "data_cadastro"]
+    )
+    usuario_id = insert_data(connection, query, user_values)
 
+    query = create_insert_query(
+        "endereco", ["logradouro", "numero", "complemento", "bairro", "cep", "cidade", "estado"]
+    )
+    endereco_id = insert_data(connection, query, address_values)
 
-# Função tabela de relacionamento usuarioendereco
-def create_user_address(connection):
     query = create_insert_query(
         "usuarioendereco", ["usuario_id", "endereco_id"]
     )
-    values = get_usuario_id_endereco_id(connection)
-    insert_data(connection, query, values)
+    insert_data(connection, query, (usuario_id, endereco_id))
+    return usuario_id
+
 
+# Função para criar usuário com endereço em uma única transação
+def create_user_with_address(connection, user_values, address_values):
+    return run_in_transaction(
+        connection, insert_user_with_address, user_values, address_values
+    )
 
 
 # Função para criar novo usuário
 def create_user(connection):
-    query = create_insert_query(
-        "usuarios", ["nome", "email", "telefone", "data_cadastro"]
-    )
-    values = read_user_data()
-    insert_data(connection, query, values)
-
-    query = create_insert_query(
-        "endereco", ["logradouro", "numero", "complemento", "bairro", "cep", "cidade", "estado"]
-    )
-    values = read_user_full_address()
-    insert_data(connection, query, values)
-    create_user_address(connection)
\ No newline at end of file
+    user_values = read_user_data()
+    address_values = read_user_full_address()
+    create_user_with_address(connection, user_values, address_values)
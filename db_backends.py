@@ -0,0 +1,472 @@
+import datetime
+import functools
+import os
+import re
+import sqlite3
+import threading
+from decimal import Decimal
+from dotenv import load_dotenv
+
+try:
+    import mysql.connector
+    from mysql.connector import Error
+    from mysql.connector.errors import IntegrityError, PoolError
+except ImportError:  # Permite usar o backend SQLite sem o conector MySQL instalado
+    mysql = None
+
+    class Error(Exception):
+        """Erro de banco de dados (mesma assinatura do mysql.connector.Error)"""
+
+        def __init__(self, msg=None, errno=None, values=None, sqlstate=None):
+            super().__init__(msg)
+            self.msg = msg
+            self.errno = errno
+            self.sqlstate = sqlstate
+
+        def __str__(self):
+            if self.errno is not None:
+                return f"{self.errno}: {self.msg}"
+            return str(self.msg)
+
+    class IntegrityError(Error):
+        pass
+
+    class PoolError(Error):
+        pass
+
+
+# Carrega variáveis de ambiente
+load_dotenv()
+
+# Banco usado pela aplicação: "mysql" (padrão) ou "sqlite"
+BACKEND = os.getenv("DB_BACKEND", "mysql").lower()
+
+# Arquivo do banco SQLite; ":memory:" mantém o banco apenas na memória do processo
+SQLITE_PATH = os.getenv("DB_SQLITE_PATH", "biblioteca.db")
+
+# Script com o esquema MySQL, traduzido para SQLite na criação do banco
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "4 - Script SQL.sql")
+
+# Código de erro equivalente no MySQL para "banco bloqueado" no SQLite (espera de lock)
+_SQLITE_LOCK_ERRNO = 1205
+
+# Códigos de erro do MySQL para violações de integridade: valor duplicado em chave única,
+# coluna obrigatória nula e chave estrangeira sem o registro referenciado
+DUPLICATE_ENTRY_ERRNO = 1062
+NOT_NULL_ERRNO = 1048
+FOREIGN_KEY_ERRNO = 1452
+
+# Busca textual no SQLite, equivalente aos índices FULLTEXT do MySQL: uma tabela FTS5
+# com título, editora e nomes dos autores de cada livro (rowid = livro_id), mantida por triggers
+_SQLITE_AUTHORS_OF = """
+    COALESCE((
+        SELECT GROUP_CONCAT(a.nome, ' ')
+        FROM livrosautores la
+        JOIN autores a ON a.autor_id = la.autor_id
+        WHERE la.livro_id = {livro_id}
+    ), '')
+"""
+
+SQLITE_SEARCH_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS livros_busca USING fts5(
+        titulo, editora, autores, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS livros_busca_insert AFTER INSERT ON livros BEGIN
+        INSERT INTO livros_busca (rowid, titulo, editora, autores)
+        VALUES (new.livro_id, new.titulo, new.editora, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS livros_busca_update AFTER UPDATE OF titulo, editora ON livros BEGIN
+        UPDATE livros_busca SET titulo = new.titulo, editora = new.editora
+        WHERE rowid = new.livro_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS livros_busca_delete AFTER DELETE ON livros BEGIN
+        DELETE FROM livros_busca WHERE rowid = old.livro_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS livros_busca_autor_insert AFTER INSERT ON livrosautores BEGIN
+        UPDATE livros_busca SET autores = {_SQLITE_AUTHORS_OF.format(livro_id="new.livro_id")}
+        WHERE rowid = new.livro_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS livros_busca_autor_delete AFTER DELETE ON livrosautores BEGIN
+        UPDATE livros_busca SET autores = {_SQLITE_AUTHORS_OF.format(livro_id="old.livro_id")}
+        WHERE rowid = old.livro_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS livros_busca_autor_nome AFTER UPDATE OF nome ON autores BEGIN
+        UPDATE livros_busca SET autores = {_SQLITE_AUTHORS_OF.format(livro_id="livros_busca.rowid")}
+        WHERE rowid IN (SELECT livro_id FROM livrosautores WHERE autor_id = new.autor_id);
+    END
+    """,
+]
+
+# Preenche a tabela de busca com os livros já existentes (bancos criados antes dela)
+SQLITE_SEARCH_REBUILD = [
+    "DELETE FROM livros_busca",
+    f"""
+    INSERT INTO livros_busca (rowid, titulo, editora, autores)
+    SELECT l.livro_id, l.titulo, l.editora, {_SQLITE_AUTHORS_OF.format(livro_id="l.livro_id")}
+    FROM livros l
+    """,
+]
+
+_RE_GROUP_CONCAT = re.compile(
+    r"GROUP_CONCAT\(\s*(DISTINCT\s+)?(.+?)\s+SEPARATOR\s+('(?:[^']|'')*')\s*\)",
+    re.IGNORECASE | re.DOTALL,
+)
+_RE_LAST_INSERT_ID = re.compile(r"\bLAST_INSERT_ID\(\s*\)", re.IGNORECASE)
+_RE_NOW = re.compile(r"\bNOW\(\s*\)", re.IGNORECASE)
+_RE_CURDATE = re.compile(r"\bCURDATE\(\s*\)", re.IGNORECASE)
+
+
+class _GroupConcatDistinct:
+    """
+    Agregação group_concat_distinct(valor, separador) registrada nas conexões SQLite:
+    o GROUP_CONCAT do SQLite não aceita DISTINCT com separador próprio, e trocar as
+    vírgulas depois alteraria também as vírgulas dos próprios valores.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.seen = set()
+        self.separator = ","
+
+    def step(self, value, separator):
+        self.separator = separator
+        if value is not None and value not in self.seen:
+            self.seen.add(value)
+            self.values.append(str(value))
+
+    def finalize(self):
+        return self.separator.join(self.values) if self.values else None
+
+
+def _replace_group_concat(match):
+    distinct, expression, separator = match.groups()
+    if distinct:
+        return f"group_concat_distinct({expression}, {separator})"
+    return f"GROUP_CONCAT({expression}, {separator})"
+
+
+# Função para traduzir uma query escrita para o MySQL para o dialeto do SQLite
+@functools.lru_cache(maxsize=512)
+def translate_query(query):
+    translated = query.replace("%s", "?")
+    translated = _RE_GROUP_CONCAT.sub(_replace_group_concat, translated)
+    translated = _RE_LAST_INSERT_ID.sub("last_insert_rowid()", translated)
+    translated = _RE_NOW.sub("CURRENT_TIMESTAMP", translated)
+    return _RE_CURDATE.sub("CURRENT_DATE", translated)
+
+
+# Função para traduzir o script de criação do banco MySQL para comandos SQLite
+def translate_schema(script):
+    statements = []
+    script = re.sub(r"--[^\n]*", "", script)
+    for statement in script.split(";"):
+        statement = statement.strip()
+        if not statement or re.match(r"(CREATE\s+DATABASE|USE)\b", statement, re.IGNORECASE):
+            continue
+        if re.match(r"CREATE\s+FULLTEXT\s+INDEX\b", statement, re.IGNORECASE):
+            # No SQLite a busca textual usa a tabela FTS5 de SQLITE_SEARCH_SCHEMA
+            continue
+        statement = re.sub(
+            r"\bINT\s+PRIMARY\s+KEY\s+AUTO_INCREMENT\b",
+            "INTEGER PRIMARY KEY AUTOINCREMENT",
+            statement,
+            flags=re.IGNORECASE,
+        )
+        statement = re.sub(
+            r"^CREATE\s+TABLE\s+(?!IF\s+NOT\s+EXISTS)",
+            "CREATE TABLE IF NOT EXISTS ",
+            statement,
+            flags=re.IGNORECASE,
+        )
+        statement = re.sub(
+            r"^CREATE\s+(UNIQUE\s+)?INDEX\s+(?!IF\s+NOT\s+EXISTS)",
+            lambda m: f"CREATE {m.group(1) or ''}INDEX IF NOT EXISTS ",
+            statement,
+            flags=re.IGNORECASE,
+        )
+        statements.append(statement)
+    return statements
+
+
+def _convert_date(value):
+    # Colunas DATE recebem tanto "AAAA-MM-DD" quanto "AAAA-MM-DD HH:MM:SS";
+    # como no MySQL, só a data é mantida
+    return datetime.date.fromisoformat(value.decode()[:10])
+
+
+def _convert_datetime(value):
+    return datetime.datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_converter("TIMESTAMP", _convert_datetime)
+sqlite3.register_converter("DECIMAL", lambda value: Decimal(value.decode()))
+
+
+def _translate_error(error):
+    """Converte um erro do sqlite3 para o Error usado pelo restante da aplicação"""
+    errno = None
+    if getattr(error, "sqlite_errorcode", None) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED):
+        errno = _SQLITE_LOCK_ERRNO
+    elif "locked" in str(error):
+        errno = _SQLITE_LOCK_ERRNO
+    if isinstance(error, sqlite3.IntegrityError):
+        message = str(error)
+        if message.startswith("UNIQUE"):
+            errno = DUPLICATE_ENTRY_ERRNO
+        elif message.startswith("NOT NULL"):
+            errno = NOT_NULL_ERRNO
+        elif message.startswith("FOREIGN KEY"):
+            errno = FOREIGN_KEY_ERRNO
+        return IntegrityError(msg=message, errno=errno)
+    return Error(msg=str(error), errno=errno)
+
+
+class SQLiteCursor:
+    """Cursor SQLite com a mesma interface usada dos cursores do mysql.connector"""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    def execute(self, query, values=None):
+        try:
+            self._cursor.execute(translate_query(query), tuple(values or ()))
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def executemany(self, query, values):
+        try:
+            self._cursor.executemany(translate_query(query), [tuple(v) for v in values])
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Conexão SQLite com a interface usada do mysql.connector
+    (cursor, commit, rollback, start_transaction, in_transaction, is_connected...).
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._open = True
+
+    def cursor(self, dictionary=False, prepared=False, buffered=None):
+        # O SQLite já reaproveita os statements compilados e sempre lê sob demanda
+        return SQLiteCursor(self, dictionary=dictionary)
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def start_transaction(self):
+        if not self.raw.in_transaction:
+            self.raw.execute("BEGIN")
+
+    def commit(self):
+        try:
+            self.raw.commit()
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def consume_results(self):
+        pass
+
+    def interrupt(self):
+        """Interrompe a query em execução nesta conexão (chamado de outra thread)"""
+        self.raw.interrupt()
+
+    def is_connected(self):
+        return self._open
+
+    def close(self):
+        if self._open:
+            self._open = False
+            self.raw.close()
+
+
+class MySQLBackend:
+    """Servidor MySQL configurado pelas variáveis DB_HOST, DB_USER, DB_PASSWORD e DB_NAME"""
+
+    name = "mysql"
+
+    def connect(self, **options):
+        if mysql is None:
+            raise Error("mysql-connector-python não está instalado (use DB_BACKEND=sqlite)")
+        return mysql.connector.connect(
+            host=os.getenv("DB_HOST"),
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            database=os.getenv("DB_NAME"),
+            **options,
+        )
+
+
+class SQLiteBackend:
+    """
+    Banco SQLite local, em arquivo ou em memória.
+    O esquema é criado a partir do script MySQL na primeira conexão.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._schema_ready = False
+        self._keeper = None
+        self._lock = threading.Lock()
+
+    @property
+    def in_memory(self):
+        return self.path == ":memory:"
+
+    def _open(self):
+        if self.in_memory:
+            # Cache compartilhado: todas as conexões do pool enxergam o mesmo banco
+            target, uri = f"file:biblioteca_{id(self)}?mode=memory&cache=shared", True
+        else:
+            target, uri = self.path, False
+        raw = sqlite3.connect(
+            target,
+            uri=uri,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            timeout=30,
+        )
+        raw.execute("PRAGMA foreign_keys = ON")
+        raw.create_aggregate("group_concat_distinct", 2, _GroupConcatDistinct)
+        if not self.in_memory:
+            raw.execute("PRAGMA journal_mode = WAL")
+        return raw
+
+    def connect(self):
+        with self._lock:
+            if self.in_memory and self._keeper is None:
+                # O banco em memória existe enquanto houver uma conexão aberta
+                self._keeper = self._open()
+            if not self._schema_ready:
+                self.create_schema()
+        return SQLiteConnection(self._open())
+
+    def create_schema(self, schema_file=SCHEMA_FILE):
+        """Cria as tabelas traduzindo o script MySQL do projeto"""
+        with open(schema_file, encoding="utf-8") as file:
+            statements = translate_schema(file.read())
+        raw = self._keeper or self._open()
+        try:
+            summary_exists = raw.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'catalogo_resumo'"
+            ).fetchone()
+            for statement in statements:
+                raw.execute(statement)
+            if not summary_exists:
+                # Banco criado antes do resumo do catálogo: preenche com os livros existentes
+                from catalog_summary import REBUILD_STATEMENTS
+
+                for statement in REBUILD_STATEMENTS:
+                    raw.execute(translate_query(statement))
+            search_exists = raw.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'livros_busca'"
+            ).fetchone()
+            for statement in SQLITE_SEARCH_SCHEMA:
+                raw.execute(statement)
+            if not search_exists:
+                for statement in SQLITE_SEARCH_REBUILD:
+                    raw.execute(statement)
+            raw.commit()
+
+            # Mudanças de esquema posteriores ao script (migrations.py)
+            from migrations import migrate
+
+            migrate(SQLiteConnection(raw))
+        finally:
+            if raw is not self._keeper:
+                raw.close()
+        self._schema_ready = True
+
+    def close(self):
+        """Libera o banco em memória (as conexões abertas continuam válidas até o close)"""
+        with self._lock:
+            if self._keeper is not None:
+                self._keeper.close()
+                self._keeper = None
+                self._schema_ready = False
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+# Função para obter o backend configurado em DB_BACKEND
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = SQLiteBackend() if BACKEND == "sqlite" else MySQLBackend()
+        return _backend
+
+
+# Função para trocar o backend em uso (por exemplo, nos benchmarks)
+def set_backend(backend):
+    global _backend
+    with _backend_lock:
+        _backend = backend
+    return backend
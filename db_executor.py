@@ -0,0 +1,235 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from db_utils import get_database_connection, kill_query
+from query_metrics import caller_context
+
+
+# Intervalo (ms) entre as verificações da fila de resultados pela thread do Tk
+POLL_INTERVAL_MS = 50
+
+# Quantidade máxima de resultados processados por verificação, para não travar a interface
+MAX_RESULTS_PER_POLL = 20
+
+
+class DatabaseTask:
+    """
+    Tarefa submetida ao executor.
+    Permite cancelar a tarefa e acompanhar a conexão usada enquanto ela executa.
+    """
+
+    def __init__(self, func, widget=None):
+        self.name = getattr(func, "__qualname__", repr(func))
+        self.widget = widget
+        self.future = None
+        self.connection = None
+        self._cancelled = threading.Event()
+        # Impede que a conexão volte ao pool enquanto a query dela está sendo interrompida
+        self._connection_lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self, interrupt=False):
+        """
+        Cancela a tarefa; os callbacks de uma tarefa cancelada não são chamados.
+        Com interrupt=True, a query em execução também é interrompida no servidor
+        (KILL QUERY no MySQL), em uma thread separada para não travar a interface.
+        """
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+        if interrupt and self.connection is not None:
+            threading.Thread(
+                target=self._interrupt, name="db-kill", daemon=True
+            ).start()
+
+    def _interrupt(self):
+        with self._connection_lock:
+            if self.connection is not None:
+                kill_query(self.connection)
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def widget_alive(self):
+        if self.widget is None:
+            return True
+        try:
+            return bool(self.widget.winfo_exists())
+        except Exception:
+            return False
+
+
+class DatabaseExecutor:
+    """
+    Executa o acesso ao banco de dados fora da thread do Tk.
+    Cada tarefa recebe func(connection, *args) com uma conexão própria emprestada do pool.
+    Os resultados voltam para a interface por uma fila drenada com root.after,
+    então os callbacks sempre rodam na thread do Tk.
+    Sem root, as tarefas rodam imediatamente na thread atual (modo síncrono).
+    """
+
+    def __init__(self, root=None, max_workers=2, busy_callback=None):
+        self.root = root
+        self.busy_callback = busy_callback
+        self._results = queue.Queue()
+        self._pending = 0
+        self._closed = False
+        self._workers = None
+        if root is not None:
+            self._workers = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="db"
+            )
+            self.root.after(POLL_INTERVAL_MS, self._drain)
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def submit(self, func, *args, on_success=None, on_error=None, widget=None):
+        """Executa func(connection, *args) e entrega o retorno para on_success"""
+        task = DatabaseTask(func, widget)
+        callbacks = {"success": on_success, "error": on_error}
+        return self._start(task, self._run, func, args, callbacks)
+
+    def submit_stream(
+        self, func, *args, on_batch=None, on_success=None, on_error=None, widget=None
+    ):
+        """
+        Executa func(connection, *args), que deve retornar um iterável de lotes de linhas.
+        Cada lote é entregue a on_batch assim que chega; on_success é chamado no fim.
+        """
+        task = DatabaseTask(func, widget)
+        callbacks = {"batch": on_batch, "success": on_success, "error": on_error}
+        return self._start(task, self._run_stream, func, args, callbacks)
+
+    def shutdown(self):
+        """Encerra as threads de trabalho, cancelando as tarefas pendentes"""
+        self._closed = True
+        if self._workers is not None:
+            self._workers.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, task, runner, func, args, callbacks):
+        if self._workers is None:
+            # Modo síncrono: executa e despacha os callbacks imediatamente
+            try:
+                runner(task, func, args, callbacks)
+            except Exception as e:
+                self._dispatch(task, callbacks, "error", e)
+            return task
+
+        self._set_pending(1)
+        task.future = self._workers.submit(runner, task, func, args, callbacks)
+        task.future.add_done_callback(
+            lambda future: self._results.put((task, callbacks, "done", future))
+        )
+        return task
+
+    def _borrow_connection(self, task):
+        connection = get_database_connection()
+        if not connection:
+            raise ConnectionError("Não foi possível conectar ao banco de dados!")
+        with task._connection_lock:
+            task.connection = connection
+        return connection
+
+    def _release_connection(self, task):
+        with task._connection_lock:
+            connection, task.connection = task.connection, None
+        if connection:
+            connection.close()
+
+    def _run(self, task, func, args, callbacks):
+        if task.cancelled:
+            return
+        connection = self._borrow_connection(task)
+        try:
+            with caller_context(task.name):
+                result = func(connection, *args)
+        finally:
+            self._release_connection(task)
+        if self._workers is None:
+            self._dispatch(task, callbacks, "success", result)
+        return result
+
+    def _run_stream(self, task, func, args, callbacks):
+        if task.cancelled:
+            return
+        connection = self._borrow_connection(task)
+        try:
+            with caller_context(task.name):
+                batches = func(connection, *args)
+                try:
+                    for batch in batches:
+                        if task.cancelled:
+                            break
+                        if self._workers is None:
+                            self._dispatch(task, callbacks, "batch", batch)
+                        else:
+                            self._results.put((task, callbacks, "batch", batch))
+                finally:
+                    # Fecha o gerador para liberar o cursor antes de devolver a conexão
+                    close = getattr(batches, "close", None)
+                    if close:
+                        close()
+        finally:
+            self._release_connection(task)
+        if self._workers is None:
+            self._dispatch(task, callbacks, "success", None)
+
+    def _drain(self):
+        """Processa os resultados na thread do Tk"""
+        processed = 0
+        try:
+            while processed < MAX_RESULTS_PER_POLL:
+                task, callbacks, kind, payload = self._results.get_nowait()
+                processed += 1
+                if kind == "batch":
+                    self._dispatch(task, callbacks, "batch", payload)
+                    continue
+
+                # Tarefa concluída
+                self._set_pending(-1)
+                if payload.cancelled():
+                    continue
+                error = payload.exception()
+                if error is not None:
+                    self._dispatch(task, callbacks, "error", error)
+                else:
+                    self._dispatch(task, callbacks, "success", payload.result())
+        except queue.Empty:
+            pass
+
+        if not self._closed:
+            # Ainda há resultados na fila: volta logo, deixando o Tk processar eventos
+            delay = 1 if processed == MAX_RESULTS_PER_POLL else POLL_INTERVAL_MS
+            self.root.after(delay, self._drain)
+
+    def _dispatch(self, task, callbacks, kind, payload):
+        if task.cancelled:
+            return
+        if not task.widget_alive():
+            # A tela que pediu os dados foi fechada
+            task.cancel()
+            return
+        callback = callbacks.get(kind)
+        if callback is not None:
+            callback(payload)
+        elif kind == "error":
+            print(f"Erro na tarefa {task.name}: {payload}")
+
+    def _set_pending(self, delta):
+        was_busy = self.busy
+        self._pending += delta
+        if was_busy != self.busy:
+            self._show_busy(self.busy)
+
+    def _show_busy(self, busy):
+        try:
+            self.root.config(cursor="watch" if busy else "")
+        except Exception:
+            pass
+        if self.busy_callback is not None:
+            self.busy_callback(busy)
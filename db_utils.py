@@ -1,113 +1,726 @@
-import mysql.connector
-from mysql.connector import Error
 from dotenv import load_dotenv
 import os
+import random
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from itertools import islice
+import threading
+import time
+from query_metrics import find_caller, record_query, timed_query
+from db_backends import Error, IntegrityError, PoolError, get_backend, set_backend
 
 
 # Carrega variáveis de ambiente
 load_dotenv()
 
+# Configuração do pool de conexões
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+# Quantidade de linhas por lote nas operações em massa (um commit por lote)
+BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "500"))
+
+# Quantidade de linhas buscadas por vez nas leituras em streaming
+FETCH_SIZE = int(os.getenv("DB_FETCH_SIZE", "1000"))
+
+# Quantidade padrão de linhas por página nas listas (paginação por chave)
+PAGE_SIZE = int(os.getenv("DB_PAGE_SIZE", "200"))
+
+# Limites do cache de queries geradas e dos cursores preparados por conexão
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+PREPARED_CACHE_SIZE = int(os.getenv("DB_PREPARED_CACHE_SIZE", "64"))
+
+# Novas tentativas de uma transação interrompida por deadlock ou espera de lock
+TRANSACTION_RETRIES = int(os.getenv("DB_TRANSACTION_RETRIES", "3"))
+TRANSACTION_BACKOFF = float(os.getenv("DB_TRANSACTION_BACKOFF", "0.05"))
+
+# Códigos de erro do MySQL: deadlock (1213) e tempo de espera de lock esgotado (1205)
+RETRYABLE_ERRNOS = {1213, 1205}
+
+
+class StaleReadError(Error):
+    """O que a transação leu mudou antes da escrita; repeti-la do início relê os dados"""
+
+
+class _PoolSlot:
+    """Conexão física mantida pelo pool"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.last_used = time.monotonic()
+        # Cursores preparados reutilizados nesta conexão, indexados pela query
+        self.statements = OrderedDict()
+
+
+class PooledConnection:
+    """
+    Conexão emprestada do pool.
+    Repassa os atributos para a conexão real e devolve a conexão ao pool no close().
+    """
+
+    def __init__(self, pool, slot):
+        self._pool = pool
+        self._slot = slot
+
+    def __getattr__(self, name):
+        if self._slot is None:
+            raise Error("Conexão já devolvida ao pool")
+        return getattr(self._slot.connection, name)
+
+    @property
+    def prepared_statements(self):
+        if self._slot is None:
+            raise Error("Conexão já devolvida ao pool")
+        return self._slot.statements
+
+    def is_connected(self):
+        if self._slot is None:
+            return False
+        if not self._slot.connection.is_connected():
+            # Conexão perdida: devolve ao pool para ser descartada
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        """Devolve a conexão ao pool em vez de encerrá-la"""
+        if self._slot is not None:
+            slot, self._slot = self._slot, None
+            self._pool.checkin(slot)
+
+
+class ConnectionPool:
+    """
+    Pool de conexões com limite de tamanho e descarte de conexões ociosas.
+    As conexões são emprestadas com checkout() e devolvidas com checkin().
+    """
+
+    def __init__(
+        self,
+        connect,
+        max_size=POOL_SIZE,
+        idle_timeout=POOL_IDLE_TIMEOUT,
+        checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+    ):
+        self._connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self._idle = []
+        self._in_use = 0
+        self._lock = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "checkouts": 0,
+            "checkins": 0,
+            "reaped": 0,
+            "discarded": 0,
+            "waits": 0,
+            "timeouts": 0,
+        }
+
+    def checkout(self):
+        """Empresta uma conexão do pool, criando uma nova se houver espaço"""
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._lock:
+            self._reap_idle()
+            while True:
+                while self._idle:
+                    slot = self._idle.pop()
+                    if self._is_alive(slot):
+                        self._in_use += 1
+                        self._stats["reused"] += 1
+                        self._stats["checkouts"] += 1
+                        return PooledConnection(self, slot)
+                    self._close_slot(slot)
+                    self._stats["discarded"] += 1
+
+                if self._in_use < self.max_size:
+                    # Reserva a vaga; a conexão é criada fora do lock
+                    self._in_use += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolError("Pool de conexões esgotado")
+                self._stats["waits"] += 1
+                self._lock.wait(remaining)
+
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+        with self._lock:
+            self._stats["created"] += 1
+            self._stats["checkouts"] += 1
+        return PooledConnection(self, _PoolSlot(connection))
+
+    def checkin(self, slot):
+        """Devolve uma conexão ao pool"""
+        connection = slot.connection
+        try:
+            # Garantir que nenhuma transação pendente vaze para o próximo uso
+            if connection.is_connected() and getattr(connection, "in_transaction", False):
+                connection.rollback()
+            alive = connection.is_connected()
+        except Error:
+            alive = False
+
+        with self._lock:
+            self._in_use -= 1
+            self._stats["checkins"] += 1
+            if alive:
+                slot.last_used = time.monotonic()
+                self._idle.append(slot)
+            else:
+                self._close_slot(slot)
+                self._stats["discarded"] += 1
+            self._reap_idle()
+            self._lock.notify()
+
+    def reap_idle(self):
+        """Encerra as conexões ociosas há mais tempo que idle_timeout"""
+        with self._lock:
+            return self._reap_idle()
+
+    def _reap_idle(self):
+        now = time.monotonic()
+        expired = [s for s in self._idle if now - s.last_used > self.idle_timeout]
+        for slot in expired:
+            self._idle.remove(slot)
+            self._close_slot(slot)
+        self._stats["reaped"] += len(expired)
+        return len(expired)
+
+    def _is_alive(self, slot):
+        try:
+            return slot.connection.is_connected()
+        except Error:
+            return False
+
+    def _close_slot(self, slot):
+        slot.statements.clear()
+        try:
+            slot.connection.close()
+        except Error:
+            pass
+
+    def stats(self):
+        """Retorna as estatísticas de uso do pool"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                max_size=self.max_size,
+                in_use=self._in_use,
+                idle=len(self._idle),
+            )
+            return stats
+
+    def close_all(self):
+        """Encerra todas as conexões ociosas do pool"""
+        with self._lock:
+            while self._idle:
+                self._close_slot(self._idle.pop())
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _connect():
+    return get_backend().connect()
+
+
+# Função para obter o pool de conexões compartilhado
+def get_connection_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(_connect)
+        return _pool
+
+
+# Função para emprestar uma conexão do pool (devolvida com connection.close())
 def get_database_connection():
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME"),
-        )
+        connection = get_connection_pool().checkout()
         if connection.is_connected():
             # print("Conectado ao banco de dados MySQL")
             return connection
+        connection.close()
     except Error as e:
         print(f"Erro ao conectar ao banco de dados MySQL: {e}")
         return None
 
 
-# Função para inserir dados no banco de dados
-def insert_data(connection, query, values):
-    cursor = connection.cursor()
+# Função para devolver uma conexão ao pool
+def release_database_connection(connection):
+    if connection:
+        connection.close()
+
+
+# Função para interromper, a partir de outra thread, a query em execução em uma conexão
+def kill_query(connection):
+    if get_backend().name == "sqlite":
+        connection.interrupt()
+        return True
     try:
-        cursor.execute(query, values)
-        connection.commit()
-        print("Dados inseridos com sucesso")
+        thread_id = int(connection.connection_id)
+    except (AttributeError, TypeError, ValueError, Error):
+        return False
+
+    # Conexão avulsa, fora do pool: o KILL não pode ficar esperando uma conexão livre
+    killer = None
+    try:
+        killer = _connect()
+        cursor = killer.cursor()
+        cursor.execute(f"KILL QUERY {thread_id}")
+        cursor.close()
+        return True
     except Error as e:
-        print(f"Erro ao inserir dados no MySQL: {e}")
+        print(f"Erro ao interromper a query da conexão {thread_id}: {e}")
+        return False
     finally:
-        cursor.close()
+        if killer is not None:
+            killer.close()
 
 
-# Função para ler dados no banco de dados
-def read_data(connection, query):
-    cursor = connection.cursor()
+# Função para obter as estatísticas do pool de conexões
+def get_pool_stats():
+    return get_connection_pool().stats()
+
+
+# Função para encerrar todas as conexões do pool
+def close_connection_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+
+
+# Função para trocar o banco em uso (MySQL ou SQLite), descartando as conexões abertas
+def use_backend(backend):
+    close_connection_pool()
+    previous = get_backend()
+    if previous is not backend and hasattr(previous, "close"):
+        previous.close()
+    return set_backend(backend)
+
+
+# Cache das queries geradas pelas funções create_*_query
+_statement_cache = OrderedDict()
+_statement_stats = {
+    "hits": 0,
+    "misses": 0,
+    "prepared_hits": 0,
+    "prepared_misses": 0,
+}
+_statement_lock = threading.Lock()
+
+
+# Função auxiliar para memorizar a query gerada para um formato (tabela, colunas, condição)
+def _cached_statement(key, build):
+    with _statement_lock:
+        query = _statement_cache.get(key)
+        if query is not None:
+            _statement_cache.move_to_end(key)
+            _statement_stats["hits"] += 1
+            return query
+        _statement_stats["misses"] += 1
+
+    query = build()
+    with _statement_lock:
+        query = _statement_cache.setdefault(key, query)
+        if len(_statement_cache) > STATEMENT_CACHE_SIZE:
+            _statement_cache.popitem(last=False)
+    return query
+
+
+# Função auxiliar que fornece o cursor para executar a query.
+# Queries com parâmetros em conexões do pool usam um cursor preparado no servidor,
+# reutilizado enquanto a conexão viver; as demais usam um cursor comum.
+@contextmanager
+def _statement_cursor(connection, query, values):
+    statements = getattr(connection, "prepared_statements", None)
+    if values is None or statements is None:
+        cursor = connection.cursor()
+        try:
+            yield cursor, query
+        finally:
+            cursor.close()
+        return
+
+    entry = statements.get(query)
+    with _statement_lock:
+        _statement_stats["prepared_hits" if entry else "prepared_misses"] += 1
+    if entry is None:
+        # O cursor preparado só reaproveita o statement quando recebe o mesmo objeto de query
+        entry = (connection.cursor(prepared=True), query)
+        statements[query] = entry
+        if len(statements) > PREPARED_CACHE_SIZE:
+            _, (old_cursor, _) = statements.popitem(last=False)
+            old_cursor.close()
+    else:
+        statements.move_to_end(query)
+    yield entry
+
+
+# Função para obter as estatísticas do cache de queries e cursores preparados
+def get_statement_stats():
+    with _statement_lock:
+        stats = dict(_statement_stats)
+        stats["cached_queries"] = len(_statement_cache)
+        return stats
+
+
+# Profundidade das transações abertas com transaction(), por conexão
+_transaction_depth = {}
+_transaction_stats = {
+    "committed": 0,
+    "rolled_back": 0,
+    "retries": 0,
+    "failed": 0,
+}
+_transaction_lock = threading.Lock()
+
+
+# Função para verificar se a conexão está dentro de um bloco transaction()
+def in_transaction(connection):
+    return _transaction_depth.get(id(connection), 0) > 0
+
+
+# Função auxiliar que faz o commit, a menos que a conexão esteja em um bloco transaction()
+def _commit(connection):
+    if not in_transaction(connection):
+        connection.commit()
+
+
+def _count_transaction(key, amount=1):
+    with _transaction_lock:
+        _transaction_stats[key] += amount
+
+
+# Context manager que agrupa as escritas em uma única transação.
+# Dentro do bloco, insert_data/update_data/insert_many... não fazem commit e
+# propagam os erros; o commit acontece uma vez no fim e qualquer erro desfaz tudo.
+# Blocos aninhados participam da transação mais externa.
+@contextmanager
+def transaction(connection):
+    key = id(connection)
+    depth = _transaction_depth.get(key, 0)
+    _transaction_depth[key] = depth + 1
     try:
-        cursor.execute(query)
-        result = cursor.fetchall()
-        return result
-    except Error as e:
-        print(f"Erro ao ler dados no MySQL: {e}")
+        if depth:
+            yield connection
+            return
+
+        if connection.in_transaction:
+            # Encerra a transação implícita aberta por leituras anteriores
+            connection.commit()
+        connection.start_transaction()
+        try:
+            yield connection
+            connection.commit()
+            _count_transaction("committed")
+        except BaseException:
+            connection.rollback()
+            _count_transaction("rolled_back")
+            raise
     finally:
-        cursor.close()
+        if depth:
+            _transaction_depth[key] = depth
+        else:
+            del _transaction_depth[key]
 
 
-# Função para atualizar dados no banco de dados
-def update_data(connection, query, values):
-    cursor = connection.cursor()
+# Função para verificar se o erro é um deadlock, espera de lock ou leitura desatualizada que vale repetir
+def is_retryable_error(error):
+    return isinstance(error, StaleReadError) or getattr(error, "errno", None) in RETRYABLE_ERRNOS
+
+
+# Função para executar func(connection, *args) em uma transação, repetindo em caso de deadlock.
+# Um bloco with não pode ser reexecutado, por isso a repetição fica nesta função.
+def run_in_transaction(connection, func, *args, retries=None):
+    if in_transaction(connection):
+        # Já dentro de uma transação: quem a abriu decide sobre repetir
+        return func(connection, *args)
+
+    retries = TRANSACTION_RETRIES if retries is None else retries
+    attempt = 0
+    while True:
+        try:
+            with transaction(connection):
+                return func(connection, *args)
+        except Error as e:
+            if not is_retryable_error(e) or attempt >= retries:
+                _count_transaction("failed")
+                raise e
+            attempt += 1
+            _count_transaction("retries")
+            delay = TRANSACTION_BACKOFF * (2 ** (attempt - 1))
+            print(f"Transação interrompida, tentativa {attempt} de {retries}: {e}")
+            time.sleep(delay + random.uniform(0, delay))
+
+
+# Função para obter as estatísticas das transações (commits, rollbacks e repetições)
+def get_transaction_stats():
+    with _transaction_lock:
+        return dict(_transaction_stats)
+
+
+# Função para executar uma query em um cursor já aberto, registrando o tempo gasto
+def timed_execute(cursor, query, values=None):
+    with timed_query(query, values=values) as timer:
+        cursor.execute(query, values)
+        timer.rowcount = cursor.rowcount
+
+
+# Função para executar uma query várias vezes em um cursor já aberto, registrando o tempo gasto
+def timed_executemany(cursor, query, values):
+    with timed_query(query) as timer:
+        cursor.executemany(query, values)
+        timer.rowcount = cursor.rowcount
+
+
+# Função para inserir dados no banco de dados, retornando o id gerado (lastrowid)
+def insert_data(connection, query, values):
+    with _statement_cursor(connection, query, values) as (cursor, statement):
+        try:
+            timed_execute(cursor, statement, values)
+            _commit(connection)
+            print("Dados inseridos com sucesso")
+            return cursor.lastrowid
+        except Error as e:
+            print(f"Erro ao inserir dados no MySQL: {e}")
+            if in_transaction(connection):
+                raise e
+
+
+# Função para ler dados no banco de dados
+def read_data(connection, query, values=None):
+    with _statement_cursor(connection, query, values) as (cursor, statement):
+        try:
+            with timed_query(query, values=values) as timer:
+                cursor.execute(statement, values)
+                result = cursor.fetchall()
+                timer.rowcount = len(result)
+            return result
+        except Error as e:
+            print(f"Erro ao ler dados no MySQL: {e}")
+            # Dentro de uma transação o erro (deadlock, lock) precisa chegar a quem pode repeti-la
+            if in_transaction(connection):
+                raise e
+
+
+# Função para ler dados em lotes de fetchmany usando cursor não bufferizado
+def stream_batches(connection, query, values=None, batch_size=None):
+    cursor = connection.cursor(buffered=False)
+    exhausted = False
+    # Mede apenas o tempo gasto no banco, sem o processamento feito pelo consumidor
+    caller = find_caller()
+    elapsed = 0.0
+    rows = 0
     try:
+        start = time.perf_counter()
         cursor.execute(query, values)
-        connection.commit()
-        print("Dados atualizados com sucesso")
+        while batch := cursor.fetchmany(batch_size or FETCH_SIZE):
+            elapsed += time.perf_counter() - start
+            rows += len(batch)
+            yield batch
+            start = time.perf_counter()
+        elapsed += time.perf_counter() - start
+        exhausted = True
     except Error as e:
-        print(f"Erro ao atualizar dados no MySQL: {e}")
+        print(f"Erro ao ler dados no MySQL: {e}")
+        raise e
     finally:
+        record_query(query, elapsed * 1000, rows, caller, values)
+        if not exhausted:
+            # Leitura interrompida: descarta as linhas pendentes no servidor
+            try:
+                connection.consume_results()
+            except Error:
+                pass
         cursor.close()
 
 
+# Função para ler dados linha a linha sem carregar o resultado inteiro na memória
+def stream_data(connection, query, values=None, batch_size=None):
+    for batch in stream_batches(connection, query, values, batch_size):
+        yield from batch
+
+
+# Função para atualizar dados no banco de dados, retornando a quantidade de linhas alteradas
+def update_data(connection, query, values):
+    with _statement_cursor(connection, query, values) as (cursor, statement):
+        try:
+            timed_execute(cursor, statement, values)
+            _commit(connection)
+            print("Dados atualizados com sucesso")
+            return cursor.rowcount
+        except Error as e:
+            print(f"Erro ao atualizar dados no MySQL: {e}")
+            if in_transaction(connection):
+                raise e
+
+
 # Função para deletar dados no banco de dados
 def delete_data(connection, query, values):
+    with _statement_cursor(connection, query, values) as (cursor, statement):
+        try:
+            timed_execute(cursor, statement, values)
+            print("Dados deletados com sucesso")
+        except Error as e:
+            print(f"Erro ao deletar dados no MySQL: {e}")
+            raise e
+
+
+# Página de uma KeysetQuery: next_key é None na última página
+Page = namedtuple("Page", ["rows", "next_key"])
+
+
+class KeysetQuery:
+    """
+    Consulta paginada por chave (seek method): cada página continua a partir
+    da chave da última linha da página anterior (WHERE chave > %s ... LIMIT n),
+    então o custo de qualquer página é proporcional ao tamanho da página,
+    e não à posição dela na tabela como em LIMIT/OFFSET.
+
+    A query recebe o marcador {seek} no lugar da condição de paginação
+    (por exemplo "WHERE {seek}" ou "AND {seek}"), depois dos próprios
+    placeholders, e não deve ter ORDER BY nem LIMIT. key_columns deve
+    identificar as linhas de forma única; key_indexes indica a posição dessas
+    colunas em cada linha retornada.
+    """
+
+    def __init__(self, query, key_columns, key_indexes, descending=False):
+        self.key_indexes = tuple(key_indexes)
+        direction = " DESC" if descending else ""
+        order = " ORDER BY " + ", ".join(column + direction for column in key_columns)
+        if len(key_columns) == 1:
+            seek = f"{key_columns[0]} {'<' if descending else '>'} %s"
+        else:
+            placeholders = ", ".join(["%s"] * len(key_columns))
+            seek = (
+                f"({', '.join(key_columns)}) {'<' if descending else '>'} ({placeholders})"
+            )
+        # As duas versões são montadas uma única vez para reaproveitar os cursores preparados
+        query = query.strip().rstrip(";")
+        self.first_query = query.format(seek="1 = 1") + order + " LIMIT %s"
+        self.next_query = query.format(seek=seek) + order + " LIMIT %s"
+
+    def page(self, connection, after=None, limit=None, values=()):
+        """Lê a página que começa depois da chave after (None = primeira página)"""
+        limit = limit or PAGE_SIZE
+        # Uma linha a mais indica se existe página seguinte
+        if after is None:
+            rows = read_data(connection, self.first_query, (*values, limit + 1))
+        else:
+            rows = read_data(connection, self.next_query, (*values, *after, limit + 1))
+        rows = rows or []
+        if len(rows) <= limit:
+            return Page(rows, None)
+        rows = rows[:limit]
+        return Page(rows, tuple(rows[-1][i] for i in self.key_indexes))
+
+
+# Função auxiliar para dividir uma sequência de valores em lotes
+def _chunked(values, size):
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# Função auxiliar para executar uma query em lotes com executemany, um commit por lote
+def _execute_many(connection, query, values, chunk_size, action):
     cursor = connection.cursor()
+    total = 0
     try:
-        cursor.execute(query, values)
-        print("Dados deletados com sucesso")
+        for chunk in _chunked(values, chunk_size or BATCH_SIZE):
+            timed_executemany(cursor, query, chunk)
+            _commit(connection)
+            total += max(cursor.rowcount, 0)
+        print(f"Dados {action} com sucesso ({total} linhas)")
+        return total
     except Error as e:
-        print(f"Erro ao deletar dados no MySQL: {e}")
+        if not in_transaction(connection):
+            connection.rollback()
+        print(f"Erro ao executar operação em lote no MySQL: {e}")
         raise e
     finally:
         cursor.close()
 
+
+# Função para inserir várias linhas no banco de dados em lotes
+def insert_many(connection, query, values, chunk_size=None):
+    return _execute_many(connection, query, values, chunk_size, "inseridos")
+
+
+# Função para atualizar várias linhas no banco de dados em lotes
+def update_many(connection, query, values, chunk_size=None):
+    return _execute_many(connection, query, values, chunk_size, "atualizados")
+
+
+# Função para deletar várias linhas no banco de dados em lotes
+def delete_many(connection, query, values, chunk_size=None):
+    return _execute_many(connection, query, values, chunk_size, "deletados")
+
+
 # Função para criar query de inserção de dados
 def create_insert_query(table, columns):
-    query = f"INSERT INTO {table} ("
-    query += ", ".join(columns)
-    query += ") VALUES ("
-    query += ", ".join(["%s" for _ in columns])
-    query += ")"
+    columns = tuple(columns)
 
-    return query
+    def build():
+        query = f"INSERT INTO {table} ("
+        query += ", ".join(columns)
+        query += ") VALUES ("
+        query += ", ".join(["%s" for _ in columns])
+        query += ")"
+        return query
+
+    return _cached_statement(("insert", table, columns), build)
 
 
 # Função para criar query de leitura de dados
 def create_read_query(table, columns=None):
-    query = f"SELECT "
-    if columns:
-        query += ", ".join(columns)
-    else:
-        query += "*"
-    query += f" FROM {table}"
+    columns = tuple(columns) if columns else None
 
-    return query
+    def build():
+        query = f"SELECT "
+        if columns:
+            query += ", ".join(columns)
+        else:
+            query += "*"
+        query += f" FROM {table}"
+        return query
+
+    return _cached_statement(("select", table, columns), build)
 
 
 # Função para criar query de atualização de dados
+# A condição deve ser um template com %s (ex.: "usuario_id = %s") para aproveitar o cache
 def create_update_query(table, columns, condition):
-    query = f"UPDATE {table} SET "
-    query += ", ".join([f"{column} = %s" for column in columns])
-    query += f" WHERE {condition}"
+    columns = tuple(columns)
 
-    return query
+    def build():
+        query = f"UPDATE {table} SET "
+        query += ", ".join([f"{column} = %s" for column in columns])
+        query += f" WHERE {condition}"
+        return query
+
+    return _cached_statement(("update", table, columns, condition), build)
 
 
 # Função para criar query de deleção de dados
 def create_delete_query(table, condition):
-    query = f"DELETE FROM {table} WHERE {condition}"
-
-    return query
\ No newline at end of file
+    return _cached_statement(
+        ("delete", table, condition), lambda: f"DELETE FROM {table} WHERE {condition}"
+    )
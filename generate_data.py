@@ -0,0 +1,489 @@
+import argparse
+import csv
+import datetime
+import os
+import random
+import tempfile
+import time
+from bisect import bisect_left
+from itertools import accumulate
+from db_utils import (
+    get_database_connection,
+    create_insert_query,
+    insert_many,
+    read_data,
+    BATCH_SIZE,
+)
+from db_backends import get_backend
+import catalog_summary
+
+
+# Volumes pré-definidos; "producao" reproduz a escala da biblioteca em uso
+ESCALAS = {
+    "pequena": {
+        "categorias": 20,
+        "autores": 500,
+        "livros": 2_000,
+        "usuarios": 1_000,
+        "emprestimos": 10_000,
+        "reservas": 500,
+    },
+    "media": {
+        "categorias": 50,
+        "autores": 5_000,
+        "livros": 50_000,
+        "usuarios": 20_000,
+        "emprestimos": 200_000,
+        "reservas": 5_000,
+    },
+    "producao": {
+        "categorias": 99,
+        "autores": 50_000,
+        "livros": 500_000,
+        "usuarios": 200_000,
+        "emprestimos": 2_000_000,
+        "reservas": 50_000,
+    },
+}
+
+# Tabelas na ordem de carga (respeitando as chaves estrangeiras)
+TABELAS = [
+    "categorias",
+    "autores",
+    "livros",
+    "livrosautores",
+    "livroscategorias",
+    "usuarios",
+    "endereco",
+    "usuarioendereco",
+    "emprestimos",
+    "multas",
+    "reservas",
+]
+
+PRAZO_EMPRESTIMO_DIAS = 14
+VALOR_MULTA_DIA = 2.00
+
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Heitor",
+         "Isabela", "João", "Karina", "Lucas", "Marina", "Nicolas", "Olívia", "Pedro",
+         "Rafaela", "Samuel", "Tatiana", "Vinícius"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Santos", "Pereira", "Costa", "Almeida",
+              "Gomes", "Ribeiro", "Carvalho", "Martins", "Rocha", "Barbosa", "Teixeira"]
+PALAVRAS = ["Sombra", "Mar", "Cidade", "Memória", "Vento", "Jardim", "Segredo", "Noite",
+            "Caminho", "Fogo", "Tempo", "Silêncio", "Rio", "Estrela", "Ilha", "Casa",
+            "Guerra", "Sonho", "Pedra", "Luz"]
+NACIONALIDADES = ["Brasileira", "Portuguesa", "Argentina", "Americana", "Inglesa",
+                  "Francesa", "Italiana", "Russa", "Japonesa", "Alemã"]
+EDITORAS = ["Aurora", "Horizonte", "Atlas", "Veredas", "Norte", "Mirante", "Cais", "Trilha"]
+CIDADES = [("Goiânia", "GO"), ("São Paulo", "SP"), ("Rio de Janeiro", "RJ"),
+           ("Belo Horizonte", "MG"), ("Brasília", "DF"), ("Porto Alegre", "RS"),
+           ("Salvador", "BA"), ("Recife", "PE")]
+
+
+# Função auxiliar para calcular os pesos acumulados de uma distribuição de Zipf
+def _zipf_cum_weights(n, skew):
+    return list(accumulate(1 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+class SkewedSampler:
+    """
+    Sorteia ids de 1..n com popularidade desigual (Zipf com expoente skew).
+    Os ids mais populares são espalhados aleatoriamente, não concentrados nos primeiros ids.
+    """
+
+    def __init__(self, rng, first_id, n, skew):
+        self.rng = rng
+        self.cum_weights = _zipf_cum_weights(n, skew)
+        self.total = self.cum_weights[-1]
+        self.ids = list(range(first_id, first_id + n))
+        rng.shuffle(self.ids)
+
+    def sample(self):
+        index = bisect_left(self.cum_weights, self.rng.random() * self.total)
+        return self.ids[min(index, len(self.ids) - 1)]
+
+
+class DatasetGenerator:
+    """
+    Gera dados consistentes para todas as tabelas do esquema.
+    Cada tabela usa um gerador aleatório próprio derivado da semente,
+    então o mesmo seed sempre produz exatamente os mesmos dados.
+    """
+
+    def __init__(
+        self,
+        sizes,
+        seed=42,
+        popular_skew=0.8,
+        borrower_skew=0.6,
+        overdue_ratio=0.15,
+        zero_copies_ratio=0.05,
+        history_days=365,
+        reference_date=datetime.date(2024, 12, 1),
+        first_ids=None,
+    ):
+        self.sizes = sizes
+        self.seed = seed
+        self.popular_skew = popular_skew
+        self.borrower_skew = borrower_skew
+        self.overdue_ratio = overdue_ratio
+        self.zero_copies_ratio = zero_copies_ratio
+        self.history_days = history_days
+        self.reference_date = reference_date
+        # Primeiro id de cada tabela, para acrescentar dados a um banco já populado
+        self.first_ids = first_ids or {}
+
+    def _rng(self, table):
+        return random.Random(f"{self.seed}:{table}")
+
+    def _first(self, table):
+        return self.first_ids.get(table, 1)
+
+    def _ids(self, table):
+        first = self._first(table)
+        return range(first, first + self.sizes[table])
+
+    def _nome(self, rng):
+        return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+    def categorias(self):
+        for categoria_id in self._ids("categorias"):
+            yield (categoria_id, f"Categoria {categoria_id:02d}", f"Descrição da categoria {categoria_id}")
+
+    def autores(self):
+        rng = self._rng("autores")
+        for autor_id in self._ids("autores"):
+            yield (autor_id, self._nome(rng), rng.choice(NACIONALIDADES))
+
+    def _copies(self, rng):
+        if rng.random() < self.zero_copies_ratio:
+            return 0
+        return rng.randint(1, 10)
+
+    def livros(self):
+        rng = self._rng("livros")
+        for livro_id in self._ids("livros"):
+            titulo = " ".join(rng.sample(PALAVRAS, rng.randint(2, 4)))
+            letras = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3))
+            yield (
+                livro_id,
+                f"{titulo} {livro_id}",
+                f"978{livro_id:010d}",
+                rng.randint(1950, self.reference_date.year),
+                rng.choice(EDITORAS),
+                self._copies(rng),
+                f"{letras}{rng.randint(0, 99):02d}",
+            )
+
+    def livros_sem_copias(self):
+        """Ids dos livros gerados com quantidade zero (mesmo sorteio de livros())"""
+        return [livro[0] for livro in self.livros() if livro[5] == 0]
+
+    def livrosautores(self):
+        rng = self._rng("livrosautores")
+        autores = self._ids("autores")
+        for livro_id in self._ids("livros"):
+            quantidade = min(rng.choice([1, 1, 1, 2, 2, 3]), len(autores))
+            for autor_id in rng.sample(autores, quantidade):
+                yield (livro_id, autor_id)
+
+    def livroscategorias(self):
+        rng = self._rng("livroscategorias")
+        categorias = self._ids("categorias")
+        for livro_id in self._ids("livros"):
+            yield (livro_id, rng.choice(categorias))
+
+    def usuarios(self):
+        rng = self._rng("usuarios")
+        for usuario_id in self._ids("usuarios"):
+            cadastro = self.reference_date - datetime.timedelta(days=rng.randint(0, 5 * 365))
+            yield (
+                usuario_id,
+                self._nome(rng),
+                f"usuario{usuario_id}@exemplo.com",
+                f"62{rng.randint(900000000, 999999999)}",
+                cadastro,
+                "Ativo",
+            )
+
+    def endereco(self):
+        rng = self._rng("endereco")
+        for endereco_id in range(self._first("endereco"), self._first("endereco") + self.sizes["usuarios"]):
+            cidade, estado = rng.choice(CIDADES)
+            yield (
+                endereco_id,
+                f"Rua {rng.choice(PALAVRAS)}",
+                rng.randint(1, 9999),
+                "",
+                f"Setor {rng.choice(PALAVRAS)}",
+                cidade,
+                estado,
+                rng.randint(10000000, 99999999),
+            )
+
+    def usuarioendereco(self):
+        offset = self._first("endereco") - self._first("usuarios")
+        for usuario_id in self._ids("usuarios"):
+            yield (usuario_id, usuario_id + offset)
+
+    def _loans(self):
+        """Gera (emprestimo, multa ou None); usado por emprestimos() e multas()"""
+        rng = self._rng("emprestimos")
+        books = SkewedSampler(rng, self._first("livros"), self.sizes["livros"], self.popular_skew)
+        users = SkewedSampler(rng, self._first("usuarios"), self.sizes["usuarios"], self.borrower_skew)
+        prazo = datetime.timedelta(days=PRAZO_EMPRESTIMO_DIAS)
+
+        for emprestimo_id in self._ids("emprestimos"):
+            data_emprestimo = self.reference_date - datetime.timedelta(
+                days=rng.randint(0, self.history_days)
+            )
+            data_prevista = data_emprestimo + prazo
+            data_real = None
+            status = "Devolvido"
+            multa = None
+
+            if rng.random() < self.overdue_ratio:
+                atraso = rng.randint(1, 60)
+                data_real = data_prevista + datetime.timedelta(days=atraso)
+                if data_real > self.reference_date:
+                    # Ainda não devolvido: em atraso, a multa é gerada na devolução
+                    data_real, status = None, "Ativo"
+                else:
+                    quitada = rng.random() < 0.7
+                    multa = (
+                        emprestimo_id,
+                        round(VALOR_MULTA_DIA * atraso, 2),
+                        "Quitado" if quitada else "Devendo",
+                        data_real,
+                        data_real + datetime.timedelta(days=rng.randint(0, 30)) if quitada else None,
+                    )
+            elif data_prevista > self.reference_date and rng.random() < 0.8:
+                status = "Ativo"
+            else:
+                data_real = data_emprestimo + datetime.timedelta(
+                    days=rng.randint(1, PRAZO_EMPRESTIMO_DIAS)
+                )
+                data_real = min(data_real, self.reference_date)
+
+            emprestimo = (
+                emprestimo_id,
+                books.sample(),
+                users.sample(),
+                data_emprestimo,
+                data_prevista,
+                data_real,
+                status,
+            )
+            yield emprestimo, multa
+
+    def emprestimos(self):
+        for emprestimo, _ in self._loans():
+            yield emprestimo
+
+    def multas(self):
+        multa_id = self._first("multas")
+        for _, multa in self._loans():
+            if multa is not None:
+                yield (multa_id,) + multa
+                multa_id += 1
+
+    def reservas(self):
+        rng = self._rng("reservas")
+        livros = self.livros_sem_copias() or list(self._ids("livros"))
+        users = SkewedSampler(rng, self._first("usuarios"), self.sizes["usuarios"], self.borrower_skew)
+        for reserva_id in self._ids("reservas"):
+            yield (
+                reserva_id,
+                rng.choice(livros),
+                users.sample(),
+                self.reference_date - datetime.timedelta(days=rng.randint(0, 30)),
+                "Pendente",
+            )
+
+
+# Colunas de cada tabela, na ordem das tuplas geradas
+COLUNAS = {
+    "categorias": ["categoria_id", "nome", "descricao"],
+    "autores": ["autor_id", "nome", "nacionalidade"],
+    "livros": ["livro_id", "titulo", "isbn", "ano_publicacao", "editora",
+               "quantidade_copias", "localizacao_estante"],
+    "livrosautores": ["livro_id", "autor_id"],
+    "livroscategorias": ["livro_id", "categoria_id"],
+    "usuarios": ["usuario_id", "nome", "email", "telefone", "data_cadastro", "status_usuario"],
+    "endereco": ["endereco_id", "logradouro", "numero", "complemento", "bairro",
+                 "cidade", "estado", "cep"],
+    "usuarioendereco": ["usuario_id", "endereco_id"],
+    "emprestimos": ["emprestimo_id", "livro_id", "usuario_id", "data_emprestimo",
+                    "data_devolucao_prevista", "data_devolucao_real", "status_emprestimo"],
+    "multas": ["multa_id", "emprestimo_id", "valor", "status_multas", "data_geracao",
+               "data_pagamento"],
+    "reservas": ["reserva_id", "livro_id", "usuario_id", "data_reserva", "status_reservas"],
+}
+
+# Coluna de id de cada tabela com chave própria (usada para continuar a numeração)
+COLUNAS_ID = {
+    "categorias": "categoria_id",
+    "autores": "autor_id",
+    "livros": "livro_id",
+    "usuarios": "usuario_id",
+    "endereco": "endereco_id",
+    "emprestimos": "emprestimo_id",
+    "multas": "multa_id",
+    "reservas": "reserva_id",
+}
+
+
+# Função para descobrir o próximo id livre de cada tabela, para acrescentar dados sem conflito
+def find_first_ids(connection):
+    first_ids = {}
+    for table, column in COLUNAS_ID.items():
+        result = read_data(connection, f"SELECT MAX({column}) FROM {table}")
+        first_ids[table] = (result[0][0] or 0) + 1 if result else 1
+    return first_ids
+
+
+# Função para apagar os dados de todas as tabelas (na ordem inversa das chaves estrangeiras)
+def clear_tables(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("DELETE FROM catalogo_resumo")
+        for table in reversed(TABELAS):
+            cursor.execute(f"DELETE FROM {table}")
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+# Função para carregar as linhas de uma tabela com executemany em lotes
+def load_table(connection, table, rows, chunk_size=None):
+    query = create_insert_query(table, COLUNAS[table])
+    return insert_many(connection, query, rows, chunk_size)
+
+
+# Função para carregar as linhas de uma tabela com LOAD DATA LOCAL INFILE (somente MySQL)
+def load_table_infile(connection, table, rows):
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=f"_{table}.csv", delete=False, newline="", encoding="utf-8"
+    ) as file:
+        writer = csv.writer(file, lineterminator="\n")
+        for row in rows:
+            writer.writerow(["\\N" if value is None else value for value in row])
+        path = file.name
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            f"LINES TERMINATED BY '\\n' ({', '.join(COLUNAS[table])})",
+            (path,),
+        )
+        connection.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+        os.remove(path)
+
+
+# Função para gerar e carregar o conjunto de dados completo
+def populate(connection, generator, use_infile=False, chunk_size=None):
+    mysql_backend = get_backend().name == "mysql"
+    if mysql_backend:
+        # Os dados já são consistentes: dispensa as verificações durante a carga
+        cursor = connection.cursor()
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        cursor.execute("SET UNIQUE_CHECKS = 0")
+        cursor.close()
+
+    totals = {}
+    try:
+        for table in TABELAS:
+            start = time.perf_counter()
+            rows = getattr(generator, table)()
+            if use_infile:
+                totals[table] = load_table_infile(connection, table, rows)
+            else:
+                totals[table] = load_table(connection, table, rows, chunk_size)
+            elapsed = time.perf_counter() - start
+            print(f"{table:<18} {totals[table]:>10} linhas em {elapsed:.1f}s")
+
+        # A carga não passa pela camada de serviços: o resumo do catálogo é refeito no final
+        start = time.perf_counter()
+        summary_total = catalog_summary.rebuild(connection)
+        print(f"{'catalogo_resumo':<18} {summary_total:>10} linhas em {time.perf_counter() - start:.1f}s")
+    finally:
+        if mysql_backend:
+            cursor = connection.cursor()
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+            cursor.execute("SET UNIQUE_CHECKS = 1")
+            cursor.close()
+    return totals
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Gera dados sintéticos consistentes para o banco da biblioteca."
+    )
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena",
+                        help="volumes pré-definidos (padrão: pequena)")
+    for table in ("categorias", "autores", "livros", "usuarios", "emprestimos", "reservas"):
+        parser.add_argument(f"--{table}", type=int, help=f"quantidade de {table}")
+    parser.add_argument("--seed", type=int, default=42, help="semente (mesma semente, mesmos dados)")
+    parser.add_argument("--popularidade", type=float, default=0.8,
+                        help="expoente de Zipf dos títulos mais emprestados")
+    parser.add_argument("--leitores-frequentes", type=float, default=0.6,
+                        help="expoente de Zipf dos usuários que mais pegam livros")
+    parser.add_argument("--taxa-atraso", type=float, default=0.15,
+                        help="fração dos empréstimos devolvidos (ou ainda ativos) com atraso")
+    parser.add_argument("--sem-copias", type=float, default=0.05,
+                        help="fração dos livros sem cópias disponíveis")
+    parser.add_argument("--data-referencia", type=datetime.date.fromisoformat,
+                        default=datetime.date(2024, 12, 1),
+                        help="data considerada como 'hoje' nos dados gerados (AAAA-MM-DD)")
+    parser.add_argument("--lote", type=int, default=BATCH_SIZE, help="linhas por lote do executemany")
+    parser.add_argument("--load-data", action="store_true",
+                        help="carregar com LOAD DATA LOCAL INFILE (somente MySQL)")
+    parser.add_argument("--limpar", action="store_true",
+                        help="apagar os dados existentes antes da carga")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = dict(ESCALAS[args.escala])
+    for table in sizes:
+        if getattr(args, table) is not None:
+            sizes[table] = getattr(args, table)
+
+    if args.load_data:
+        if get_backend().name != "mysql":
+            print("LOAD DATA LOCAL INFILE só está disponível no MySQL")
+            return
+        connection = get_backend().connect(allow_local_infile=True)
+    else:
+        connection = get_database_connection()
+    if not connection:
+        return
+
+    try:
+        if args.limpar:
+            clear_tables(connection)
+        generator = DatasetGenerator(
+            sizes,
+            seed=args.seed,
+            popular_skew=args.popularidade,
+            borrower_skew=args.leitores_frequentes,
+            overdue_ratio=args.taxa_atraso,
+            zero_copies_ratio=args.sem_copias,
+            reference_date=args.data_referencia,
+            first_ids=find_first_ids(connection),
+        )
+        start = time.perf_counter()
+        totals = populate(connection, generator, args.load_data, args.lote)
+        print(f"Total: {sum(totals.values())} linhas em {time.perf_counter() - start:.1f}s")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Consultor de índices: executa os caminhos de dados das telas (os casos do
+benchmark.py), guarda um exemplo de cada formato de query emitido pela
+aplicação e roda EXPLAIN sobre ele, apontando leituras completas de tabela,
+ordenações sem índice (filesort) e tabelas temporárias.
+
+    python index_advisor.py                     SQLite em memória com dados sintéticos
+    python index_advisor.py --backend mysql     banco MySQL do .env, com os dados existentes
+
+Cada caso roda dentro de uma transação desfeita no final, então o banco não é
+alterado. Os índices que resolvem os problemas apontados são criados pelas
+migrações (migrations.py).
+"""
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from db_backends import MySQLBackend, SQLiteBackend
+from db_utils import get_database_connection, read_data, transaction, use_backend
+from generate_data import ESCALAS, DatasetGenerator, populate
+from migrations import backend_name
+from query_metrics import capture_queries, normalize_query
+
+
+# Apenas consultas com plano de execução são analisadas
+_RE_EXPLAINABLE = re.compile(r"^\s*(SELECT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+# Consultas sem filtro (ou com "WHERE 1 = 1") leem a tabela inteira de propósito
+_RE_FILTER = re.compile(r"\bWHERE\s+(?!1\s*=\s*1\s*(ORDER|GROUP|LIMIT|$))", re.IGNORECASE)
+_RE_SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+_RE_SQLITE_SUBQUERY = re.compile(r"^(MATERIALIZE|CO-ROUTINE) (\w+)")
+
+FULL_SCAN = "leitura completa"
+FILESORT = "ordenação sem índice (filesort)"
+TEMPORARY = "tabela temporária"
+
+
+@dataclass(frozen=True)
+class Finding:
+    """Problema encontrado no plano de execução de uma query"""
+
+    kind: str
+    table: str
+    detail: str
+
+
+class _Rollback(Exception):
+    """Desfaz a transação de um caso do consultor"""
+
+
+# Função para obter o plano de execução de uma query com os valores informados
+def explain(connection, query, values=None):
+    prefix = "EXPLAIN QUERY PLAN " if backend_name(connection) == "sqlite" else "EXPLAIN "
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(prefix + query, tuple(values) if values is not None else None)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _mysql_findings(plan):
+    findings = []
+    for row in plan:
+        table = row.get("table") or ""
+        extra = row.get("Extra") or ""
+        if row.get("type") == "ALL":
+            findings.append(Finding(FULL_SCAN, table, f"type=ALL rows={row.get('rows')}"))
+        if "Using filesort" in extra:
+            findings.append(Finding(FILESORT, table, extra))
+        if "Using temporary" in extra:
+            findings.append(Finding(TEMPORARY, table, extra))
+    return findings
+
+
+def _sqlite_findings(plan):
+    findings = []
+    # Subconsultas materializadas aparecem como SCAN do próprio alias, e não de uma tabela
+    derived = {
+        match.group(2)
+        for match in (_RE_SQLITE_SUBQUERY.match(row["detail"]) for row in plan)
+        if match
+    }
+    for row in plan:
+        detail = row["detail"]
+        scan = _RE_SQLITE_SCAN.match(detail)
+        if scan and scan.group(1) not in derived and "VIRTUAL TABLE" not in detail:
+            findings.append(Finding(FULL_SCAN, scan.group(1), detail))
+        elif detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+            findings.append(Finding(FILESORT, "", detail))
+        elif detail.startswith("USE TEMP B-TREE"):
+            findings.append(Finding(TEMPORARY, "", detail))
+    return findings
+
+
+# Função para analisar o plano de uma query, retornando os problemas encontrados
+def analyze(connection, query, values=None):
+    plan = explain(connection, query, values)
+    if backend_name(connection) == "sqlite":
+        return _sqlite_findings(plan)
+    return _mysql_findings(plan)
+
+
+# Função para verificar se a query filtra as linhas (leituras sem filtro são esperadas)
+def has_filter(query):
+    return bool(_RE_FILTER.search(query))
+
+
+def _workload_sizes(connection):
+    # Nos dados existentes, os ids sorteados vão de 1 até o maior id de cada tabela
+    sizes = {}
+    for table, column in (("usuarios", "usuario_id"), ("livros", "livro_id"), ("categorias", "categoria_id")):
+        result = read_data(connection, f"SELECT MAX({column}) FROM {table}")
+        sizes[table] = (result[0][0] if result else None) or 1
+    return sizes
+
+
+# Função para executar os casos do benchmark uma vez cada, guardando as queries emitidas
+def capture_workload(connection, sizes=None, seed=42):
+    # Importado aqui: o benchmark importa as telas, que só são necessárias nesta etapa
+    from benchmark import CASOS, BenchmarkContext
+
+    ctx = BenchmarkContext(connection, sizes or _workload_sizes(connection), seed)
+    with capture_queries() as examples:
+        for name, func, _ in CASOS:
+            try:
+                with transaction(connection):
+                    func(ctx)
+                    raise _Rollback()
+            except _Rollback:
+                pass
+            except Exception as e:
+                print(f"Erro ao executar o caso {name}: {e}")
+    return examples
+
+
+# Função para analisar as queries capturadas, retornando (formato, chamador, filtrada, problemas)
+def advise(connection, examples):
+    report = []
+    for shape, (query, values, caller) in sorted(examples.items()):
+        if not _RE_EXPLAINABLE.match(query):
+            continue
+        try:
+            findings = analyze(connection, query, values)
+        except Exception as e:
+            print(f"Erro ao analisar {normalize_query(query)[:80]}: {e}")
+            continue
+        report.append((shape, caller, has_filter(query), findings))
+    return report
+
+
+# Função para classificar os problemas de uma query: "problema", "aviso" ou "esperado"
+def severity(filtered, findings):
+    scans = any(f.kind == FULL_SCAN for f in findings)
+    if scans and filtered:
+        return "problema"
+    if scans and all(f.kind == FULL_SCAN for f in findings):
+        # Leitura de todas as linhas pedida pela própria query
+        return "esperado"
+    # Ordenação ou agrupamento só das linhas já encontradas pelos índices
+    return "aviso"
+
+
+# Função para imprimir o relatório, retornando quantas queries têm leituras completas evitáveis
+def print_report(report):
+    problems = 0
+    for shape, caller, filtered, findings in report:
+        if not findings:
+            continue
+        mark = severity(filtered, findings)
+        problems += mark == "problema"
+        print(f"\n[{mark}] {caller}\n    {shape[:160]}")
+        for finding in findings:
+            table = f" {finding.table}" if finding.table else ""
+            print(f"    - {finding.kind}{table}: {finding.detail}")
+    print(f"\n{len(report)} formatos de query analisados, {problems} com problemas")
+    return problems
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Roda EXPLAIN nas queries da aplicação e aponta leituras completas e filesorts."
+    )
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite",
+                        help="banco analisado (padrão: SQLite em memória com dados sintéticos)")
+    parser.add_argument("--sqlite-path", default=":memory:", help="arquivo do banco SQLite")
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena",
+                        help="volume dos dados sintéticos do SQLite em memória")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    synthetic = args.backend == "sqlite" and args.sqlite_path == ":memory:"
+    use_backend(MySQLBackend() if args.backend == "mysql" else SQLiteBackend(args.sqlite_path))
+
+    connection = get_database_connection()
+    if not connection:
+        return 2
+    try:
+        sizes = None
+        if synthetic:
+            sizes = ESCALAS[args.escala]
+            populate(connection, DatasetGenerator(sizes, seed=args.seed))
+        examples = capture_workload(connection, sizes, args.seed)
+        problems = print_report(advise(connection, examples))
+    finally:
+        connection.close()
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
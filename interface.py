@@ -1,20 +1,26 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
-from db_utils import get_database_connection, create_update_query, update_data
+from db_utils import (
+    get_database_connection,
+    create_update_query,
+    update_data,
+)
 from read_update_delete_user import (
-    create_delete_query,
-    delete_data,
     read_user,
     read_user_address,
     read_data,
+    read_users_page,
 )
-from create_user import create_insert_query, insert_data, get_usuario_id_endereco_id
+import services
 from validate_utils import validate_email, validate_phone, validate_cep, validate_uf
 import datetime
 from interface_author import AuthorManagementInterface
 from interface_categories import CategoriesManagementInterface
 from interface_books import BooksManagementInterface
 from interface_borrow import BorrowManagementInterface
+from db_executor import DatabaseExecutor
+from search_controller import SearchController
+from virtual_grid import PageBar, VirtualGrid
 
 
 class UserManagementInterface:
@@ -27,6 +33,15 @@ class UserManagementInterface:
         # Configurando estilo
         self.configure_style()
 
+        # Barra de status indicando consultas em andamento
+        self.busy_var = tk.StringVar(value="")
+        tk.Label(
+            self.root, textvariable=self.busy_var, anchor="w", bg="#f0f0f0"
+        ).pack(side="bottom", fill="x")
+
+        # Executor das consultas ao banco fora da thread do Tk
+        self.executor = DatabaseExecutor(self.root, busy_callback=self.show_busy)
+
         # Criando frame principal
         self.main_frame = tk.Frame(self.root)
         self.main_frame.pack(expand=True, fill="both")
@@ -50,6 +65,10 @@ class UserManagementInterface:
                 return False
         return True
 
+    def show_busy(self, busy):
+        """Atualiza o indicador de consultas em andamento"""
+        self.busy_var.set("Carregando..." if busy else "")
+
     def configure_style(self):
         self.root.configure(bg="#f0f0f0")
         self.button_style = {
@@ -210,7 +229,9 @@ class UserManagementInterface:
         menubar.add_cascade(label="Home", command=self.home_interface) # Adiciona a home
 
         # Cria instância da interface de emprestimos
-        self.books_interface = BorrowManagementInterface(self.connection)
+        self.books_interface = BorrowManagementInterface(
+            self.connection, self.executor
+        )
         self.books_interface.set_main_frame(self.main_frame)
 
         # Cria submenu de Empréstimos
@@ -249,7 +270,9 @@ class UserManagementInterface:
         menubar.add_cascade(label="Autor", menu=author_menu)
 
         # Criar instância da interface de autores
-        self.author_interface = AuthorManagementInterface(self.connection)
+        self.author_interface = AuthorManagementInterface(
+            self.connection, self.executor
+        )
         self.author_interface.set_main_frame(self.main_frame)
 
         # Adicionar opções ao submenu Autor
@@ -263,7 +286,9 @@ class UserManagementInterface:
             author_menu.add_command(label=text, command=command)
 
         # Cria instância da interface de categorias
-        self.categories_interface = CategoriesManagementInterface(self.connection)
+        self.categories_interface = CategoriesManagementInterface(
+            self.connection, self.executor
+        )
         self.categories_interface.set_main_frame(self.main_frame)
 
         # Cria submenu de Categorias
@@ -284,7 +309,9 @@ class UserManagementInterface:
             categories_menu.add_command(label=text, command=command)
 
         # Cria instância da interface de livros
-        self.books_interface = BooksManagementInterface(self.connection)
+        self.books_interface = BooksManagementInterface(
+            self.connection, self.executor
+        )
         self.books_interface.set_main_frame(self.main_frame)
 
         # Cria submenu de Livros
@@ -390,60 +417,27 @@ class UserManagementInterface:
                     )
                     return
 
-            # Criar query para inserir usuário
-            user_query = create_insert_query(
-                "usuarios", ["nome", "email", "telefone", "data_cadastro"]
-            )
-
             # Coletar dados do usuário dos campos
-            user_values = (
-                self.name_entry.get().strip(),
-                self.email_entry.get().strip(),
-                self.phone_entry.get().strip(),
-                datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            )
-
-            # Inserir usuário
-            insert_data(self.connection, user_query, user_values)
-
-            # Criar query para inserir endereço
-            address_query = create_insert_query(
-                "endereco",
-                [
-                    "logradouro",
-                    "numero",
-                    "complemento",
-                    "bairro",
-                    "cep",
-                    "cidade",
-                    "estado",
-                ],
+            user = services.UserInput(
+                nome=self.name_entry.get().strip(),
+                email=self.email_entry.get().strip(),
+                telefone=self.phone_entry.get().strip(),
             )
 
             # Coletar dados do endereço dos campos
             numero = self.number_entry.get().strip()
-            if not numero or not numero.isdigit():
-                numero = None
-
-            address_values = (
-                self.street_entry.get().strip(),
-                numero,
-                self.complement_entry.get().strip(),
-                self.district_entry.get().strip(),
-                self.cep_entry.get().strip(),
-                self.city_entry.get().strip(),
-                self.state_entry.get().strip(),
+            address = services.AddressInput(
+                logradouro=self.street_entry.get().strip(),
+                numero=int(numero) if numero.isdigit() else None,
+                complemento=self.complement_entry.get().strip(),
+                bairro=self.district_entry.get().strip(),
+                cep=self.cep_entry.get().strip(),
+                cidade=self.city_entry.get().strip(),
+                estado=self.state_entry.get().strip(),
             )
 
-            # Inserir endereço
-            insert_data(self.connection, address_query, address_values)
-
-            # Criar relacionamento usuário-endereço
-            query = create_insert_query(
-                "usuarioendereco", ["usuario_id", "endereco_id"]
-            )
-            values = get_usuario_id_endereco_id(self.connection)
-            insert_data(self.connection, query, values)
+            # Usuário, endereço e relacionamento gravados em uma única transação
+            services.create_user(self.connection, user, address)
 
             messagebox.showinfo("Sucesso", "Usuário criado com sucesso!")
             self.clear_right_frames()  # Limpa os campos após salvar
@@ -451,9 +445,6 @@ class UserManagementInterface:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao criar usuário: {str(e)}")
             print(f"[{datetime.datetime.now()}] Erro ao criar usuário: {str(e)}")
-        finally:
-            if self.connection and self.connection.is_connected():
-                self.connection.commit()  # Commit das alterações
 
     def clear_right_frames(self):
         """Limpa os frames do lado direito da interface"""
@@ -480,13 +471,26 @@ class UserManagementInterface:
         email_entry = tk.Entry(search_frame)
         email_entry.grid(row=1, column=1, sticky="w", pady=2)
 
+        # Busca em segundo plano; um novo clique descarta a busca anterior
+        self.user_lookup = SearchController(
+            search_frame,
+            self.executor,
+            self.find_user_for_update,
+            on_result=self.show_user_update_form,
+            on_error=lambda e: messagebox.showerror("Erro", f"Erro ao buscar usuário: {str(e)}"),
+        )
+
+        def search():
+            self.perform_update(id_entry.get().strip(), email_entry.get().strip())
+
+        id_entry.bind("<Return>", lambda event: search())
+        email_entry.bind("<Return>", lambda event: search())
+
         # Botão de busca
         search_button = tk.Button(
             search_frame,
             text="Buscar",
-            command=lambda: self.perform_update(
-                id_entry.get().strip(), email_entry.get().strip()
-            ),
+            command=search,
             **self.button_style,
         )
         search_button.grid(row=2, column=0, columnspan=2, pady=10)
@@ -521,10 +525,29 @@ class UserManagementInterface:
         )
         delete_button.grid(row=2, column=0, columnspan=2, pady=10)
 
+    def find_user_for_update(self, connection, usuario_id, email):
+        """Busca o usuário e o endereço dele (executado fora da thread do Tk)"""
+        result = read_user(connection, usuario_id=usuario_id, email=email)
+        if not result:
+            return result, None
+        return result, read_user_address(connection, usuario_id=result[0][0])
+
     def perform_update(self, usuario_id, email):
         """
-        Executa a atualização do usuário e do endereço
+        Busca o usuário informado para atualização
         """
+        if not usuario_id and not email:
+            messagebox.showerror("Erro", "Informe ID ou Email do usuário!")
+            return False
+
+        self.user_lookup.trigger(usuario_id, email)
+        return True
+
+    def show_user_update_form(self, found):
+        """
+        Exibe o formulário de atualização do usuário e do endereço encontrados
+        """
+        result, address_result = found
         if not self.connection or not self.connection.is_connected():
             print(
                 f"[{datetime.datetime.now()}] Erro: Conexão com o banco de dados não disponível."
@@ -537,9 +560,6 @@ class UserManagementInterface:
                 return False
 
         try:
-            # Busca o usuário
-            result = read_user(self.connection, usuario_id=usuario_id, email=email)
-
             if not result:
                 messagebox.showinfo("Aviso", "Usuário não encontrado!")
                 return False
@@ -574,9 +594,6 @@ class UserManagementInterface:
                 entry.grid(row=i, column=1, sticky="w", pady=2)
                 user_entries[label.lower()] = entry
 
-            # Busca o endereço do usuário
-            address_result = read_user_address(self.connection, usuario_id=row[0])
-
             if address_result and len(address_result) > 0:
                 address_row = address_result[0]
                 address_fields = [
@@ -699,23 +716,23 @@ class UserManagementInterface:
 
                     # Atualiza os dados no banco de dados
                     if user_updates:
-                        user_condition = f"usuario_id = {row[0]}"
                         user_query = create_update_query(
-                            "usuarios", user_updates.keys(), user_condition
+                            "usuarios", user_updates.keys(), "usuario_id = %s"
                         )
                         update_data(
-                            self.connection, user_query, tuple(user_updates.values())
+                            self.connection,
+                            user_query,
+                            (*user_updates.values(), row[0]),
                         )
 
                     if address_updates:
-                        address_condition = f"endereco_id = {address_row[0]}"
                         address_query = create_update_query(
-                            "endereco", address_updates.keys(), address_condition
+                            "endereco", address_updates.keys(), "endereco_id = %s"
                         )
                         update_data(
                             self.connection,
                             address_query,
-                            tuple(address_updates.values()),
+                            (*address_updates.values(), address_row[0]),
                         )
 
                     messagebox.showinfo(
@@ -834,38 +851,13 @@ class UserManagementInterface:
                 return False
 
             try:
-                # Rollback any existing transaction - Garantir que não tem nenhuma transação pendente
-                self.connection.rollback()
-
-                # Inicia uma transação
-                self.connection.start_transaction()
-
-                # 1. Primeiro, obtém o endereco_id (se existir)
-                if address_result:
-                    endereco_id = address_result[0][0]
-
-                    # 2. Remove a referência na tabela usuarioendereco
-                    query = create_delete_query(
-                        "usuarioendereco", f"usuario_id = {row[0]}"
-                    )
-                    delete_data(self.connection, query, None)
-
-                    # 3. Remove o endereço
-                    query = create_delete_query(
-                        "endereco", f"endereco_id = {endereco_id}"
-                    )
-                    delete_data(self.connection, query, None)
-
-                # 4. Finalmente, remove o usuário
-                query = create_delete_query("usuarios", f"usuario_id = {row[0]}")
-                delete_data(self.connection, query, None)
-
-                # Commit da transação
-                self.connection.commit()
+                # Usuário, endereços e relacionamentos removidos em uma única transação
+                result = services.delete_user(self.connection, row[0])
+                if not result.removido:
+                    messagebox.showinfo("Aviso", result.mensagem)
+                    return False
 
-                messagebox.showinfo(
-                    "Sucesso", "Usuário e dados relacionados excluídos com sucesso!"
-                )
+                messagebox.showinfo("Sucesso", result.mensagem)
                 self.clear_right_frames()
 
                 # Log da exclusão
@@ -875,8 +867,6 @@ class UserManagementInterface:
                 return True
 
             except Exception as e:
-                # Em caso de erro, faz rollback de todas as operações
-                self.connection.rollback()
                 messagebox.showerror("Erro", f"Erro ao excluir dados: {str(e)}")
                 print(
                     f"[{datetime.datetime.now()}] Erro ao excluir dados do usuário {row[0]}: {str(e)}"
@@ -901,16 +891,17 @@ class UserManagementInterface:
         )
         main_display_frame.grid(row=0, column=1, sticky="nsew", padx=10, pady=5)
 
-        # Criar Treeview
+        # Criar tabela virtualizada (só as linhas visíveis viram itens do Treeview)
         columns = ("ID", "Nome", "Email", "Telefone", "Data Cadastro", "Status")
-        self.users_tree = ttk.Treeview(
-            main_display_frame, columns=columns, show="headings", selectmode="browse"
+        self.users_tree = VirtualGrid(
+            main_display_frame,
+            columns,
+            formatter=self.format_user,
+            selectmode="browse",
         )
 
-        # Configurar cabeçalhos
+        # Ajustar largura das colunas
         for col in columns:
-            self.users_tree.heading(col, text=col)
-            # Ajustar largura das colunas
             if col == "Nome" or col == "Email":
                 self.users_tree.column(col, width=200)
             elif col == "Data Cadastro":
@@ -918,19 +909,22 @@ class UserManagementInterface:
             else:
                 self.users_tree.column(col, width=100)
 
-        # Adicionar scrollbar
-        scrollbar = ttk.Scrollbar(
-            main_display_frame, orient="vertical", command=self.users_tree.yview
-        )
-        self.users_tree.configure(yscrollcommand=scrollbar.set)
-
         # Posicionar elementos
-        self.users_tree.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.users_tree.grid(row=0, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
+
+        # Navegação por páginas (só a página exibida é lida do banco)
+        self.users_pages = PageBar(
+            main_display_frame,
+            self.executor,
+            read_users_page,
+            self.users_tree.set_rows,
+            on_error=self.on_users_error,
+        )
+        self.users_pages.grid(row=1, column=0, columnspan=2, pady=(5, 0))
 
         # Frame para botões
         button_frame = ttk.Frame(main_display_frame)
-        button_frame.grid(row=1, column=0, columnspan=2, pady=10)
+        button_frame.grid(row=2, column=0, columnspan=2, pady=10)
 
         # Botão para atualizar lista
         ttk.Button(button_frame, text="Atualizar Lista", command=self.load_users).grid(
@@ -950,58 +944,34 @@ class UserManagementInterface:
         self.load_users()
 
     def load_users(self):
-        """Carrega todos os usuários na tabela"""
-        try:
-            # Limpar tabela
-            for item in self.users_tree.get_children():
-                self.users_tree.delete(item)
-
-            if not self.ensure_connection():
-                return
+        """Carrega a primeira página de usuários na tabela"""
+        self.users_pages.reload()
 
-            # Buscar todos os usuários
-            query = "SELECT * FROM usuarios ORDER BY usuario_id"
-            result = read_data(self.connection, query)
+    def on_users_error(self, e):
+        messagebox.showerror("Erro", f"Erro ao carregar usuários: {str(e)}")
+        print(f"[{datetime.datetime.now()}] Erro ao carregar usuários: {str(e)}")
 
-            if result:
-                for row in result:
-                    # Formatar telefone
-                    telefone = str(row[3])  # type: ignore
-                    telefone_formatado = (
-                        f"({telefone[:2]}) {telefone[2:7]}-{telefone[7:]}"
-                    )
+    def format_user(self, row):
+        """Formata um usuário para exibição (chamado apenas para as linhas visíveis)"""
+        # Formatar telefone
+        telefone = str(row[3])
+        telefone_formatado = f"({telefone[:2]}) {telefone[2:7]}-{telefone[7:]}"
 
-                    # Formatar data
-                    data = row[4].strftime("%d/%m/%Y %H:%M:%S") if row[4] else ""  # type: ignore
-
-                    # Inserir na tabela
-                    self.users_tree.insert(
-                        "",
-                        "end",
-                        values=(
-                            row[0],  # ID  # type: ignore
-                            row[1],  # Nome # type: ignore
-                            row[2],  # Email # type: ignore
-                            telefone_formatado,  # Telefone formatado
-                            data,  # Data formatada
-                            row[5],  # Status # type: ignore
-                        ),
-                    )
+        # Formatar data
+        data = row[4].strftime("%d/%m/%Y %H:%M:%S") if row[4] else ""
 
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao carregar usuários: {str(e)}")
-            print(f"[{datetime.datetime.now()}] Erro ao carregar usuários: {str(e)}")
+        return (row[0], row[1], row[2], telefone_formatado, data, row[5])
 
     def show_user_details(self):
         """Mostra os detalhes do usuário selecionado"""
-        selected_item = self.users_tree.selection()
-        if not selected_item:
+        selected_rows = self.users_tree.selected_rows()
+        if not selected_rows:
             messagebox.showwarning(
                 "Aviso", "Por favor, selecione um usuário para ver os detalhes."
             )
             return
 
-        usuario_id = self.users_tree.item(selected_item)["values"][0]  # type: ignore
+        usuario_id = selected_rows[0][0]
 
         try:
             if not self.ensure_connection():
@@ -1108,7 +1078,10 @@ class UserManagementInterface:
 
     def run(self):
         """Inicia o loop da interface gráfica"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.executor.shutdown()
 
 
 def create_interface(connection=None):
@@ -2,10 +2,12 @@ import tkinter as tk
 from tkinter import messagebox
 from db_utils import (
     get_database_connection,
-    update_data,
     read_data,
-    create_update_query,
 )
+from db_executor import DatabaseExecutor
+from reference_cache import invalidate_authors
+from search_controller import SearchController
+import services
 from create_user import create_insert_query, insert_data
 import datetime
 
@@ -16,8 +18,10 @@ class AuthorManagementInterface:
     Esta classe fornece uma interface gráfica para criar autores.
     """
 
-    def __init__(self, connection=None):
+    def __init__(self, connection=None, executor=None):
         self.connection = connection
+        # Executor das consultas em segundo plano (síncrono quando não informado)
+        self.executor = executor or DatabaseExecutor()
         self.author_frame = None
         self.main_frame = None
         self.button_style = {
@@ -125,6 +129,7 @@ class AuthorManagementInterface:
 
             # Inserir autor
             insert_data(self.connection, author_query, author_values)
+            invalidate_authors()
 
             messagebox.showinfo("Sucesso", "Autor criado com sucesso!")
             self.clear_right_frames()
@@ -148,6 +153,16 @@ class AuthorManagementInterface:
         tk.Label(search_frame, text="ID:").grid(row=0, column=0, sticky="e", pady=2)
         id_entry = tk.Entry(search_frame)
         id_entry.grid(row=0, column=1, sticky="w", pady=2)
+        id_entry.bind("<Return>", lambda event: self.perform_update(id_entry.get().strip()))
+
+        # Busca em segundo plano; um novo clique descarta a busca anterior
+        self.author_lookup = SearchController(
+            search_frame,
+            self.executor,
+            self.find_author,
+            on_result=self.show_author_update_form,
+            on_error=lambda e: messagebox.showerror("Erro", f"Erro ao buscar autor: {str(e)}"),
+        )
 
         # Botão de busca
         search_button = tk.Button(
@@ -181,22 +196,10 @@ class AuthorManagementInterface:
             if not autor_id:
                 messagebox.showwarning("Aviso", "Por favor, informe o ID para busca!")
                 return
+            search.trigger(autor_id)
 
+        def show_author(result):
             try:
-
-                if not self.connection or not self.connection.is_connected():
-                    self.connection = get_database_connection()
-
-                    if not self.connection:
-                        messagebox.showerror(
-                            "Erro", "Não foi possível conectar ao banco de dados!"
-                        )
-                        return
-
-                # Buscar dados do autor
-                query = f"SELECT * FROM autores WHERE autor_id = {autor_id}"
-                result = read_data(self.connection, query)
-
                 if not result:
                     messagebox.showinfo("Aviso", "Autor não encontrado!")
                     return
@@ -229,18 +232,38 @@ class AuthorManagementInterface:
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao buscar autor: {str(e)}")
 
+        # Busca em segundo plano; só o resultado da busca mais recente é exibido
+        search = SearchController(
+            search_frame,
+            self.executor,
+            self.find_author,
+            on_result=show_author,
+            on_error=lambda e: messagebox.showerror("Erro", f"Erro ao buscar autor: {str(e)}"),
+        )
+        self.id_entry.bind("<Return>", lambda event: perform_search())
+
         # Botão de busca
         search_button = tk.Button(
             search_frame, text="Buscar", command=perform_search, **self.button_style
         )
         search_button.grid(row=1, column=0, columnspan=2, pady=10)
 
+    def find_author(self, connection, autor_id):
+        """Busca o autor pelo ID (executado fora da thread do Tk)"""
+        query = "SELECT * FROM autores WHERE autor_id = %s"
+        return read_data(connection, query, (autor_id,))
+
     def perform_update(self, autor_id):
-        """Executa a atualização do autor"""
+        """Busca o autor informado para atualização"""
         if not autor_id:
             messagebox.showerror("Erro", "Informe o ID do autor!")
             return False
 
+        self.author_lookup.trigger(autor_id)
+        return True
+
+    def show_author_update_form(self, result):
+        """Exibe o formulário de atualização do autor encontrado"""
         try:
             if not self.connection or not self.connection.is_connected():
                 self.connection = get_database_connection()
@@ -250,10 +273,6 @@ class AuthorManagementInterface:
                     )
                     return False
 
-            # Busca o autor
-            query = f"SELECT * FROM autores WHERE autor_id = {autor_id}"
-            result = read_data(self.connection, query)
-
             if not result:
                 messagebox.showinfo("Aviso", "Autor não encontrado!")
                 return False
@@ -269,6 +288,7 @@ class AuthorManagementInterface:
 
             # Preenche os campos com os dados atuais do autor
             row = result[0]
+            autor_id = row[0]
 
             # Campos do autor com seus valores atuais
             author_fields = [
@@ -290,17 +310,14 @@ class AuthorManagementInterface:
 
             def save_updates():
                 try:
-                    # Atualiza os dados no banco de dados
-                    update_query = create_update_query(
-                        "autores", ["nome", "nacionalidade"], f"autor_id = {autor_id}"
-                    )
-
-                    update_values = (
+                    # Atualiza o autor e o resumo do catálogo dos livros dele
+                    services.update_author(
+                        self.connection,
+                        autor_id,
                         author_entries["nome"].get().strip(),
                         author_entries["nacionalidade"].get().strip(),
                     )
-
-                    update_data(self.connection, update_query, update_values)
+                    invalidate_authors()
                     messagebox.showinfo("Sucesso", "Autor atualizado com sucesso!")
                     self.clear_right_frames()
 
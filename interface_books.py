@@ -1,11 +1,42 @@
 import csv
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from db_utils import (
-    get_database_connection,
-    read_data,
-    create_insert_query,
-)
+from db_utils import KeysetQuery, get_database_connection, read_data, stream_batches, timed_execute
+from db_executor import DatabaseExecutor
+import reference_cache
+from search_controller import Debouncer, SearchController
+from search_index import InvertedIndex
+import services
+from virtual_grid import PageBar, VirtualGrid
+
+
+# Lista de livros paginada pelo livro_id e a linha de um único livro no mesmo formato
+BOOKS_PAGE = KeysetQuery(services.BOOK_LIST_QUERY, ["livro_id"], [0])
+BOOK_ROW_QUERY = services.BOOK_LIST_QUERY.format(seek="livro_id = %s")
+
+# Busca de um livro no resumo do catálogo pelo campo escolhido (titulo, isbn ou livro_id),
+# com os ids de autores e categoria usados no formulário de atualização
+BOOK_LOOKUP_QUERY = """
+    SELECT
+        livro_id,
+        titulo,
+        isbn,
+        ano_publicacao,
+        editora,
+        quantidade_copias,
+        localizacao_estante,
+        autor_ids,
+        autores,
+        autores AS autor_names,
+        categoria_id,
+        categoria,
+        categoria AS categoria_nome
+    FROM catalogo_resumo
+    WHERE {} = %s
+"""
+
+# Espera (ms) após a última tecla antes de aplicar o filtro da lista de livros
+FILTER_DELAY_MS = 150
 
 
 class BooksManagementInterface:
@@ -14,8 +45,10 @@ class BooksManagementInterface:
     Permite adicionar, atualizar e gerenciar livros e seus relacionamentos.
     """
 
-    def __init__(self, connection=None):
+    def __init__(self, connection=None, executor=None):
         self.connection = connection
+        # Executor das consultas em segundo plano (síncrono quando não informado)
+        self.executor = executor or DatabaseExecutor()
         self.book_frame = None
         self.main_frame = None
 
@@ -25,6 +58,11 @@ class BooksManagementInterface:
         # Variável para armazenar a categoria selecionada
         self.selected_category = None
 
+        # Índice de busca do catálogo (montado na primeira busca)
+        self.book_index = None
+        self.book_index_loading = False
+        self.searching = False
+
         self.button_style = {
             "font": ("Arial", 11),
             "width": 20,
@@ -167,8 +205,7 @@ class BooksManagementInterface:
     def get_authors(self):
         """Busca todos os autores do banco de dados"""
         try:
-            query = "SELECT autor_id, nome FROM autores ORDER BY nome"
-            return read_data(self.connection, query)
+            return reference_cache.get_authors(self.connection)
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao buscar autores: {str(e)}")
             return []
@@ -176,88 +213,39 @@ class BooksManagementInterface:
     def get_categories(self):
         """Busca todas as categorias do banco de dados"""
         try:
-            query = "SELECT categoria_id, nome FROM categorias ORDER BY nome"
-            return read_data(self.connection, query)
+            return reference_cache.get_categories(self.connection)
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao buscar categorias: {str(e)}")
             return []
 
+    def collect_book_input(self, entries):
+        """Monta o services.BookInput com os campos, autores e categoria selecionados"""
+        category_name = self.selected_category.get()  # type: ignore
+        return services.BookInput(
+            titulo=entries["titulo"].get().strip(),
+            isbn=entries["isbn"].get().strip(),
+            ano_publicacao=int(entries["ano_publicacao"].get().strip()),
+            editora=entries["editora"].get().strip(),
+            quantidade_copias=int(entries["quantidade_copias"].get().strip()),
+            localizacao_estante=entries["localizacao_estante"].get().strip(),
+            autor_ids=tuple(
+                author_id for var, author_id in self.author_vars if var.get()
+            ),
+            categoria_id=self.category_map.get(category_name),
+        )
+
     def save_book(self):
         """Salva o livro e seus relacionamentos no banco de dados"""
         try:
             if not self.validate_fields():
                 return
 
-            # Coletar dados do formulário
-            book_data = {
-                "titulo": self.entries["titulo"].get().strip(),
-                "isbn": self.entries["isbn"].get().strip(),
-                "ano_publicacao": int(self.entries["ano_publicacao"].get().strip()),
-                "editora": self.entries["editora"].get().strip(),
-                "quantidade_copias": int(
-                    self.entries["quantidade_copias"].get().strip()
-                ),
-                "localizacao_estante": self.entries["localizacao_estante"]
-                .get()
-                .strip(),
-            }
-
-            # Iniciar transação
-            self.connection.rollback()  # type: ignore
-            self.connection.start_transaction()  # type: ignore
+            # Livro, autores e categoria gravados em uma única transação
+            livro_id = services.save_book(self.connection, self.collect_book_input(self.entries))
+            self.refresh_indexed_book(livro_id)
 
-            try:
-                cursor = self.connection.cursor()  # type: ignore
-
-                # Inserir livro
-                book_query = create_insert_query("livros", book_data.keys())
-                cursor.execute(book_query, tuple(book_data.values()))
-
-                # Obter o ID do livro inserido
-                cursor.execute("SELECT LAST_INSERT_ID()")
-                livro_id = cursor.fetchone()[0]  # type: ignore
-
-                # print(f"livro_id após inserção: {livro_id}")  # Debugging
-
-                if livro_id is None:
-                    raise Exception("Erro ao obter livro_id após inserção.")
-
-                # Inserir relacionamentos com autores
-                selected_authors = [
-                    author_id for var, author_id in self.author_vars if var.get()
-                ]
-
-                for author_id in selected_authors:
-                    author_query = (
-                        "INSERT INTO livrosautores (livro_id, autor_id) VALUES (%s, %s)"
-                    )
-                    # print(
-                    #     f"Inserindo autor - livro_id: {livro_id}, author_id: {author_id}"
-                    # )
-                    cursor.execute(author_query, (livro_id, author_id))  # type: ignore
-
-                # Inserir relacionamento com categoria
-                category_name = self.selected_category.get()  # type: ignore
-                if category_name in self.category_map:
-                    category_id = self.category_map[category_name]
-                    category_query = "INSERT INTO livroscategorias (livro_id, categoria_id) VALUES (%s, %s)"
-                    # print(
-                    #     f"Inserindo categoria - livro_id: {livro_id}, category_id: {category_id}"
-                    # )
-                    cursor.execute(category_query, (livro_id, category_id))  # type: ignore
-
-                # Commit da transação
-                self.connection.commit()  # type: ignore
-                cursor.close()
-
-                messagebox.showinfo("Sucesso", "Livro cadastrado com sucesso!")
-                self.clear_fields()
-
-            except Exception as e:
-                self.connection.rollback()  # type: ignore
-                if "cursor" in locals():
-                    cursor.close()  # type: ignore
-                raise e
+            messagebox.showinfo("Sucesso", "Livro cadastrado com sucesso!")
+            self.clear_fields()
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao salvar livro: {str(e)}")
@@ -362,32 +350,11 @@ class BooksManagementInterface:
                 messagebox.showwarning("Aviso", "Digite um valor para busca!")
                 return
 
-            # Construir query de busca
-            query = """
-                SELECT 
-                    l.livro_id, 
-                    l.titulo, 
-                    l.isbn, 
-                    l.ano_publicacao, 
-                    l.editora, 
-                    l.quantidade_copias, 
-                    l.localizacao_estante,
-                    GROUP_CONCAT(DISTINCT a.autor_id) AS autor_ids,
-                    GROUP_CONCAT(DISTINCT a.nome) AS autor_names,
-                    MAX(c.categoria_id) AS categoria_id, 
-                    MAX(c.nome) AS categoria_nome
-                FROM livros l
-                LEFT JOIN livrosautores la ON l.livro_id = la.livro_id
-                LEFT JOIN autores a ON la.autor_id = a.autor_id
-                LEFT JOIN livroscategorias lc ON l.livro_id = lc.livro_id
-                LEFT JOIN categorias c ON lc.categoria_id = c.categoria_id
-                WHERE l.{} = %s
-                GROUP BY l.livro_id, l.titulo, l.isbn, l.ano_publicacao, l.editora, 
-                        l.quantidade_copias, l.localizacao_estante
-            """.format(search_type)
+            # Busca de uma única linha no resumo do catálogo
+            query = BOOK_LOOKUP_QUERY.format(search_type)
 
             cursor = self.connection.cursor(dictionary=True) # type: ignore
-            cursor.execute(query, (search_value,))
+            timed_execute(cursor, query, (search_value,))
             result = cursor.fetchone()
             cursor.close()
 
@@ -524,66 +491,13 @@ class BooksManagementInterface:
             if not self.validate_book_update():
                 return
 
-            # Coletar dados atualizados
-            book_data = {
-                'titulo': self.update_entries['titulo'].get().strip(),
-                'isbn': self.update_entries['isbn'].get().strip(),
-                'ano_publicacao': int(self.update_entries['ano_publicacao'].get().strip()),
-                'editora': self.update_entries['editora'].get().strip(),
-                'quantidade_copias': int(self.update_entries['quantidade_copias'].get().strip()),
-                'localizacao_estante': self.update_entries['localizacao_estante'].get().strip()
-            }
-
-            # Iniciar transação
-            self.connection.rollback() # type: ignore
-            self.connection.start_transaction() # type: ignore
-            cursor = self.connection.cursor() # type: ignore
-
-            try:
-                # Atualizar dados do livro
-                update_query = """
-                    UPDATE livros 
-                    SET titulo=%s, isbn=%s, ano_publicacao=%s, 
-                        editora=%s, quantidade_copias=%s, localizacao_estante=%s
-                    WHERE livro_id=%s
-                """
-                values = (*book_data.values(), self.current_book_id)
-                cursor.execute(update_query, values)
-
-                # Atualizar autores
-                cursor.execute("DELETE FROM livrosautores WHERE livro_id=%s", 
-                            (self.current_book_id,))
-
-                selected_authors = [
-                    author_id for var, author_id in self.author_vars if var.get()
-                ]
-
-                for author_id in selected_authors:
-                    cursor.execute(
-                        "INSERT INTO livrosautores (livro_id, autor_id) VALUES (%s, %s)",
-                        (self.current_book_id, author_id)
-                    )
-
-                # Atualizar categoria
-                cursor.execute("DELETE FROM livroscategorias WHERE livro_id=%s", 
-                            (self.current_book_id,))
-
-                category_name = self.selected_category.get() # type: ignore
-                if category_name in self.category_map:
-                    category_id = self.category_map[category_name]
-                    cursor.execute(
-                        "INSERT INTO livroscategorias (livro_id, categoria_id) VALUES (%s, %s)",
-                        (self.current_book_id, category_id) # type: ignore
-                    )
-
-                self.connection.commit() # type: ignore
-                messagebox.showinfo("Sucesso", "Livro atualizado com sucesso!")
-
-            except Exception as e:
-                self.connection.rollback() # type: ignore
-                raise e
-            finally:
-                cursor.close()
+            services.update_book(
+                self.connection,
+                self.current_book_id,
+                self.collect_book_input(self.update_entries),
+            )
+            self.refresh_indexed_book(self.current_book_id)
+            messagebox.showinfo("Sucesso", "Livro atualizado com sucesso!")
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao atualizar livro: {str(e)}")
@@ -688,30 +602,11 @@ class BooksManagementInterface:
                 messagebox.showwarning("Aviso", "Digite um valor para busca!")
                 return
 
-            # Construir query de busca
-            query = """
-                SELECT 
-                    l.livro_id, 
-                    l.titulo, 
-                    l.isbn, 
-                    l.ano_publicacao, 
-                    l.editora, 
-                    l.quantidade_copias, 
-                    l.localizacao_estante,
-                    GROUP_CONCAT(DISTINCT a.nome SEPARATOR ', ') AS autores,
-                    MAX(c.nome) AS categoria
-                FROM livros l
-                LEFT JOIN livrosautores la ON l.livro_id = la.livro_id
-                LEFT JOIN autores a ON la.autor_id = a.autor_id
-                LEFT JOIN livroscategorias lc ON l.livro_id = lc.livro_id
-                LEFT JOIN categorias c ON lc.categoria_id = c.categoria_id
-                WHERE l.{} = %s
-                GROUP BY l.livro_id, l.titulo, l.isbn, l.ano_publicacao, 
-                        l.editora, l.quantidade_copias, l.localizacao_estante
-            """.format(search_type)
+            # Busca de uma única linha no resumo do catálogo
+            query = BOOK_LOOKUP_QUERY.format(search_type)
 
             cursor = self.connection.cursor(dictionary=True) # type: ignore
-            cursor.execute(query, (search_value,))
+            timed_execute(cursor, query, (search_value,))
             result = cursor.fetchone()
             cursor.close()
 
@@ -783,42 +678,15 @@ class BooksManagementInterface:
     def delete_book_from_database(self):
         """Remove o livro e seus relacionamentos do banco de dados"""
         try:
-            cursor = self.connection.cursor() # type: ignore
-            self.connection.rollback() # type: ignore
-            self.connection.start_transaction() # type: ignore
-
-            try:
-                # Remover relacionamentos com autores
-                cursor.execute(
-                    "DELETE FROM livrosautores WHERE livro_id = %s",
-                    (self.book_to_delete,)
-                )
+            services.delete_book(self.connection, self.book_to_delete)
+            if self.book_index is not None:
+                self.book_index.remove(self.book_to_delete)
+            messagebox.showinfo("Sucesso", "Livro deletado com sucesso!")
 
-                # Remover relacionamentos com categorias
-                cursor.execute(
-                    "DELETE FROM livroscategorias WHERE livro_id = %s",
-                    (self.book_to_delete,)
-                )
-
-                # Remover o livro
-                cursor.execute(
-                    "DELETE FROM livros WHERE livro_id = %s",
-                    (self.book_to_delete,)
-                )
-
-                self.connection.commit() # type: ignore
-                messagebox.showinfo("Sucesso", "Livro deletado com sucesso!")
-
-                # Limpar a interface
-                self.search_entry.delete(0, tk.END)
-                for widget in self.book_info_frame.winfo_children():
-                    widget.destroy()
-
-            except Exception as e:
-                self.connection.rollback() # type: ignore
-                raise e
-            finally:
-                cursor.close()
+            # Limpar a interface
+            self.search_entry.delete(0, tk.END)
+            for widget in self.book_info_frame.winfo_children():
+                widget.destroy()
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao deletar livro: {str(e)}")
@@ -841,7 +709,17 @@ class BooksManagementInterface:
             tk.Label(search_frame, text="Buscar:").grid(row=0, column=0, padx=5)
             self.search_entry = tk.Entry(search_frame, width=40)
             self.search_entry.grid(row=0, column=1, padx=5)
-            self.search_entry.bind("<KeyRelease>", lambda event: self.filter_books())
+            self.filter_debouncer = Debouncer(self.search_entry, self.filter_books, FILTER_DELAY_MS)
+            self.search_entry.bind("<KeyRelease>", lambda event: self.filter_debouncer.schedule())
+
+            # Busca no banco, usada enquanto o índice em memória ainda está sendo montado
+            self.book_search = SearchController(
+                self.search_entry,
+                self.executor,
+                self.search_books_in_database,
+                on_result=self.show_search_results,
+                on_error=lambda e: messagebox.showerror("Erro", f"Erro ao buscar livros: {str(e)}"),
+            )
 
             # Botão para exportar para CSV
             tk.Button(
@@ -855,28 +733,15 @@ class BooksManagementInterface:
             self.table_frame = tk.Frame(self.print_frame)
             self.table_frame.grid(row=1, column=0, sticky="nsew", pady=5)
 
-            # Configurar tabela
-            self.book_table = ttk.Treeview(
+            # Configurar tabela virtualizada (a linha do banco traz autores antes da categoria)
+            self.book_table = VirtualGrid(
                 self.table_frame,
-                columns=(
-                    "ID", "Título", "ISBN", "Ano", "Editora", "Cópias", "Estante", "Categoria", "Autores"
-                ),
-                show="headings",
-                height=15
+                ("ID", "Título", "ISBN", "Ano", "Editora", "Cópias", "Estante", "Categoria", "Autores"),
+                formatter=self.format_book,
+                source_indexes=(0, 1, 2, 3, 4, 5, 6, 8, 7),
             )
             self.book_table.grid(row=0, column=0, sticky="nsew")
 
-            # Configurar colunas
-            self.book_table.heading("ID", text="ID")
-            self.book_table.heading("Título", text="Título")
-            self.book_table.heading("ISBN", text="ISBN")
-            self.book_table.heading("Ano", text="Ano")
-            self.book_table.heading("Editora", text="Editora")
-            self.book_table.heading("Cópias", text="Cópias")
-            self.book_table.heading("Estante", text="Estante")
-            self.book_table.heading("Categoria", text="Categoria")
-            self.book_table.heading("Autores", text="Autores")
-
             # Ajustar largura das colunas
             self.book_table.column("ID", width=50, anchor="center")
             self.book_table.column("Título", width=200, anchor="w")
@@ -888,10 +753,17 @@ class BooksManagementInterface:
             self.book_table.column("Categoria", width=150, anchor="w")
             self.book_table.column("Autores", width=200, anchor="w")
 
-            # Scrollbar para a tabela
-            scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.book_table.yview)
-            self.book_table.configure(yscrollcommand=scrollbar.set)
-            scrollbar.grid(row=0, column=1, sticky="ns")
+            # Navegação por páginas; a busca filtra a página carregada
+            self.books_pages = PageBar(
+                self.print_frame,
+                self.executor,
+                self.query_books_page,
+                self.show_books_page,
+                on_error=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao buscar dados dos livros: {str(e)}"
+                ),
+            )
+            self.books_pages.grid(row=2, column=0, pady=5)
 
             # Carregar dados do banco de dados
             self.fetch_books_from_database()
@@ -899,90 +771,132 @@ class BooksManagementInterface:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao criar interface de exibição: {str(e)}")
 
-    def fetch_books_from_database(self):
-        """Busca os dados dos livros no banco de dados e exibe na tabela"""
-        try:
-            query = """
-                SELECT 
-                    l.livro_id, 
-                    l.titulo, 
-                    l.isbn, 
-                    l.ano_publicacao, 
-                    l.editora, 
-                    l.quantidade_copias, 
-                    l.localizacao_estante,
-                    GROUP_CONCAT(DISTINCT a.nome SEPARATOR ', ') AS autores,
-                    MAX(c.nome) AS categoria
-                FROM livros l
-                LEFT JOIN livrosautores la ON l.livro_id = la.livro_id
-                LEFT JOIN autores a ON la.autor_id = a.autor_id
-                LEFT JOIN livroscategorias lc ON l.livro_id = lc.livro_id
-                LEFT JOIN categorias c ON lc.categoria_id = c.categoria_id
-                GROUP BY 
-                    l.livro_id, 
-                    l.titulo, 
-                    l.isbn, 
-                    l.ano_publicacao, 
-                    l.editora, 
-                    l.quantidade_copias, 
-                    l.localizacao_estante;
-            """
-            connection = get_database_connection()
-            if not connection:
-                raise Exception("Não foi possível conectar ao banco de dados.")
-
-            books = read_data(connection, query)
-            if not books:  # Se não houver resultados, inicializar como lista vazia
-                books = []
-
-            # Limpar tabela antes de carregar novos dados
-            for row in self.book_table.get_children():
-                self.book_table.delete(row)
-
-            # Inserir dados na tabela
-            for book in books:
-                self.book_table.insert(
-                    "",
-                    "end",
-                    values=(
-                        book[0],  # ID # type: ignore
-                        book[1],  # Título # type: ignore
-                        book[2],  # ISBN # type: ignore
-                        book[3],  # Ano de Publicação # type: ignore
-                        book[4],  # Editora # type: ignore
-                        book[5],  # Quantidade de Cópias # type: ignore
-                        book[6],  # Localização na Estante # type: ignore
-                        book[8] if book[8] else "Sem Categoria",  # Categoria # type: ignore
-                        book[7] if book[7] else "Sem Autores"  # Autores # type: ignore
-                    )
-                )
+    def query_books(self, connection):
+        """Busca os dados de todos os livros em lotes (executado fora da thread do Tk)"""
+        return stream_batches(
+            connection, services.BOOK_LIST_QUERY.format(seek="1 = 1") + " ORDER BY livro_id"
+        )
 
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao buscar dados dos livros: {str(e)}")
+    def query_books_page(self, connection, after=None, limit=None):
+        """Busca uma página de livros a partir do último livro_id exibido"""
+        return BOOKS_PAGE.page(connection, after, limit)
+
+    def fetch_books_from_database(self):
+        """Busca a primeira página de livros no banco de dados e exibe na tabela"""
+        self.searching = False
+        self.books_pages.reload()
+
+    def format_book(self, book):
+        """Formata um livro para exibição (chamado apenas para as linhas visíveis)"""
+        return (
+            book[0],  # ID
+            book[1],  # Título
+            book[2],  # ISBN
+            book[3],  # Ano de Publicação
+            book[4],  # Editora
+            book[5],  # Quantidade de Cópias
+            book[6],  # Localização na Estante
+            book[8] if book[8] else "Sem Categoria",  # Categoria
+            book[7] if book[7] else "Sem Autores",  # Autores
+        )
 
     def filter_books(self):
         """Filtra os livros exibidos na tabela com base no texto de busca"""
         try:
             search_text = self.search_entry.get().strip().lower()
 
-            # Se o campo de busca estiver vazio, recarregar todos os dados
+            # Campo de busca vazio: volta para a página que estava aberta, sem ir ao banco
             if not search_text:
-                self.fetch_books_from_database()
+                self.book_search.cancel()
+                self.book_table.set_filter(None)
+                if self.searching:
+                    self.searching = False
+                    self.books_pages.grid()
+                    self.books_pages.show_current()
+                return
+
+            self.ensure_book_index()
+            if self.book_index is None:
+                # Índice ainda sendo montado: busca no banco pelos índices de texto enquanto isso
+                self.book_search.trigger(search_text)
                 return
 
-            # Filtrar os resultados na tabela
-            for row in self.book_table.get_children():
-                values = self.book_table.item(row, "values")
-                if any(search_text in str(value).lower() for value in values):
-                    self.book_table.reattach(row, '', 'end')  # type: ignore # Reexibe a linha 
-                else:
-                    self.book_table.detach(row)  # Oculta a linha
+            # Busca no catálogo inteiro pelo índice; a paginação fica oculta
+            self.book_search.cancel()
+            self.show_search_results(self.book_index.search(search_text))
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao filtrar livros: {str(e)}")
 
+    def search_books_in_database(self, connection, search_text):
+        """Primeira página da busca textual no banco, por relevância (fora da thread do Tk)"""
+        return services.search_books(connection, search_text).rows
+
+    def show_search_results(self, books):
+        """Exibe o resultado de uma busca no lugar da página, ocultando a paginação"""
+        self.searching = True
+        self.books_pages.grid_remove()
+        self.book_table.set_filter(None)
+        self.book_table.set_rows(books)
+
+    def show_books_page(self, books):
+        """Exibe uma página de livros (ignorada enquanto há uma busca na tela)"""
+        if not self.searching:
+            self.book_table.set_rows(books)
+
+    def book_text(self, book):
+        """Texto indexado de um livro: os mesmos campos exibidos na tabela"""
+        return " ".join(str(value) for value in self.format_book(book))
+
+    def build_book_index(self, connection):
+        """Monta o índice de busca com todos os livros (executado fora da thread do Tk)"""
+        index = InvertedIndex()
+        for batch in self.query_books(connection):
+            for book in batch:
+                index.add(book[0], book, self.book_text(book))
+        return index
+
+    def ensure_book_index(self):
+        """Inicia a montagem do índice de busca se ele ainda não existe ou expirou"""
+        if self.book_index_loading:
+            return
+        if self.book_index is not None and not self.book_index.expired:
+            return
+        self.book_index_loading = True
+
+        def on_error(e):
+            self.book_index_loading = False
+            print(f"Erro ao montar o índice de busca de livros: {e}")
+
+        self.executor.submit(
+            self.build_book_index,
+            on_success=self.on_book_index_ready,
+            on_error=on_error,
+        )
+
+    def on_book_index_ready(self, index):
+        """Passa a usar o índice montado e reaplica a busca digitada, se houver"""
+        self.book_index = index
+        self.book_index_loading = False
+        try:
+            if self.search_entry.winfo_exists() and self.book_table.winfo_exists():
+                self.filter_books()
+        except Exception:
+            # A tela da lista de livros já foi fechada
+            pass
+
+    def refresh_indexed_book(self, livro_id):
+        """Atualiza um livro no índice de busca após uma gravação"""
+        if self.book_index is None or not self.ensure_connection():
+            return
+        rows = read_data(self.connection, BOOK_ROW_QUERY, (livro_id,))
+        if rows:
+            self.book_index.add(livro_id, rows[0], self.book_text(rows[0]))
+        else:
+            self.book_index.remove(livro_id)
+
     def export_to_csv(self):
-        """Exporta os dados exibidos na tabela para um arquivo CSV"""
+        """Exporta os livros para um arquivo CSV: o catálogo inteiro, ou o resultado da busca exibida"""
         try:
             # Abrir diálogo para salvar arquivo
             filename = filedialog.asksaveasfilename(
@@ -993,22 +907,48 @@ class BooksManagementInterface:
             if not filename:
                 return
 
-            # Obter dados da tabela
-            rows = [self.book_table.item(row, "values") for row in self.book_table.get_children()]
-
-            # Escrever dados no arquivo CSV
-            with open(filename, mode="w", newline="", encoding="utf-8") as file:
-                writer = csv.writer(file)
-                # Cabeçalhos
-                writer.writerow(["ID", "Título", "ISBN", "Ano", "Editora", "Cópias", "Estante", "Categoria", "Autores"])
-                # Dados
-                writer.writerows(rows)
+            # Com uma busca na tela, exporta o resultado exibido (após filtro e ordenação)
+            if self.searching:
+                self.write_books_csv(filename, [list(self.book_table.display_rows())])
+                messagebox.showinfo("Sucesso", f"Dados exportados com sucesso para {filename}")
+                return
 
-            messagebox.showinfo("Sucesso", f"Dados exportados com sucesso para {filename}")
+            # A tabela mostra só uma página: o catálogo inteiro é lido e gravado em lotes
+            # fora da thread do Tk
+            self.executor.submit(
+                self.export_books,
+                filename,
+                on_success=lambda total: messagebox.showinfo(
+                    "Sucesso", f"{total} livros exportados com sucesso para {filename}"
+                ),
+                on_error=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao exportar dados para CSV: {str(e)}"
+                ),
+            )
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao exportar dados para CSV: {str(e)}")
 
+    def export_books(self, connection, filename):
+        """Grava todos os livros no CSV, lote a lote (executado fora da thread do Tk)"""
+        batches = (
+            [self.format_book(book) for book in batch] for batch in self.query_books(connection)
+        )
+        return self.write_books_csv(filename, batches)
+
+    def write_books_csv(self, filename, batches):
+        """Escreve os lotes de linhas formatadas no arquivo CSV, retornando o total de linhas"""
+        total = 0
+        with open(filename, mode="w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            # Cabeçalhos
+            writer.writerow(["ID", "Título", "ISBN", "Ano", "Editora", "Cópias", "Estante", "Categoria", "Autores"])
+            # Dados
+            for batch in batches:
+                writer.writerows(batch)
+                total += len(batch)
+        return total
+
     def clear_fields(self):
         """Limpa todos os campos do formulário"""
         for entry in self.entries.values():
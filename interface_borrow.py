@@ -2,13 +2,15 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 from tkcalendar import DateEntry
 from datetime import datetime, timedelta
-from db_utils import (
-    get_database_connection,
-    create_insert_query,
-    insert_data,
-    read_data,
-    update_data,
-)
+from db_utils import get_database_connection
+from db_executor import DatabaseExecutor
+from search_controller import SearchController
+from virtual_grid import PageBar, VirtualGrid
+import services
+
+
+# Quantidade de livros e de usuários oferecidos em cada lista da tela de empréstimo
+CHOICES_LIMIT = 50
 
 
 class BorrowManagementInterface:
@@ -17,13 +19,28 @@ class BorrowManagementInterface:
     Esta classe fornece uma interface gráfica para criar e gerenciar empréstimos.
     """
 
-    def __init__(self, connection=None):
+    def __init__(self, connection=None, executor=None):
         self.connection = connection
+        # Executor das consultas em segundo plano (síncrono quando não informado)
+        self.executor = executor or DatabaseExecutor()
         self.borrow_frame = None
         self.main_frame = None
         self.book_combobox = None
         self.user_combobox = None
+        self.book_hint = None
+        self.user_hint = None
+        self.book_lookup = None
+        self.user_lookup = None
         self.return_date_entry = None
+        self.basket_listbox = None
+        # Botões desabilitados enquanto a gravação que eles dispararam está em andamento
+        self.confirm_buttons = ()
+        self.return_button = None
+        self.borrows_return_button = None
+        self.pay_button = None
+        self.reserve_button = None
+        # Livros escolhidos para o empréstimo em cesta: (livro_id, titulo)
+        self.basket = []
         self.books_data = []
         self.users_data = []
         self.button_style = {
@@ -37,11 +54,9 @@ class BorrowManagementInterface:
 
     def set_main_frame(self, main_frame):
         """Define o frame principal da interface"""
-        print(f"Configurando main_frame: {main_frame}")  # Debug
         if not main_frame:
             raise ValueError("Frame principal não pode ser None")
         self.main_frame = main_frame
-        print("Main frame configurado com sucesso!")  # Debug
 
     def clear_right_frames(self):
         """Limpa os frames do lado direito da interface"""
@@ -63,57 +78,140 @@ class BorrowManagementInterface:
                 return False
         return True
 
-    def fetch_available_books(self):
-        """Recupera livros disponíveis do banco de dados"""
-        if self.ensure_connection():
-            query = """
-                SELECT livro_id, titulo, quantidade_copias 
-                FROM livros 
-                WHERE quantidade_copias > 0
-            """
-            return read_data(self.connection, query)
-        return []
-
-    def fetch_users(self):
-        """Recupera usuários registrados do banco de dados"""
-        if self.ensure_connection():
-            query = "SELECT usuario_id, nome FROM usuarios"
-            return read_data(self.connection, query)
-        return []
-
-    def create_loan_entry(self, book_id, user_id, return_date):
-        """Cria um novo empréstimo no banco de dados"""
+    def submit_write(self, buttons, func, *args, on_success, error_message):
+        """
+        Executa uma gravação func(connection, *args) fora da thread do Tk, com os botões
+        desabilitados até o resultado, para que um clique repetido não grave duas vezes
+        """
+        for button in buttons:
+            button.config(state=tk.DISABLED)
+
+        def finish(callback, value):
+            for button in buttons:
+                if button.winfo_exists():
+                    button.config(state=tk.NORMAL)
+            callback(value)
+
+        self.executor.submit(
+            func,
+            *args,
+            on_success=lambda result: finish(on_success, result),
+            on_error=lambda e: finish(
+                lambda error: messagebox.showerror("Erro", f"{error_message}: {str(error)}"), e
+            ),
+        )
+
+    def screen_open(self, frame):
+        """Indica se a tela que pediu a gravação ainda está aberta"""
         try:
-            if not self.ensure_connection():
-                return False
+            return frame is not None and bool(frame.winfo_exists())
+        except tk.TclError:
+            return False
 
-            # Inserir empréstimo
-            columns = [
-                "livro_id",
-                "usuario_id",
-                "data_emprestimo",
-                "data_devolucao_prevista",
-                "status_emprestimo",
-            ]
-            query = create_insert_query("emprestimos", columns)
-            values = (book_id, user_id, datetime.now().date(), return_date, "Ativo")
-            insert_data(self.connection, query, values)
-
-            # Atualizar quantidade de livros
-            update_query = """
-                UPDATE livros 
-                SET quantidade_copias = quantidade_copias - 1 
-                WHERE livro_id = %s
-            """
-            insert_data(self.connection, update_query, (book_id,))
-
-            self.connection.commit()  # type: ignore
-            return True
+    def fetch_available_books(self, connection, text=""):
+        """Recupera os primeiros livros disponíveis cujo título começa com o texto (fora da thread do Tk)"""
+        return services.available_books_page(connection, text, limit=CHOICES_LIMIT)
+
+    def fetch_users(self, connection, text=""):
+        """Recupera os primeiros usuários cujo nome começa com o texto (fora da thread do Tk)"""
+        return services.user_choices_page(connection, text, limit=CHOICES_LIMIT)
+
+    def show_choices(self, combobox, hint, labels, page):
+        """Troca as opções de uma lista da tela de empréstimo pelo resultado da busca"""
+        combobox["values"] = labels
+        combobox.set("")
+        if page.next_key is not None:
+            hint.config(text=f"Mostrando os primeiros {len(labels)}: refine a busca")
+        else:
+            hint.config(text=f"{len(labels)} encontrado(s)")
+
+    def show_book_choices(self, page):
+        """Exibe os livros disponíveis encontrados na busca"""
+        self.books_data = page.rows
+        labels = [f"{book[1]} (Disponível: {book[2]})" for book in page.rows]
+        self.show_choices(self.book_combobox, self.book_hint, labels, page)
+
+    def show_user_choices(self, page):
+        """Exibe os usuários encontrados na busca"""
+        self.users_data = page.rows
+        labels = [f"{user[1]} (ID: {user[0]})" for user in page.rows]
+        self.show_choices(self.user_combobox, self.user_hint, labels, page)
+
+    def create_loan_entry(self, connection, book_id, user_id, return_date):
+        """
+        Cria um novo empréstimo no banco de dados (fora da thread do Tk).
+        Retorna o services.CheckoutResult (ok=False se o livro ficou sem cópias).
+        """
+        # Baixa condicional no estoque e empréstimo em uma única transação
+        return services.checkout(connection, book_id, user_id, return_date)
+
+    def create_basket_loans(self, connection, book_ids, user_id, return_date):
+        """
+        Empresta todos os livros da cesta em uma única transação (fora da thread do Tk).
+        Retorna um services.CheckoutResult por livro.
+        """
+        return services.checkout_many(connection, book_ids, user_id, return_date)
+
+    def add_to_basket(self):
+        """Adiciona o livro selecionado à cesta"""
+        book_index = self.book_combobox.current()  # type: ignore
+        if book_index < 0:
+            messagebox.showerror("Erro", "Selecione um livro")
+            return
+
+        book_id, title = self.books_data[book_index][:2]  # type: ignore
+        if any(item[0] == book_id for item in self.basket):
+            messagebox.showwarning("Aviso", "Este livro já está na cesta")
+            return
+        self.basket.append((book_id, title))
+        self.basket_listbox.insert(tk.END, title)  # type: ignore
+
+    def remove_from_basket(self):
+        """Remove os livros selecionados da cesta"""
+        for index in reversed(self.basket_listbox.curselection()):  # type: ignore
+            self.basket_listbox.delete(index)  # type: ignore
+            del self.basket[index]
+
+    def confirm_basket(self):
+        """Empresta os livros da cesta ao usuário selecionado, com um resultado por livro"""
+        try:
+            user_index = self.user_combobox.current()  # type: ignore
+            if not self.basket or user_index < 0:
+                messagebox.showerror("Erro", "Adicione livros à cesta e selecione um usuário")
+                return
+
+            user_id = self.users_data[user_index][0]  # type: ignore
+            return_date = self.return_date_entry.get_date()  # type: ignore
+            titles = dict(self.basket)
+            self.submit_write(
+                self.confirm_buttons,
+                self.create_basket_loans,
+                [item[0] for item in self.basket],
+                user_id,
+                return_date,
+                on_success=lambda results: self.show_basket_result(
+                    self.borrow_frame, titles, results
+                ),
+                error_message="Falha ao realizar os empréstimos da cesta",
+            )
         except Exception as e:
-            print(f"Erro ao criar empréstimo: {e}")
-            if self.connection:
-                self.connection.rollback()
-            return False
+            messagebox.showerror("Erro", f"Erro ao processar a cesta: {str(e)}")
+
+    def show_basket_result(self, frame, titles, results):
+        """Mostra o resultado de cada livro da cesta e atualiza a tela de empréstimo"""
+        lines = "\n".join(f"{titles[result.livro_id]}: {result.mensagem}" for result in results)
+        lent = sum(result.ok for result in results)
+        if lent == len(results):
+            messagebox.showinfo("Sucesso", lines)
+            if self.screen_open(frame):
+                self.clear_right_frames()
+        else:
+            # Os livros com cópia foram emprestados; recarrega a lista de disponíveis
+            messagebox.showwarning(
+                "Cesta", f"{lent} de {len(results)} livros emprestados:\n{lines}"
+            )
+            if self.screen_open(frame):
+                self.borrow_interface()
 
     def confirm_loan(self):
         """Confirma o empréstimo após validações"""
@@ -129,18 +227,34 @@ class BorrowManagementInterface:
             user_id = self.users_data[user_index][0]  # type: ignore
             return_date = self.return_date_entry.get_date()  # type: ignore
 
-            if self.create_loan_entry(book_id, user_id, return_date):
-                messagebox.showinfo("Sucesso", "Empréstimo realizado com sucesso!")
-                self.clear_right_frames()
-            else:
-                messagebox.showerror("Erro", "Falha ao realizar empréstimo")
+            frame = self.borrow_frame
+            self.submit_write(
+                self.confirm_buttons,
+                self.create_loan_entry,
+                book_id,
+                user_id,
+                return_date,
+                on_success=lambda result: self.show_loan_result(frame, result),
+                error_message="Falha ao realizar empréstimo",
+            )
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao processar empréstimo: {str(e)}")
 
+    def show_loan_result(self, frame, result):
+        """Mostra o resultado do empréstimo e atualiza a tela de empréstimo"""
+        if result.ok:
+            messagebox.showinfo("Sucesso", result.mensagem)
+            if self.screen_open(frame):
+                self.clear_right_frames()
+        else:
+            # Outro balcão levou a última cópia: recarrega a lista de livros disponíveis
+            messagebox.showwarning("Indisponível", result.mensagem)
+            if self.screen_open(frame):
+                self.borrow_interface()
+
     def borrow_interface(self):
         """Interface principal para empréstimo de livros"""
         try:
-            print("Iniciando criação da interface de empréstimo...")  # Debug
             if not self.main_frame:
                 messagebox.showerror("Erro", "Frame principal não inicializado!")
                 return
@@ -153,32 +267,67 @@ class BorrowManagementInterface:
             )
             self.borrow_frame.grid(row=0, column=1, sticky="nsew", padx=10, pady=5)
 
-            # Carregar dados
-            self.books_data = self.fetch_available_books()
-            self.users_data = self.fetch_users()
+            self.books_data = []
+            self.users_data = []
 
-            # Livros disponíveis
-            tk.Label(self.borrow_frame, text="Livro:").grid(
+            # Livros disponíveis: a lista mostra só os primeiros resultados da busca pelo título
+            tk.Label(self.borrow_frame, text="Livro (início do título):").grid(
                 row=0, column=0, pady=5, sticky=tk.W
             )
-            self.book_combobox = ttk.Combobox(self.borrow_frame, width=40)
-            self.book_combobox["values"] = [
-                f"{book[1]} (Disponível: {book[2]})"  # type: ignore
-                for book in self.books_data  # type: ignore
-            ]  # type: ignore
-            self.book_combobox.grid(row=1, column=0, pady=5)
+            book_search_entry = tk.Entry(self.borrow_frame, width=43)
+            book_search_entry.grid(row=1, column=0, pady=2)
+            self.book_combobox = ttk.Combobox(self.borrow_frame, width=40, state="readonly")
+            self.book_combobox.grid(row=2, column=0, pady=2)
+            self.book_hint = tk.Label(self.borrow_frame, text="Carregando...", fg="gray")
+            self.book_hint.grid(row=3, column=0, sticky=tk.W)
+
+            # Cesta: vários livros emprestados ao mesmo usuário de uma vez
+            self.basket = []
+            basket_buttons = tk.Frame(self.borrow_frame)
+            basket_buttons.grid(row=4, column=0, pady=5)
+            tk.Button(
+                basket_buttons, text="Adicionar à Cesta", command=self.add_to_basket
+            ).pack(side=tk.LEFT, padx=5)
+            tk.Button(
+                basket_buttons, text="Remover da Cesta", command=self.remove_from_basket
+            ).pack(side=tk.LEFT, padx=5)
+            self.basket_listbox = tk.Listbox(
+                self.borrow_frame, width=43, height=5, selectmode=tk.EXTENDED
+            )
+            self.basket_listbox.grid(row=5, column=0, pady=5)
 
-            # Usuários
-            tk.Label(self.borrow_frame, text="Usuário:").grid(
-                row=2, column=0, pady=5, sticky=tk.W
+            # Usuários: a lista mostra só os primeiros resultados da busca pelo nome
+            tk.Label(self.borrow_frame, text="Usuário (início do nome):").grid(
+                row=6, column=0, pady=5, sticky=tk.W
+            )
+            user_search_entry = tk.Entry(self.borrow_frame, width=43)
+            user_search_entry.grid(row=7, column=0, pady=2)
+            self.user_combobox = ttk.Combobox(self.borrow_frame, width=40, state="readonly")
+            self.user_combobox.grid(row=8, column=0, pady=2)
+            self.user_hint = tk.Label(self.borrow_frame, text="Carregando...", fg="gray")
+            self.user_hint.grid(row=9, column=0, sticky=tk.W)
+
+            # Buscas em segundo plano; digitar dispara uma nova busca, que descarta a anterior
+            self.book_lookup = SearchController(
+                self.borrow_frame,
+                self.executor,
+                self.fetch_available_books,
+                on_result=self.show_book_choices,
+                on_error=lambda e: messagebox.showerror("Erro", f"Erro ao carregar livros: {str(e)}"),
+            )
+            self.book_lookup.bind(book_search_entry)
+            self.user_lookup = SearchController(
+                self.borrow_frame,
+                self.executor,
+                self.fetch_users,
+                on_result=self.show_user_choices,
+                on_error=lambda e: messagebox.showerror("Erro", f"Erro ao carregar usuários: {str(e)}"),
             )
-            self.user_combobox = ttk.Combobox(self.borrow_frame, width=40)
-            self.user_combobox["values"] = [user[1] for user in self.users_data]  # type: ignore
-            self.user_combobox.grid(row=3, column=0, pady=5)
+            self.user_lookup.bind(user_search_entry)
 
             # Data de devolução prevista
             tk.Label(self.borrow_frame, text="Data de Devolução Prevista:").grid(
-                row=4, column=0, pady=5, sticky=tk.W
+                row=10, column=0, pady=5, sticky=tk.W
             )
             self.return_date_entry = DateEntry(
                 self.borrow_frame,
@@ -188,96 +337,58 @@ class BorrowManagementInterface:
                 maxdate=datetime.now().date() + timedelta(days=30),
             )
             self.return_date_entry.set_date(datetime.now().date() + timedelta(days=14))
-            self.return_date_entry.grid(row=5, column=0, pady=5)
+            self.return_date_entry.grid(row=11, column=0, pady=5)
 
-            # Botão confirmar
-            tk.Button(
+            # Botões confirmar: o livro selecionado ou todos os livros da cesta
+            confirm_button = tk.Button(
                 self.borrow_frame,
                 text="Confirmar Empréstimo",
                 command=self.confirm_loan,
                 **self.button_style,
-            ).grid(row=6, column=0, pady=20)
+            )
+            confirm_button.grid(row=12, column=0, pady=(20, 5))
+            basket_button = tk.Button(
+                self.borrow_frame,
+                text="Emprestar Cesta",
+                command=self.confirm_basket,
+                **self.button_style,
+            )
+            basket_button.grid(row=13, column=0, pady=(5, 20))
+            self.confirm_buttons = (confirm_button, basket_button)
 
-            print("Interface de empréstimo criada com sucesso!")  # Debug
+            # Primeira página de cada lista
+            self.book_lookup.trigger("")
+            self.user_lookup.trigger("")
 
         except Exception as e:
-            print(f"Erro ao criar interface: {str(e)}")  # Debug
             messagebox.showerror("Erro", f"Erro ao criar interface: {str(e)}")
 
-    def fetch_active_loans(self, usuario_id):
+    def fetch_active_loans(self, connection, usuario_id):
         """Recupera os empréstimos ativos de um usuário"""
-        if self.ensure_connection():
-            query = f"""
-                SELECT e.emprestimo_id, e.livro_id, l.titulo, 
-                    e.data_emprestimo, e.data_devolucao_prevista
-                FROM emprestimos e
-                JOIN livros l ON e.livro_id = l.livro_id
-                WHERE e.usuario_id = {int(usuario_id)} 
-                AND e.status_emprestimo = 'Ativo'
-            """
-            return read_data(self.connection, query)
-        return []
-
-    def update_loan_status(self, emprestimo_id):
-        """Atualiza o status do empréstimo para Devolvido"""
-        if self.ensure_connection():
-            try:
-                emprestimo_id = int(emprestimo_id)  # Garantir que é um inteiro
-                current_date = datetime.now().date()
-
-                # Atualizar empréstimo
-                update_query = f"""
-                    UPDATE emprestimos 
-                    SET status_emprestimo = 'Devolvido',
-                        data_devolucao_real = '{current_date}'
-                    WHERE emprestimo_id = {emprestimo_id}
-                """
-                update_data(self.connection, update_query, None)
-
-                # Recuperar livro_id
-                query = f"SELECT livro_id FROM emprestimos WHERE emprestimo_id = {emprestimo_id}"
-                result = read_data(self.connection, query)
-                if result:
-                    livro_id = int(result[0][0])  # type: ignore # Garantir que é um inteiro
-                    # Atualizar quantidade de livros
-                    update_query = f"""
-                        UPDATE livros 
-                        SET quantidade_copias = quantidade_copias + 1 
-                        WHERE livro_id = {livro_id}
-                    """
-                    update_data(self.connection, update_query, None)
-
-                self.connection.commit()  # type: ignore
-                return True
-            except Exception as e:
-                print(f"Erro ao atualizar status: {e}")
-                self.connection.rollback()  # type: ignore
-                return False
-        return False
-
-    def generate_fine(self, emprestimo_id, dias_atraso):
-        """Gera uma multa para empréstimo com atraso"""
-        if self.ensure_connection():
-            try:
-                valor_multa = float("2.00") * dias_atraso
-                columns = ["emprestimo_id", "valor", "status_multas", "data_geracao"]
-                query = create_insert_query("multas", columns)
-                values = (emprestimo_id, valor_multa, "Devendo", datetime.now().date())
-                insert_data(self.connection, query, values)
-                self.connection.commit()  # type: ignore
-                return valor_multa
-            except Exception as e:
-                print(f"Erro ao gerar multa: {e}")
-                self.connection.rollback()  # type: ignore
-                return None
-        return None
+        return services.active_loans(connection, usuario_id)
+
+    def update_loan_status(self, connection, emprestimo_id):
+        """Atualiza o status do empréstimo para Devolvido (fora da thread do Tk)"""
+        try:
+            result = services.return_loan(connection, emprestimo_id, generate_fines=False)
+            return result.devolvido
+        except Exception as e:
+            print(f"Erro ao atualizar status: {e}")
+            return False
+
+    def generate_fine(self, connection, emprestimo_id, dias_atraso):
+        """Gera uma multa para empréstimo com atraso (fora da thread do Tk)"""
+        try:
+            return services.generate_fine(connection, emprestimo_id, dias_atraso)
+        except Exception as e:
+            print(f"Erro ao gerar multa: {e}")
+            return None
 
     def load_active_loans(self):
         """Carrega e exibe os empréstimos ativos"""
         try:
             # Limpar dados existentes
-            for item in self.loans_tree.get_children():
-                self.loans_tree.delete(item)
+            self.loans_tree.clear()
 
             # Carregar empréstimos ativos
             usuario_id = self.user_id_entry.get()
@@ -285,13 +396,23 @@ class BorrowManagementInterface:
                 messagebox.showwarning("Aviso", "Digite o ID do usuário")
                 return
 
-            loans = self.fetch_active_loans(usuario_id)
-            for loan in loans:  # type: ignore
-                self.loans_tree.insert("", "end", values=loan)  # type: ignore
+            self.executor.submit(
+                self.fetch_active_loans,
+                usuario_id,
+                on_success=self.show_active_loans,
+                on_error=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao carregar empréstimos: {str(e)}"
+                ),
+                widget=self.loans_tree,
+            )
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar empréstimos: {str(e)}")
 
+    def show_active_loans(self, loans):
+        """Exibe os empréstimos ativos na TreeView"""
+        self.loans_tree.set_rows(loans or [])
+
     def return_interface(self):
         """Interface principal para devolução de livros"""
         try:
@@ -315,26 +436,18 @@ class BorrowManagementInterface:
                 user_frame, text="Buscar Empréstimos", command=self.load_active_loans
             ).grid(row=0, column=2, padx=5)
 
-            # Treeview para lista de empréstimos
-            self.loans_tree = ttk.Treeview(
+            # Tabela virtualizada para lista de empréstimos
+            self.loans_tree = VirtualGrid(
                 return_frame,
-                columns=(
+                (
                     "ID",
                     "Livro ID",
                     "Título",
                     "Data Empréstimo",
                     "Data Prevista",
                 ),
-                show="headings",
             )
 
-            # Configurar colunas
-            self.loans_tree.heading("ID", text="ID")
-            self.loans_tree.heading("Livro ID", text="Livro ID")
-            self.loans_tree.heading("Título", text="Título")
-            self.loans_tree.heading("Data Empréstimo", text="Data Empréstimo")
-            self.loans_tree.heading("Data Prevista", text="Data Prevista")
-
             self.loans_tree.column("ID", width=50)
             self.loans_tree.column("Livro ID", width=70)
             self.loans_tree.column("Título", width=200)
@@ -343,17 +456,11 @@ class BorrowManagementInterface:
 
             self.loans_tree.grid(row=1, column=0, pady=10, sticky="nsew")
 
-            # Scrollbar
-            scrollbar = ttk.Scrollbar(
-                return_frame, orient="vertical", command=self.loans_tree.yview
-            )
-            scrollbar.grid(row=1, column=1, sticky="ns")
-            self.loans_tree.configure(yscrollcommand=scrollbar.set)
-
             # Botão de devolução
-            ttk.Button(
+            self.return_button = ttk.Button(
                 return_frame, text="Confirmar Devolução", command=self.process_return_from_interface  # type: ignore
-            ).grid(row=2, column=0, pady=10)
+            )
+            self.return_button.grid(row=2, column=0, pady=10)
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao criar interface: {str(e)}")
@@ -361,139 +468,117 @@ class BorrowManagementInterface:
     def process_return_from_interface(self):
         """Processa a devolução dos livros selecionados na interface de retorno"""
         try:
-            selected_items = self.loans_tree.selection()
-            if not selected_items:
+            selected_rows = self.loans_tree.selected_rows()
+            if not selected_rows:
                 messagebox.showwarning(
                     "Aviso", "Selecione pelo menos um livro para devolução"
                 )
                 return
 
-            success_count = 0
-            multas_geradas = []
-
-            for item in selected_items:
-                emprestimo_id = self.loans_tree.item(item)["values"][0]
-                data_prevista = datetime.strptime(
-                    self.loans_tree.item(item)["values"][4], "%Y-%m-%d"
-                ).date()
-
-                # Calcular atraso
-                dias_atraso = (datetime.now().date() - data_prevista).days
-
-                # Processar devolução
-                if self.process_return(emprestimo_id):
-                    success_count += 1
-                    # Gerar multa se houver atraso
-                    if dias_atraso > 0:
-                        valor_multa = self.generate_fine(emprestimo_id, dias_atraso)
-                        if valor_multa:
-                            multas_geradas.append((emprestimo_id, valor_multa))
-
-            # Feedback ao usuário
-            if success_count > 0:
-                if multas_geradas:
-                    multas_msg = "\n".join(
-                        [
-                            f"Empréstimo {emp_id}: R$ {valor:.2f}"
-                            for emp_id, valor in multas_geradas
-                        ]
-                    )
-                    messagebox.showinfo(
-                        "Devolução Realizada",
-                        f"Devolução processada com sucesso!\n\n"
-                        f"Multas geradas:\n{multas_msg}",
-                    )
-                else:
-                    messagebox.showinfo(
-                        "Devolução Realizada",
-                        "Devolução processada com sucesso!\nNenhuma multa gerada.",
-                    )
-                self.load_active_loans()  # Atualiza a lista
-            else:
-                messagebox.showinfo(
-                    "Aviso",
-                    "Nenhuma devolução foi processada. Verifique os itens selecionados.",
-                )
+            # Processar devoluções (a multa por atraso é gerada na mesma transação)
+            frame = self.loans_tree
+            self.submit_write(
+                (self.return_button,),
+                self.return_loans,
+                [loan[0] for loan in selected_rows],
+                on_success=lambda returned: self.show_return_result(frame, *returned),
+                error_message="Erro ao processar devolução",
+            )
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao processar devolução: {str(e)}")
 
-    def fetch_user_fines(self, usuario_id):
+    def show_return_result(self, frame, success_count, multas_geradas):
+        """Mostra o resultado das devoluções feitas na interface de retorno"""
+        if success_count > 0:
+            if multas_geradas:
+                multas_msg = "\n".join(
+                    [
+                        f"Empréstimo {emp_id}: R$ {valor:.2f}"
+                        for emp_id, valor in multas_geradas
+                    ]
+                )
+                messagebox.showinfo(
+                    "Devolução Realizada",
+                    f"Devolução processada com sucesso!\n\n"
+                    f"Multas geradas:\n{multas_msg}",
+                )
+            else:
+                messagebox.showinfo(
+                    "Devolução Realizada",
+                    "Devolução processada com sucesso!\nNenhuma multa gerada.",
+                )
+            if self.screen_open(frame):
+                self.load_active_loans()  # Atualiza a lista
+        else:
+            messagebox.showinfo(
+                "Aviso",
+                "Nenhuma devolução foi processada. Verifique os itens selecionados.",
+            )
+
+    def fetch_user_fines(self, connection, usuario_id):
         """Recupera todas as multas de um usuário específico"""
-        if self.ensure_connection():
-            query = f"""
-                SELECT m.multa_id, m.emprestimo_id, m.valor, 
-                       m.status_multas, m.data_geracao, m.data_pagamento
-                FROM multas m
-                JOIN emprestimos e ON m.emprestimo_id = e.emprestimo_id
-                WHERE e.usuario_id = {usuario_id}
-                ORDER BY m.data_geracao DESC
-            """
-            return read_data(self.connection, query)
-        return []
-
-    def update_fine_status(self, multa_id):
-        """Atualiza o status da multa para Quitado"""
-        if self.ensure_connection():
-            try:
-                multa_id = int(multa_id)
-                current_date = datetime.now().date()
-
-                update_query = f"""
-                    UPDATE multas 
-                    SET status_multas = 'Quitado',
-                        data_pagamento = '{current_date}'
-                    WHERE multa_id = {multa_id}
-                    AND status_multas = 'Devendo'
-                """
-                update_data(self.connection, update_query, None)
-                self.connection.commit()  # type: ignore
-                return True
-            except Exception as e:
-                print(f"Erro ao atualizar multa: {e}")
-                self.connection.rollback()  # type: ignore
-                return False
-        return False
+        return services.user_fines(connection, usuario_id)
+
+    def fetch_user_fines_page(self, connection, usuario_id, after=None, limit=None):
+        """Recupera uma página das multas de um usuário, das mais recentes para as mais antigas"""
+        return services.user_fines_page(connection, usuario_id, after, limit)
+
+    def update_fine_status(self, connection, multa_id):
+        """Atualiza o status da multa para Quitado (fora da thread do Tk)"""
+        return self.update_fines_status(connection, [multa_id]) > 0
+
+    def update_fines_status(self, connection, multa_ids):
+        """Atualiza o status de várias multas para Quitado em lote (fora da thread do Tk)"""
+        return services.pay_fines(connection, multa_ids)
 
     def process_payment(self):
         """Processa o pagamento das multas selecionadas"""
         try:
-            selected_items = self.fines_tree.selection()
-            if not selected_items:
+            selected_rows = self.fines_tree.selected_rows()
+            if not selected_rows:
                 messagebox.showwarning(
                     "Aviso", "Selecione pelo menos uma multa para quitar"
                 )
                 return
 
-            success_count = 0
-            for item in selected_items:
-                multa_id = self.fines_tree.item(item)["values"][0]
-                status = self.fines_tree.item(item)["values"][3]
-
-                if status == "Devendo":
-                    if self.update_fine_status(multa_id):
-                        success_count += 1
+            # Quitar todas as multas pendentes selecionadas em um único lote
+            multa_ids = [fine[0] for fine in selected_rows if fine[3] == "Devendo"]
+            if not multa_ids:
+                self.show_payment_result(None, 0)
+                return
 
-            if success_count > 0:
-                messagebox.showinfo(
-                    "Sucesso", f"{success_count} multa(s) quitada(s) com sucesso!"
-                )
-                self.load_user_fines()  # Atualiza a lista
-            else:
-                messagebox.showinfo(
-                    "Aviso",
-                    "Nenhuma multa foi atualizada. Verifique se as multas selecionadas já estão quitadas.",
-                )
+            frame = self.fines_tree
+            self.submit_write(
+                (self.pay_button,),
+                self.update_fines_status,
+                multa_ids,
+                on_success=lambda success_count: self.show_payment_result(frame, success_count),
+                error_message="Erro ao processar pagamento",
+            )
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao processar pagamento: {str(e)}")
 
+    def show_payment_result(self, frame, success_count):
+        """Mostra quantas multas foram quitadas e atualiza a lista"""
+        if success_count > 0:
+            messagebox.showinfo(
+                "Sucesso", f"{success_count} multa(s) quitada(s) com sucesso!"
+            )
+            if self.screen_open(frame):
+                self.load_user_fines()  # Atualiza a lista
+        else:
+            messagebox.showinfo(
+                "Aviso",
+                "Nenhuma multa foi atualizada. Verifique se as multas selecionadas já estão quitadas.",
+            )
+
     def load_user_fines(self):
         """Carrega e exibe as multas do usuário"""
         try:
             # Limpar dados existentes
-            for item in self.fines_tree.get_children():
-                self.fines_tree.delete(item)
+            self.fines_tree.clear()
 
             # Carregar multas
             usuario_id = self.user_id_entry.get()
@@ -501,19 +586,24 @@ class BorrowManagementInterface:
                 messagebox.showwarning("Aviso", "Digite o ID do usuário")
                 return
 
-            fines = self.fetch_user_fines(usuario_id)
-            for fine in fines:  # type: ignore
-                # Formatar valores para exibição
-                formatted_fine = list(fine)
-                formatted_fine[2] = f"R$ {float(fine[2]):.2f}"  # type: ignore  # type: ignore # Formatar valor
-                formatted_fine[4] = fine[4].strftime("%Y-%m-%d")  # type: ignore # Formatar data geração
-                if fine[5]:  # type: ignore # Data pagamento
-                    formatted_fine[5] = fine[5].strftime("%Y-%m-%d")  # type: ignore
-                self.fines_tree.insert("", "end", values=formatted_fine)
+            self.fines_pages.reload(usuario_id)
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar multas: {str(e)}")
 
+    def show_user_fines(self, fines):
+        """Exibe as multas do usuário na TreeView"""
+        self.fines_tree.set_rows(fines or [])
+
+    def format_fine(self, fine):
+        """Formata uma multa para exibição (chamado apenas para as linhas visíveis)"""
+        formatted_fine = list(fine)
+        formatted_fine[2] = f"R$ {float(fine[2]):.2f}"  # Formatar valor
+        formatted_fine[4] = fine[4].strftime("%Y-%m-%d")  # Formatar data geração
+        if fine[5]:  # Data pagamento
+            formatted_fine[5] = fine[5].strftime("%Y-%m-%d")
+        return formatted_fine
+
     def fine_interface(self):
         """Interface principal para gerenciamento de multas"""
         try:
@@ -537,10 +627,10 @@ class BorrowManagementInterface:
                 user_frame, text="Buscar Multas", command=self.load_user_fines
             ).grid(row=0, column=2, padx=5)
 
-            # Treeview para lista de multas
-            self.fines_tree = ttk.Treeview(
+            # Tabela virtualizada para lista de multas
+            self.fines_tree = VirtualGrid(
                 fine_frame,
-                columns=(
+                (
                     "ID",
                     "Empréstimo ID",
                     "Valor",
@@ -548,17 +638,9 @@ class BorrowManagementInterface:
                     "Data Geração",
                     "Data Pagamento",
                 ),
-                show="headings",
+                formatter=self.format_fine,
             )
 
-            # Configurar colunas
-            self.fines_tree.heading("ID", text="ID")
-            self.fines_tree.heading("Empréstimo ID", text="Empréstimo ID")
-            self.fines_tree.heading("Valor", text="Valor")
-            self.fines_tree.heading("Status", text="Status")
-            self.fines_tree.heading("Data Geração", text="Data Geração")
-            self.fines_tree.heading("Data Pagamento", text="Data Pagamento")
-
             # Ajustar largura das colunas
             self.fines_tree.column("ID", width=50)
             self.fines_tree.column("Empréstimo ID", width=100)
@@ -569,17 +651,23 @@ class BorrowManagementInterface:
 
             self.fines_tree.grid(row=1, column=0, pady=10, sticky="nsew")
 
-            # Scrollbar
-            scrollbar = ttk.Scrollbar(
-                fine_frame, orient="vertical", command=self.fines_tree.yview
+            # Navegação por páginas
+            self.fines_pages = PageBar(
+                fine_frame,
+                self.executor,
+                self.fetch_user_fines_page,
+                self.show_user_fines,
+                on_error=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao carregar multas: {str(e)}"
+                ),
             )
-            scrollbar.grid(row=1, column=1, sticky="ns")
-            self.fines_tree.configure(yscrollcommand=scrollbar.set)
+            self.fines_pages.grid(row=2, column=0)
 
             # Botão para quitar multas
-            ttk.Button(
+            self.pay_button = ttk.Button(
                 fine_frame, text="Marcar como Quitado", command=self.process_payment
-            ).grid(row=2, column=0, pady=10)
+            )
+            self.pay_button.grid(row=3, column=0, pady=10)
 
             # Configurar expansão do grid
             fine_frame.grid_columnconfigure(0, weight=1)
@@ -588,137 +676,97 @@ class BorrowManagementInterface:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao criar interface: {str(e)}")
 
-    def fetch_user_borrows(self, usuario_id):
+    def fetch_user_borrows(self, connection, usuario_id):
         """Recupera todos os empréstimos de um usuário específico"""
-        if self.ensure_connection():
-            query = f"""
-                SELECT e.emprestimo_id, e.livro_id, l.titulo, 
-                       e.data_emprestimo, e.data_devolucao_prevista,
-                       e.data_devolucao_real, e.status_emprestimo
-                FROM emprestimos e
-                JOIN livros l ON e.livro_id = l.livro_id
-                WHERE e.usuario_id = {usuario_id}
-                ORDER BY e.data_emprestimo DESC
-            """
-            return read_data(self.connection, query)
-        return []
-
-    def process_return(self, emprestimo_id):
-        """Processa a devolução de um empréstimo e gera multa se necessário"""
-        if self.ensure_connection():
-            try:
-                emprestimo_id = int(emprestimo_id)
-                current_date = datetime.now().date()
-
-                # Buscar informações do empréstimo
-                query = f"""
-                    SELECT data_devolucao_prevista, livro_id 
-                    FROM emprestimos 
-                    WHERE emprestimo_id = {emprestimo_id}
-                """
-                result = read_data(self.connection, query)
-
-                if not result:
-                    return False
-
-                data_prevista = result[0][0]  # type: ignore
-                livro_id = result[0][1]  # type: ignore
-
-                # Calcular atraso
-                dias_atraso = (current_date - data_prevista).days # type: ignore
-
-                # Atualizar status do empréstimo
-                update_query = f"""
-                    UPDATE emprestimos 
-                    SET status_emprestimo = 'Devolvido',
-                        data_devolucao_real = '{current_date}'
-                    WHERE emprestimo_id = {emprestimo_id}
-                    AND status_emprestimo = 'Ativo'
-                """
-                update_data(self.connection, update_query, None)
-
-                # Atualizar quantidade de livros disponíveis
-                update_query = f"""
-                    UPDATE livros 
-                    SET quantidade_copias = quantidade_copias + 1 
-                    WHERE livro_id = {livro_id}
-                """
-                update_data(self.connection, update_query, None)
-
-                # Gerar multa se houver atraso
-                multa_valor = None
-                if dias_atraso > 0:
-                    multa_valor = self.generate_fine(emprestimo_id, dias_atraso)
-
-                self.connection.commit()  # type: ignore
-                return multa_valor if dias_atraso > 0 else True
-
-            except Exception as e:
-                print(f"Erro ao processar devolução: {e}")
-                self.connection.rollback()  # type: ignore
-                return False
-            return False
+        return services.user_loans(connection, usuario_id)
+
+    def fetch_user_borrows_page(self, connection, usuario_id, after=None, limit=None):
+        """Recupera uma página dos empréstimos de um usuário, dos mais recentes para os mais antigos"""
+        return services.user_loans_page(connection, usuario_id, after, limit)
+
+    def process_return(self, connection, emprestimo_id):
+        """
+        Processa a devolução de um empréstimo e gera multa se necessário (fora da thread do Tk).
+        Retorna o services.ReturnResult, ou None em caso de erro.
+        """
+        try:
+            return services.return_loan(connection, emprestimo_id)
+        except Exception as e:
+            print(f"Erro ao processar devolução: {e}")
+        return None
+
+    def return_loans(self, connection, emprestimo_ids):
+        """
+        Devolve os empréstimos informados, cada um na sua transação (fora da thread do Tk).
+        Retorna (quantidade devolvida, [(emprestimo_id, multa gerada)]).
+        """
+        success_count = 0
+        multas_geradas = []
+        for emprestimo_id in emprestimo_ids:
+            result = self.process_return(connection, emprestimo_id)
+            if result and result.devolvido:
+                success_count += 1
+                if result.multa:
+                    multas_geradas.append((emprestimo_id, result.multa))
+        return success_count, multas_geradas
 
     def process_selected_returns(self):
         """Processa a devolução dos empréstimos selecionados"""
         try:
-            selected_items = self.borrows_tree.selection()
-            if not selected_items:
+            selected_rows = self.borrows_tree.selected_rows()
+            if not selected_rows:
                 messagebox.showwarning(
                     "Aviso", "Selecione pelo menos um empréstimo para retorno"
                 )
                 return
 
-            multas_geradas = []
-            success_count = 0
-
-            for item in selected_items:
-                emprestimo_id = self.borrows_tree.item(item)["values"][0]
-                status = self.borrows_tree.item(item)["values"][6]
-
-                if status == "Ativo":
-                    result = self.process_return(emprestimo_id)
-                    if result:
-                        success_count += 1
-                        if isinstance(result, float):  # Se retornou valor de multa
-                            multas_geradas.append((emprestimo_id, result))
-
-            # Feedback ao usuário
-            if success_count > 0:
-                if multas_geradas:
-                    multas_msg = "\n".join(
-                        [
-                            f"Empréstimo {emp_id}: R$ {valor:.2f}"
-                            for emp_id, valor in multas_geradas
-                        ]
-                    )
-                    messagebox.showinfo(
-                        "Devolução Realizada",
-                        f"{success_count} empréstimo(s) processado(s) com sucesso!\n\n"
-                        f"Multas geradas:\n{multas_msg}",
-                    )
-                else:
-                    messagebox.showinfo(
-                        "Devolução Realizada",
-                        f"{success_count} empréstimo(s) processado(s) com sucesso!\n"
-                        "Nenhuma multa gerada.",
-                    )
-                self.load_user_borrows()  # Atualiza a lista
-            else:
-                messagebox.showinfo(
-                    "Aviso",
-                    "Nenhum empréstimo foi processado. Verifique se os empréstimos selecionados estão ativos.",
-                )
+            # Apenas os empréstimos ativos são devolvidos
+            frame = self.borrows_tree
+            self.submit_write(
+                (self.borrows_return_button,),
+                self.return_loans,
+                [borrow[0] for borrow in selected_rows if borrow[6] == "Ativo"],
+                on_success=lambda returned: self.show_selected_returns_result(frame, *returned),
+                error_message="Erro ao processar retornos",
+            )
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao processar retornos: {str(e)}")
 
+    def show_selected_returns_result(self, frame, success_count, multas_geradas):
+        """Mostra o resultado das devoluções feitas na visualização de empréstimos"""
+        if success_count > 0:
+            if multas_geradas:
+                multas_msg = "\n".join(
+                    [
+                        f"Empréstimo {emp_id}: R$ {valor:.2f}"
+                        for emp_id, valor in multas_geradas
+                    ]
+                )
+                messagebox.showinfo(
+                    "Devolução Realizada",
+                    f"{success_count} empréstimo(s) processado(s) com sucesso!\n\n"
+                    f"Multas geradas:\n{multas_msg}",
+                )
+            else:
+                messagebox.showinfo(
+                    "Devolução Realizada",
+                    f"{success_count} empréstimo(s) processado(s) com sucesso!\n"
+                    "Nenhuma multa gerada.",
+                )
+            if self.screen_open(frame):
+                self.load_user_borrows()  # Atualiza a lista
+        else:
+            messagebox.showinfo(
+                "Aviso",
+                "Nenhum empréstimo foi processado. Verifique se os empréstimos selecionados estão ativos.",
+            )
+
     def load_user_borrows(self):
         """Carrega e exibe os empréstimos do usuário"""
         try:
             # Limpar dados existentes
-            for item in self.borrows_tree.get_children():
-                self.borrows_tree.delete(item)
+            self.borrows_tree.clear()
 
             # Carregar empréstimos
             usuario_id = self.user_id_entry.get()
@@ -726,23 +774,24 @@ class BorrowManagementInterface:
                 messagebox.showwarning("Aviso", "Digite o ID do usuário")
                 return
 
-            borrows = self.fetch_user_borrows(usuario_id)
-            for borrow in borrows:  # type: ignore
-                # Formatar valores para exibição
-                formatted_borrow = list(borrow)
-                formatted_borrow[3] = borrow[3].strftime(  # type: ignore
-                    "%Y-%m-%d"
-                )  # data_emprestimo # type: ignore
-                formatted_borrow[4] = borrow[4].strftime(  # type: ignore
-                    "%Y-%m-%d"
-                )  # data_devolucao_prevista # type: ignore
-                if borrow[5]:  # data_devolucao_real # type: ignore
-                    formatted_borrow[5] = borrow[5].strftime("%Y-%m-%d")  # type: ignore
-                self.borrows_tree.insert("", "end", values=formatted_borrow)
+            self.borrows_pages.reload(usuario_id)
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar empréstimos: {str(e)}")
 
+    def show_user_borrows(self, borrows):
+        """Exibe os empréstimos do usuário na TreeView"""
+        self.borrows_tree.set_rows(borrows or [])
+
+    def format_borrow(self, borrow):
+        """Formata um empréstimo para exibição (chamado apenas para as linhas visíveis)"""
+        formatted_borrow = list(borrow)
+        formatted_borrow[3] = borrow[3].strftime("%Y-%m-%d")  # data_emprestimo
+        formatted_borrow[4] = borrow[4].strftime("%Y-%m-%d")  # data_devolucao_prevista
+        if borrow[5]:  # data_devolucao_real
+            formatted_borrow[5] = borrow[5].strftime("%Y-%m-%d")
+        return formatted_borrow
+
     def print_borrow_interface(self):
         """Interface principal para visualização e gerenciamento de empréstimos"""
         try:
@@ -766,10 +815,10 @@ class BorrowManagementInterface:
                 user_frame, text="Buscar Empréstimos", command=self.load_user_borrows
             ).grid(row=0, column=2, padx=5)
 
-            # Treeview para lista de empréstimos
-            self.borrows_tree = ttk.Treeview(
+            # Tabela virtualizada para lista de empréstimos
+            self.borrows_tree = VirtualGrid(
                 borrow_frame,
-                columns=(
+                (
                     "ID",
                     "Livro ID",
                     "Título",
@@ -778,18 +827,9 @@ class BorrowManagementInterface:
                     "Data Real",
                     "Status",
                 ),
-                show="headings",
+                formatter=self.format_borrow,
             )
 
-            # Configurar colunas
-            self.borrows_tree.heading("ID", text="ID")
-            self.borrows_tree.heading("Livro ID", text="Livro ID")
-            self.borrows_tree.heading("Título", text="Título")
-            self.borrows_tree.heading("Data Empréstimo", text="Data Empréstimo")
-            self.borrows_tree.heading("Data Prevista", text="Data Prevista")
-            self.borrows_tree.heading("Data Real", text="Data Real")
-            self.borrows_tree.heading("Status", text="Status")
-
             # Ajustar largura das colunas
             self.borrows_tree.column("ID", width=50)
             self.borrows_tree.column("Livro ID", width=70)
@@ -801,19 +841,25 @@ class BorrowManagementInterface:
 
             self.borrows_tree.grid(row=1, column=0, pady=10, sticky="nsew")
 
-            # Scrollbar
-            scrollbar = ttk.Scrollbar(
-                borrow_frame, orient="vertical", command=self.borrows_tree.yview
+            # Navegação por páginas
+            self.borrows_pages = PageBar(
+                borrow_frame,
+                self.executor,
+                self.fetch_user_borrows_page,
+                self.show_user_borrows,
+                on_error=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao carregar empréstimos: {str(e)}"
+                ),
             )
-            scrollbar.grid(row=1, column=1, sticky="ns")
-            self.borrows_tree.configure(yscrollcommand=scrollbar.set)
+            self.borrows_pages.grid(row=2, column=0)
 
             # Botão para registrar retorno
-            ttk.Button(
+            self.borrows_return_button = ttk.Button(
                 borrow_frame,
                 text="Registrar Retorno",
                 command=self.process_selected_returns,
-            ).grid(row=2, column=0, pady=10)
+            )
+            self.borrows_return_button.grid(row=3, column=0, pady=10)
 
             # Configurar expansão do grid
             borrow_frame.grid_columnconfigure(0, weight=1)
@@ -822,62 +868,30 @@ class BorrowManagementInterface:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao criar interface: {str(e)}")
 
-    def fetch_books_for_reserve(self):
+    def fetch_books_for_reserve(self, connection):
         """Recupera livros com quantidade zero no inventário"""
-        if self.ensure_connection():
-            query = """
-            SELECT l.livro_id, l.titulo, l.quantidade_copias,
-                COALESCE(r.total_reservas, 0) as reservas_ativas
-            FROM livros l
-            LEFT JOIN (
-                SELECT livro_id, COUNT(*) as total_reservas
-                FROM reservas
-                WHERE status_reservas = 'Pendente'
-                GROUP BY livro_id
-            ) r ON l.livro_id = r.livro_id
-            WHERE l.quantidade_copias = 0
-            ORDER BY l.titulo
-            """
-            return read_data(self.connection, query)
-        return []
-
-    def check_existing_reserve(self, livro_id, usuario_id):
-        """Verifica se o usuário já tem uma reserva ativa para o livro"""
-        if self.ensure_connection():
-            query = f"""
-            SELECT COUNT(*) 
-            FROM reservas 
-            WHERE livro_id = {livro_id} 
-            AND usuario_id = {usuario_id}
-            AND status_reservas = 'Pendente'
-            """
-            result = read_data(self.connection, query)
-            return result[0][0] > 0 if result else False # type: ignore
-        return False
-
-    def create_reserve(self, livro_id, usuario_id):
-        """Cria uma nova reserva no banco de dados"""
-        if self.ensure_connection():
-            try:
-                current_date = datetime.now().date()
-
-                # Verificar se já existe reserva
-                if self.check_existing_reserve(livro_id, usuario_id):
-                    return False, "Você já possui uma reserva ativa para este livro"
-
-                # Inserir reserva
-                columns = ["livro_id", "usuario_id", "data_reserva", "status_reservas"]
-                query = create_insert_query("reservas", columns)
-                values = (livro_id, usuario_id, current_date, "Pendente")
-
-                insert_data(self.connection, query, values)
-                self.connection.commit() # type: ignore
-                return True, "Reserva realizada com sucesso!"
-
-            except Exception as e:
-                self.connection.rollback() # type: ignore
-                return False, f"Erro ao criar reserva: {str(e)}"
-        return False, "Erro de conexão com o banco de dados"
+        return services.books_for_reserve(connection)
+
+    def check_existing_reserve(self, connection, livro_id, usuario_id):
+        """Verifica se o usuário já tem uma reserva ativa para o livro (fora da thread do Tk)"""
+        return services.has_active_reservation(connection, livro_id, usuario_id)
+
+    def create_reserve(self, connection, livro_id, usuario_id):
+        """Cria uma nova reserva no banco de dados, retornando (sucesso, mensagem) (fora da thread do Tk)"""
+        try:
+            result = services.create_reservation(connection, livro_id, usuario_id)
+            return result.ok, result.mensagem
+        except Exception as e:
+            return False, f"Erro ao criar reserva: {str(e)}"
+
+    def create_reserves(self, connection, livro_ids, usuario_id):
+        """Cria as reservas dos livros informados, retornando quantas foram feitas"""
+        success_count = 0
+        for livro_id in livro_ids:
+            ok, _ = self.create_reserve(connection, livro_id, usuario_id)
+            if ok:
+                success_count += 1
+        return success_count
 
     def reserve_interface(self):
         """Interface principal para reserva de livros"""
@@ -898,24 +912,17 @@ class BorrowManagementInterface:
             self.user_id_entry = ttk.Entry(user_frame)
             self.user_id_entry.grid(row=0, column=1, padx=5)
 
-            # Treeview para lista de livros
-            self.reserve_tree = ttk.Treeview(
+            # Tabela virtualizada para lista de livros
+            self.reserve_tree = VirtualGrid(
                 reserve_frame,
-                columns=(
+                (
                     "ID",
                     "Título",
                     "Qtd Disponível",
-                    "Reservas Ativas"
+                    "Reservas Ativas",
                 ),
-                show="headings",
             )
 
-            # Configurar colunas
-            self.reserve_tree.heading("ID", text="ID")
-            self.reserve_tree.heading("Título", text="Título")
-            self.reserve_tree.heading("Qtd Disponível", text="Qtd Disponível")
-            self.reserve_tree.heading("Reservas Ativas", text="Reservas Ativas")
-
             # Ajustar largura das colunas
             self.reserve_tree.column("ID", width=50)
             self.reserve_tree.column("Título", width=300)
@@ -924,13 +931,6 @@ class BorrowManagementInterface:
 
             self.reserve_tree.grid(row=1, column=0, pady=10, sticky="nsew")
 
-            # Scrollbar
-            scrollbar = ttk.Scrollbar(
-                reserve_frame, orient="vertical", command=self.reserve_tree.yview
-            )
-            scrollbar.grid(row=1, column=1, sticky="ns")
-            self.reserve_tree.configure(yscrollcommand=scrollbar.set)
-
             # Frame para botões
             button_frame = ttk.Frame(reserve_frame)
             button_frame.grid(row=2, column=0, pady=10)
@@ -943,11 +943,12 @@ class BorrowManagementInterface:
             ).grid(row=0, column=0, padx=5)
 
             # Botão para realizar reserva
-            ttk.Button(
+            self.reserve_button = ttk.Button(
                 button_frame,
                 text="Realizar Reserva",
                 command=self.process_reserve
-            ).grid(row=0, column=1, padx=5)
+            )
+            self.reserve_button.grid(row=0, column=1, padx=5)
 
             # Carregar livros inicialmente
             self.load_books_for_reserve()
@@ -963,17 +964,25 @@ class BorrowManagementInterface:
         """Carrega e exibe os livros disponíveis para reserva"""
         try:
             # Limpar dados existentes
-            for item in self.reserve_tree.get_children():
-                self.reserve_tree.delete(item)
+            self.reserve_tree.clear()
 
             # Carregar livros
-            books = self.fetch_books_for_reserve()
-            for book in books: # type: ignore
-                self.reserve_tree.insert("", "end", values=book) # type: ignore
+            self.executor.submit(
+                self.fetch_books_for_reserve,
+                on_success=self.show_books_for_reserve,
+                on_error=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao carregar livros: {str(e)}"
+                ),
+                widget=self.reserve_tree,
+            )
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar livros: {str(e)}")
 
+    def show_books_for_reserve(self, books):
+        """Exibe os livros disponíveis para reserva na TreeView"""
+        self.reserve_tree.set_rows(books or [])
+
 
     def process_reserve(self):
         """Processa a reserva dos livros selecionados"""
@@ -985,35 +994,38 @@ class BorrowManagementInterface:
                 return
 
             # Verificar se um livro foi selecionado
-            selected_items = self.reserve_tree.selection()
-            if not selected_items:
+            selected_rows = self.reserve_tree.selected_rows()
+            if not selected_rows:
                 messagebox.showwarning(
                     "Aviso", "Selecione um livro para reserva"
                 )
                 return
 
             # Processar cada livro selecionado
-            success_count = 0
-            for item in selected_items:
-                livro_id = self.reserve_tree.item(item)["values"][0]
-
-                # Criar reserva
-                if self.create_reserve(livro_id, usuario_id):
-                    success_count += 1
-
-            if success_count > 0:
-                messagebox.showinfo(
-                    "Sucesso", 
-                    f"{success_count} reserva(s) realizada(s) com sucesso!"
-                )
-                self.load_books_for_reserve()  # Atualizar lista
-            else:
-                messagebox.showwarning(
-                    "Aviso",
-                    "Nenhuma reserva foi processada. Verifique se você já possui reservas para estes livros."
-                )
+            frame = self.reserve_tree
+            self.submit_write(
+                (self.reserve_button,),
+                self.create_reserves,
+                [book[0] for book in selected_rows],
+                usuario_id,
+                on_success=lambda success_count: self.show_reserve_result(frame, success_count),
+                error_message="Erro ao processar reserva",
+            )
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao processar reserva: {str(e)}")
 
-
+    def show_reserve_result(self, frame, success_count):
+        """Mostra quantas reservas foram feitas e atualiza a lista"""
+        if success_count > 0:
+            messagebox.showinfo(
+                "Sucesso", 
+                f"{success_count} reserva(s) realizada(s) com sucesso!"
+            )
+            if self.screen_open(frame):
+                self.load_books_for_reserve()  # Atualizar lista
+        else:
+            messagebox.showwarning(
+                "Aviso",
+                "Nenhuma reserva foi processada. Verifique se você já possui reservas para estes livros."
+            )
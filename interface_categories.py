@@ -1,23 +1,34 @@
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
 from db_utils import (
+    KeysetQuery,
     get_database_connection,
-    update_data,
     read_data,
 )
+from db_executor import DatabaseExecutor
+from reference_cache import invalidate_categories
+from search_controller import SearchController
+import services
+from virtual_grid import PageBar, VirtualGrid
 from create_user import create_insert_query, insert_data
 from datetime import datetime
 import csv
 
 
+# Categorias paginadas pela chave primária
+CATEGORIES_PAGE = KeysetQuery("SELECT * FROM categorias WHERE {seek}", ["categoria_id"], [0])
+
+
 class CategoriesManagementInterface:
     """
     Interface para gerenciamento de categorias.
     Esta classe fornece uma interface gráfica para criar categorias.
     """
 
-    def __init__(self, connection=None):
+    def __init__(self, connection=None, executor=None):
         self.connection = connection
+        # Executor das consultas em segundo plano (síncrono quando não informado)
+        self.executor = executor or DatabaseExecutor()
         self.category_frame = None
         self.main_frame = None
         self.button_style = {
@@ -140,6 +151,7 @@ class CategoriesManagementInterface:
 
             # Inserir categoria
             insert_data(self.connection, category_query, category_values)
+            invalidate_categories()
 
             messagebox.showinfo("Sucesso", "Categoria criada com sucesso!")
             self.clear_fields()
@@ -177,6 +189,16 @@ class CategoriesManagementInterface:
         tk.Label(search_frame, text="Buscar:").grid(row=1, column=0, sticky="e", pady=2)
         self.search_entry = tk.Entry(search_frame, width=30)
         self.search_entry.grid(row=1, column=1, sticky="w", pady=2)
+        self.search_entry.bind("<Return>", lambda event: self.search_category())
+
+        # Busca em segundo plano; um novo clique descarta a busca anterior
+        self.category_lookup = SearchController(
+            search_frame,
+            self.executor,
+            self.find_categories,
+            on_result=self.show_category_results,
+            on_error=lambda e: messagebox.showerror("Erro", f"Erro na busca: {str(e)}"),
+        )
 
         # Botão de busca
         search_button = tk.Button(
@@ -196,17 +218,25 @@ class CategoriesManagementInterface:
             messagebox.showwarning("Aviso", "Digite um termo para busca!")
             return
 
-        try:
-            if search_type == "id":
-                if not search_term.isdigit():
-                    messagebox.showwarning("Aviso", "ID deve ser um número!")
-                    return
-                query = f"SELECT * FROM categorias WHERE categoria_id = {search_term}"
-            else:
-                query = f"SELECT * FROM categorias WHERE nome LIKE '%{search_term}%'"
+        if search_type == "id" and not search_term.isdigit():
+            messagebox.showwarning("Aviso", "ID deve ser um número!")
+            return
+
+        self.category_lookup.trigger(search_type, search_term)
 
-            result = read_data(self.connection, query)
+    def find_categories(self, connection, search_type, search_term):
+        """Busca as categorias pelo ID ou por parte do nome (executado fora da thread do Tk)"""
+        if search_type == "id":
+            query = "SELECT * FROM categorias WHERE categoria_id = %s"
+            values = (search_term,)
+        else:
+            query = "SELECT * FROM categorias WHERE nome LIKE %s"
+            values = (f"%{search_term}%",)
+        return read_data(connection, query, values)
 
+    def show_category_results(self, result):
+        """Abre o formulário de atualização ou a lista de escolha, conforme o resultado"""
+        try:
             if not result:
                 messagebox.showinfo("Aviso", "Categoria não encontrada!")
                 return
@@ -291,14 +321,9 @@ class CategoriesManagementInterface:
                     messagebox.showwarning("Aviso", "Nome é obrigatório!")
                     return
 
-                query = """
-                    UPDATE categorias 
-                    SET nome = %s, descricao = %s 
-                    WHERE categoria_id = %s
-                """
-                params = (nome, descricao, categoria[0])  # ID
-
-                update_data(self.connection, query, params)
+                # Atualiza a categoria e o nome dela no resumo do catálogo
+                services.update_category(self.connection, categoria[0], nome, descricao)
+                invalidate_categories()
                 messagebox.showinfo("Sucesso", "Categoria atualizada com sucesso!")
                 self.clear_right_frames()
 
@@ -345,7 +370,7 @@ class CategoriesManagementInterface:
             tk.Button(
                 control_frame,
                 text="Atualizar Lista",
-                command=lambda: self.load_categories_data(tree),
+                command=lambda: refresh(),
                 **self.button_style
             ).pack(side=tk.LEFT, padx=5)
 
@@ -364,92 +389,105 @@ class CategoriesManagementInterface:
             search_entry = tk.Entry(search_frame, width=30)
             search_entry.pack(side=tk.LEFT, padx=5)
 
-            def search_categories():
-                search_term = search_entry.get().strip().lower()
-                for item in tree.get_children():
-                    tree.delete(item)
+            def show_search_results(results):
+                pages.pack_forget()
+                tree.clear()
+                self.populate_tree(tree, results or [])
+
+            # Busca enquanto o usuário digita, descartando as buscas já superadas
+            search = SearchController(
+                search_entry,
+                self.executor,
+                self.search_categories_data,
+                on_result=show_search_results,
+                on_error=lambda e: messagebox.showerror("Erro", f"Erro na busca: {str(e)}"),
+            )
 
-                query = f"""
-                    SELECT * FROM categorias 
-                    WHERE LOWER(nome) LIKE '%{search_term}%' 
-                    OR LOWER(descricao) LIKE '%{search_term}%'
-                """
-                results = read_data(self.connection, query)
-                self.populate_tree(tree, results)
+            def search_categories(now=False):
+                search_term = search_entry.get().strip().lower()
+                if not search_term:
+                    # Busca apagada: volta para a página que estava aberta
+                    search.cancel()
+                    pages.pack(side=tk.BOTTOM, pady=5, before=tree)
+                    pages.show_current()
+                elif now:
+                    search.trigger(search_term)
+                else:
+                    search.schedule(search_term)
+
+            def refresh():
+                search_entry.delete(0, tk.END)
+                search.cancel()
+                pages.pack(side=tk.BOTTOM, pady=5, before=tree)
+                self.load_categories_data(pages)
+
+            search_entry.bind("<KeyRelease>", lambda event: search_categories())
+            search_entry.bind("<Return>", lambda event: search_categories(now=True))
 
             tk.Button(
                 search_frame,
                 text="Buscar",
-                command=search_categories,
+                command=lambda: search_categories(now=True),
                 **self.button_style
             ).pack(side=tk.LEFT, padx=5)
 
-            # Criar Treeview
+            # Criar tabela virtualizada (ordenação ao clicar no cabeçalho)
             columns = ("ID", "Nome", "Descrição")
-            tree = ttk.Treeview(view_frame, columns=columns, show="headings")
-
-            # Configurar cabeçalhos
+            tree = VirtualGrid(view_frame, columns, xscroll=True)
             for col in columns:
-                tree.heading(col, text=col, command=lambda c=col: self.sort_treeview(tree, c, False))
                 tree.column(col, width=150)
 
-            # Adicionar scrollbars
-            y_scrollbar = ttk.Scrollbar(view_frame, orient=tk.VERTICAL, command=tree.yview)
-            x_scrollbar = ttk.Scrollbar(view_frame, orient=tk.HORIZONTAL, command=tree.xview)
-            tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+            # Navegação por páginas (a busca exibe todos os resultados de uma vez)
+            pages = PageBar(
+                view_frame,
+                self.executor,
+                self.query_categories_page,
+                lambda rows: show_page(rows),
+                on_error=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao carregar dados: {str(e)}"
+                ),
+            )
+
+            def show_page(rows):
+                # Com uma busca na tela, a página fica guardada para quando a busca for apagada
+                if not search_entry.get().strip():
+                    tree.set_rows([(row[0], row[1], row[2]) for row in rows])
 
             # Posicionar elementos
+            pages.pack(side=tk.BOTTOM, pady=5)
             tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
 
             # Carregar dados iniciais
-            self.load_categories_data(tree)
+            self.load_categories_data(pages)
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao criar interface de visualização: {str(e)}")
 
-    def load_categories_data(self, tree):
-        """Carrega os dados das categorias na TreeView"""
+    def load_categories_data(self, pages):
+        """Carrega a primeira página de categorias na tabela"""
         try:
-            # Limpar dados existentes
-            for item in tree.get_children():
-                tree.delete(item)
-
-            # Buscar dados do banco
-            query = "SELECT * FROM categorias ORDER BY categoria_id"
-            results = read_data(self.connection, query)
-
-            self.populate_tree(tree, results)
+            pages.reload()
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar dados: {str(e)}")
 
-    def populate_tree(self, tree, results):
-        """Popula a TreeView com os resultados"""
-        for row in results:
-            tree.insert("", "end", values=(
-                row[0],  # ID
-                row[1],  # Nome
-                row[2]   # Descrição
-            ))
-
-    def sort_treeview(self, tree, col, reverse):
-        """Ordena a TreeView ao clicar no cabeçalho"""
-        items = [(tree.set(item, col), item) for item in tree.get_children("")]
+    def search_categories_data(self, connection, search_term):
+        """Busca as categorias cujo nome ou descrição contém o termo informado"""
+        query = """
+            SELECT * FROM categorias 
+            WHERE LOWER(nome) LIKE %s 
+            OR LOWER(descricao) LIKE %s
+        """
+        pattern = f"%{search_term}%"
+        return read_data(connection, query, (pattern, pattern))
 
-        # Converter IDs para números quando ordenar pela coluna ID
-        if col == "ID":
-            items = [(int(value), item) for value, item in items]
+    def query_categories_page(self, connection, after=None, limit=None):
+        """Busca uma página de categorias (executado fora da thread do Tk)"""
+        return CATEGORIES_PAGE.page(connection, after, limit)
 
-        items.sort(reverse=reverse)
-
-        # Reorganizar itens na ordem
-        for index, (val, item) in enumerate(items):
-            tree.move(item, "", index)
-
-        # Alternar direção da próxima ordenação
-        tree.heading(col, command=lambda: self.sort_treeview(tree, col, not reverse))
+    def populate_tree(self, tree, results):
+        """Acrescenta os resultados (ID, Nome, Descrição) à tabela"""
+        tree.append_rows([(row[0], row[1], row[2]) for row in results])
 
     def export_to_csv(self, tree):
         """Exporta os dados da TreeView para um arquivo CSV"""
@@ -463,13 +501,10 @@ class CategoriesManagementInterface:
                 with open(file_path, 'w', newline='', encoding='utf-8') as file:
                     writer = csv.writer(file)
                     # Escrever cabeçalhos
-                    headers = [tree.heading(col)['text'] for col in tree['columns']]
-                    writer.writerow(headers)
+                    writer.writerow(tree.headings())
 
-                    # Escrever dados
-                    for item in tree.get_children():
-                        values = tree.item(item)['values']
-                        writer.writerow(values)
+                    # Escrever dados na ordem exibida
+                    writer.writerows(tree.display_rows())
 
                 messagebox.showinfo("Sucesso", "Dados exportados com sucesso!")
 
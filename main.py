@@ -1,4 +1,4 @@
-from db_utils import get_database_connection
+from db_utils import get_database_connection, close_connection_pool
 from interface import create_interface
 
 
@@ -12,7 +12,8 @@ def main():
         finally:
             if connection.is_connected():
                 connection.close()
-                print("Conexão ao banco de dados MySQL encerrada")
+            close_connection_pool()
+            print("Conexão ao banco de dados MySQL encerrada")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,390 @@
+"""
+Migrações versionadas do esquema do banco.
+
+O script "4 - Script SQL.sql" cria o esquema base; cada mudança posterior é uma
+Migration numerada em MIGRATIONS, com um passo up (aplicar) e, quando possível,
+um passo down (desfazer). As versões já aplicadas ficam na tabela
+schema_migrations, então cada banco recebe só o que ainda falta, em ordem:
+
+    python migrations.py             aplica as migrações pendentes
+    python migrations.py --para 1    leva o banco até a versão 1 (aplicando ou desfazendo)
+    python migrations.py --status    lista as migrações aplicadas e pendentes
+
+No SQLite as migrações são aplicadas automaticamente na criação do banco.
+
+As operações pensadas para rodar com a aplicação no ar:
+- create_index / drop_index usam ALGORITHM=INPLACE no MySQL, sem bloquear as
+  gravações na tabela enquanto o índice é montado;
+- batched / backfill percorrem a tabela em faixas da chave, cada uma em sua
+  própria transação curta (migrações com transactional=False).
+
+No MySQL, comandos DDL encerram a transação em andamento: os passos verificam
+o que já existe antes de criar ou remover, para que uma migração interrompida
+possa simplesmente ser executada de novo.
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Optional
+import catalog_summary
+from db_backends import Error
+from db_utils import get_database_connection, read_data, run_in_transaction, update_data
+
+
+# Linhas por lote dos preenchimentos (backfills) e pausa entre lotes, para não atrasar réplicas
+MIGRATION_BATCH_SIZE = int(os.getenv("DB_MIGRATION_BATCH", "5000"))
+MIGRATION_BATCH_PAUSE_MS = float(os.getenv("DB_MIGRATION_PAUSE_MS", "0"))
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+CREATE_MIGRATIONS_TABLE = f"""
+    CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+        versao INT PRIMARY KEY,
+        descricao VARCHAR(200) NOT NULL,
+        aplicada_em DATETIME NOT NULL
+    )
+"""
+
+# Nome do lock do MySQL que impede dois processos de migrar o mesmo banco ao mesmo tempo
+_MIGRATION_LOCK = "biblioteca_schema_migrations"
+
+# Erro do MySQL ao remover o único índice que atende a uma chave estrangeira
+_ERRNO_INDEX_IN_FOREIGN_KEY = 1553
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    Mudança de esquema: up(connection) leva o banco da versão anterior para esta
+    e down(connection) desfaz (None quando a migração não pode ser desfeita).
+    Com transactional=False os passos controlam as próprias transações
+    (preenchimentos em lotes).
+    """
+
+    version: int
+    description: str
+    up: Callable
+    down: Optional[Callable] = None
+    transactional: bool = True
+
+
+# Função para identificar o banco de uma conexão ("mysql" ou "sqlite"), mesmo emprestada do pool
+def backend_name(connection):
+    raw = getattr(connection, "raw", None)
+    return "sqlite" if isinstance(raw, sqlite3.Connection) else "mysql"
+
+
+# Função para verificar se uma tabela existe no banco da conexão
+def table_exists(connection, table):
+    if backend_name(connection) == "sqlite":
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s COLLATE NOCASE"
+    else:
+        query = """
+            SELECT 1 FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name = %s
+        """
+    return bool(read_data(connection, query, (table,)))
+
+
+# Função para verificar se um índice existe na tabela informada
+def index_exists(connection, table, name):
+    if backend_name(connection) == "sqlite":
+        # No SQLite o nome do índice é único no banco inteiro
+        return bool(read_data(
+            connection, "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = %s", (name,)
+        ))
+    query = """
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """
+    return bool(read_data(connection, query, (table, name)))
+
+
+# Função para executar um comando de esquema (DDL)
+def execute_ddl(connection, statement):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+# Função para criar um índice (comum ou FULLTEXT) se ele ainda não existir
+def create_index(connection, table, name, columns, fulltext=False):
+    sqlite = backend_name(connection) == "sqlite"
+    if fulltext and sqlite:
+        # No SQLite a busca textual usa a tabela FTS5 livros_busca
+        return False
+    if index_exists(connection, table, name):
+        return False
+    kind = "FULLTEXT INDEX" if fulltext else "INDEX"
+    if sqlite:
+        execute_ddl(connection, f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
+    else:
+        # Montado sem copiar a tabela; índices comuns aceitam gravações durante a montagem
+        lock = "SHARED" if fulltext else "NONE"
+        execute_ddl(
+            connection,
+            f"ALTER TABLE {table} ADD {kind} {name} ({', '.join(columns)}), "
+            f"ALGORITHM=INPLACE, LOCK={lock}",
+        )
+    print(f"Índice {name} criado em {table}")
+    return True
+
+
+# Função para remover um índice, se ele existir
+def drop_index(connection, table, name):
+    if not index_exists(connection, table, name):
+        return False
+    if backend_name(connection) == "sqlite":
+        execute_ddl(connection, f"DROP INDEX {name}")
+    else:
+        try:
+            execute_ddl(
+                connection, f"ALTER TABLE {table} DROP INDEX {name}, ALGORITHM=INPLACE, LOCK=NONE"
+            )
+        except Error as e:
+            if getattr(e, "errno", None) != _ERRNO_INDEX_IN_FOREIGN_KEY:
+                raise e
+            # O MySQL passou a usar este índice na chave estrangeira no lugar do seu próprio
+            print(f"Índice {name} mantido em {table}: necessário para uma chave estrangeira")
+            return False
+    print(f"Índice {name} removido de {table}")
+    return True
+
+
+# Função para executar step(connection, low, high) em faixas (low, high] da chave da tabela,
+# cada faixa em sua própria transação curta; retorna a quantidade de faixas
+def batched(connection, table, key, step, batch_size=None, pause_ms=None):
+    batch_size = batch_size or MIGRATION_BATCH_SIZE
+    pause_ms = MIGRATION_BATCH_PAUSE_MS if pause_ms is None else pause_ms
+    result = read_data(connection, f"SELECT MIN({key}), MAX({key}) FROM {table}")
+    if not result or result[0][0] is None:
+        return 0
+
+    first, last = result[0]
+    low = first - 1
+    batches = 0
+    while low < last:
+        high = min(low + batch_size, last)
+        run_in_transaction(connection, step, low, high)
+        batches += 1
+        low = high
+        if pause_ms:
+            time.sleep(pause_ms / 1000)
+    print(f"{table}: {batches} lotes de até {batch_size} ids processados")
+    return batches
+
+
+# Função para preencher colunas em lotes: UPDATE table SET assignments WHERE condition,
+# uma faixa da chave por vez (condition e assignments sem parâmetros)
+def backfill(connection, table, key, assignments, condition="1 = 1", batch_size=None, pause_ms=None):
+    query = f"""
+        UPDATE {table}
+        SET {assignments}
+        WHERE {key} > %s AND {key} <= %s
+        AND ({condition})
+    """
+
+    def step(connection, low, high):
+        update_data(connection, query, (low, high))
+
+    return batched(connection, table, key, step, batch_size, pause_ms)
+
+
+# Índices das consultas mais frequentes (apontadas pelo index_advisor.py), por tabela
+HOT_PATH_INDEXES = [
+    # Empréstimos ativos de um usuário e histórico paginado por data
+    ("emprestimos", "idx_emprestimos_usuario_status", ["usuario_id", "status_emprestimo"]),
+    ("emprestimos", "idx_emprestimos_usuario_data", ["usuario_id", "data_emprestimo"]),
+    # Empréstimos por situação (Ativo / Devolvido), na ordem do emprestimo_id
+    ("emprestimos", "idx_emprestimos_status", ["status_emprestimo"]),
+    # Reserva pendente de um usuário para um livro e contagem de reservas pendentes por livro
+    ("reservas", "idx_reservas_livro_usuario_status", ["livro_id", "usuario_id", "status_reservas"]),
+    ("reservas", "idx_reservas_status_livro", ["status_reservas", "livro_id"]),
+    # Multas dos empréstimos de um usuário, por data, e multas por situação (Devendo / Quitado)
+    ("multas", "idx_multas_emprestimo_geracao", ["emprestimo_id", "data_geracao"]),
+    ("multas", "idx_multas_status_geracao", ["status_multas", "data_geracao"]),
+    # Livros sem cópias (reservas) em ordem de título e livros disponíveis para empréstimo
+    ("livros", "idx_livros_copias_titulo", ["quantidade_copias", "titulo"]),
+    # Usuários por situação
+    ("usuarios", "idx_usuarios_status", ["status_usuario"]),
+]
+
+
+def _add_hot_path_indexes(connection):
+    for table, name, columns in HOT_PATH_INDEXES:
+        create_index(connection, table, name, columns)
+
+
+def _drop_hot_path_indexes(connection):
+    for table, name, _ in reversed(HOT_PATH_INDEXES):
+        drop_index(connection, table, name)
+
+
+CREATE_CATALOG_SUMMARY = """
+    CREATE TABLE catalogo_resumo (
+        livro_id INT PRIMARY KEY,
+        titulo VARCHAR(200) NOT NULL,
+        isbn VARCHAR(13),
+        ano_publicacao INT,
+        editora VARCHAR(100),
+        quantidade_copias INT DEFAULT 0,
+        localizacao_estante VARCHAR(50),
+        autores TEXT,
+        categoria VARCHAR(50),
+        autor_ids TEXT,
+        categoria_id INT
+    )
+"""
+
+
+def _add_search_structures(connection):
+    # Bancos MySQL criados antes dos índices FULLTEXT e do resumo do catálogo
+    create_index(connection, "livros", "ft_livros_titulo_editora", ["titulo", "editora"], fulltext=True)
+    create_index(connection, "autores", "ft_autores_nome", ["nome"], fulltext=True)
+    if not table_exists(connection, "catalogo_resumo"):
+        execute_ddl(connection, CREATE_CATALOG_SUMMARY)
+        # Cada faixa é refeita por inteiro: repetir a migração após uma interrupção é seguro
+        batched(connection, "livros", "livro_id", catalog_summary.refresh_range)
+    create_index(connection, "catalogo_resumo", "idx_catalogo_resumo_titulo", ["titulo"])
+    create_index(connection, "catalogo_resumo", "idx_catalogo_resumo_isbn", ["isbn"])
+    create_index(connection, "catalogo_resumo", "idx_catalogo_resumo_categoria", ["categoria_id"])
+
+
+MIGRATIONS = [
+    # Sem down: as estruturas também fazem parte do script SQL base
+    Migration(1, "Busca textual e resumo do catálogo em bancos existentes", _add_search_structures,
+              transactional=False),
+    Migration(2, "Índices compostos das consultas de empréstimos, reservas, multas, livros e usuários",
+              _add_hot_path_indexes, _drop_hot_path_indexes),
+]
+
+
+# Context manager que impede duas execuções simultâneas das migrações no mesmo banco MySQL
+@contextmanager
+def migration_lock(connection):
+    if backend_name(connection) == "sqlite":
+        # No SQLite as migrações rodam na criação do banco, sob o lock do backend
+        yield
+        return
+    result = read_data(connection, "SELECT GET_LOCK(%s, 0)", (_MIGRATION_LOCK,))
+    if not result or result[0][0] != 1:
+        raise Error("Outro processo está aplicando migrações neste banco")
+    try:
+        yield
+    finally:
+        read_data(connection, "SELECT RELEASE_LOCK(%s)", (_MIGRATION_LOCK,))
+
+
+# Função para consultar as versões já aplicadas no banco
+def applied_versions(connection):
+    execute_ddl(connection, CREATE_MIGRATIONS_TABLE)
+    rows = read_data(connection, f"SELECT versao FROM {MIGRATIONS_TABLE}") or []
+    return {row[0] for row in rows}
+
+
+# Função para listar as migrações ainda não aplicadas, em ordem de versão
+def pending_migrations(connection):
+    applied = applied_versions(connection)
+    return [m for m in sorted(MIGRATIONS, key=lambda m: m.version) if m.version not in applied]
+
+
+def _record(connection, migration):
+    update_data(
+        connection,
+        f"INSERT INTO {MIGRATIONS_TABLE} (versao, descricao, aplicada_em) VALUES (%s, %s, %s)",
+        (migration.version, migration.description, datetime.datetime.now()),
+    )
+
+
+def _unrecord(connection, migration):
+    update_data(
+        connection, f"DELETE FROM {MIGRATIONS_TABLE} WHERE versao = %s", (migration.version,)
+    )
+
+
+def _apply(connection, migration):
+    migration.up(connection)
+    _record(connection, migration)
+
+
+def _revert(connection, migration):
+    migration.down(connection)
+    _unrecord(connection, migration)
+
+
+# Função para levar o banco até a versão target (padrão: a mais recente), aplicando as
+# migrações pendentes ou desfazendo as posteriores; retorna (aplicadas, desfeitas)
+def migrate(connection, target=None):
+    ordered = sorted(MIGRATIONS, key=lambda m: m.version)
+    if target is None:
+        target = ordered[-1].version if ordered else 0
+
+    applied, reverted = [], []
+    with migration_lock(connection):
+        done = applied_versions(connection)
+        to_revert = [m for m in reversed(ordered) if m.version in done and m.version > target]
+        irreversible = [m.version for m in to_revert if m.down is None]
+        if irreversible:
+            raise Error(f"Migrações que não podem ser desfeitas: {irreversible}")
+
+        for migration in to_revert:
+            if migration.transactional:
+                run_in_transaction(connection, _revert, migration)
+            else:
+                migration.down(connection)
+                run_in_transaction(connection, _unrecord, migration)
+            print(f"Migração {migration.version} desfeita: {migration.description}")
+            reverted.append(migration.version)
+
+        for migration in ordered:
+            if migration.version in done or migration.version > target:
+                continue
+            if migration.transactional:
+                run_in_transaction(connection, _apply, migration)
+            else:
+                migration.up(connection)
+                run_in_transaction(connection, _record, migration)
+            print(f"Migração {migration.version} aplicada: {migration.description}")
+            applied.append(migration.version)
+    return applied, reverted
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica ou desfaz as migrações do esquema.")
+    parser.add_argument("--para", type=int, metavar="VERSAO",
+                        help="versão desejada (padrão: a mais recente); versões menores desfazem migrações")
+    parser.add_argument("--status", action="store_true",
+                        help="apenas listar as migrações aplicadas e pendentes")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    connection = get_database_connection()
+    if not connection:
+        return
+
+    try:
+        if args.status:
+            applied = applied_versions(connection)
+            for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+                mark = "aplicada" if migration.version in applied else "pendente"
+                undo = "" if migration.down else "  (sem down)"
+                print(f"{migration.version:>4}  {mark:<9} {migration.description}{undo}")
+            return
+        applied, reverted = migrate(connection, args.para)
+        if not applied and not reverted:
+            print("Nenhuma migração a aplicar")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
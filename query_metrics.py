@@ -0,0 +1,212 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from dotenv import load_dotenv
+
+
+# Carrega variáveis de ambiente
+load_dotenv()
+
+# Queries acima deste tempo (em milissegundos) são gravadas no log de queries lentas
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG = os.getenv("DB_SLOW_QUERY_LOG", "slow_queries.log")
+SLOW_QUERY_LOG_BYTES = int(os.getenv("DB_SLOW_QUERY_LOG_BYTES", str(1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("DB_SLOW_QUERY_LOG_BACKUPS", "5"))
+
+# Quantidade de medições mantidas por formato de query para o cálculo dos percentis
+SAMPLES_PER_SHAPE = int(os.getenv("DB_QUERY_SAMPLES", "1000"))
+
+# Arquivos ignorados ao procurar o método da interface que originou a query
+_INTERNAL_FILES = {"db_utils.py", "query_metrics.py", "contextlib.py"}
+
+_RE_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_RE_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_RE_SPACES = re.compile(r"\s+")
+
+_samples = defaultdict(lambda: deque(maxlen=SAMPLES_PER_SHAPE))
+_totals = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "rows": 0, "slow": 0})
+_callers = defaultdict(set)
+_lock = threading.Lock()
+_slow_logger = None
+
+# Primeira execução (query, valores, chamador) de cada formato, guardada só dentro de capture_queries
+_examples = None
+
+# Nome do chamador informado explicitamente (usado pelas threads de trabalho)
+_context = threading.local()
+
+
+class QueryTimer:
+    """Medição em andamento; o chamador preenche rowcount após executar a query"""
+
+    def __init__(self, query, values=None):
+        self.query = query
+        self.values = values
+        self.rowcount = -1
+
+
+# Função para normalizar a query, trocando literais por ? e agrupando listas IN
+def normalize_query(query):
+    normalized = _RE_STRING.sub("?", query)
+    normalized = normalized.replace("%s", "?")
+    normalized = _RE_NUMBER.sub("?", normalized)
+    normalized = _RE_SPACES.sub(" ", normalized).strip().rstrip(";")
+    return _RE_IN_LIST.sub("IN (...)", normalized)
+
+
+# Context manager que define o chamador das queries executadas na thread atual
+@contextmanager
+def caller_context(name):
+    previous = getattr(_context, "caller", None)
+    _context.caller = name
+    try:
+        yield
+    finally:
+        _context.caller = previous
+
+
+# Função para descobrir qual método (Classe.metodo) disparou a query
+def find_caller():
+    explicit = getattr(_context, "caller", None)
+    if explicit:
+        return explicit
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.basename(frame.f_code.co_filename)
+        if filename not in _INTERNAL_FILES:
+            owner = frame.f_locals.get("self")
+            name = frame.f_code.co_name
+            if owner is not None:
+                return f"{type(owner).__name__}.{name}"
+            module = os.path.splitext(filename)[0]
+            return f"{module}.{name}"
+        frame = frame.f_back
+    return "desconhecido"
+
+
+def _get_slow_logger():
+    global _slow_logger
+    if _slow_logger is None:
+        logger = logging.getLogger("biblioteca.slow_queries")
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+        handler = RotatingFileHandler(
+            SLOW_QUERY_LOG,
+            maxBytes=SLOW_QUERY_LOG_BYTES,
+            backupCount=SLOW_QUERY_LOG_BACKUPS,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        _slow_logger = logger
+    return _slow_logger
+
+
+# Context manager que guarda um exemplo de cada formato de query executado no bloco
+# (usado pelo index_advisor para rodar EXPLAIN nas queries reais da aplicação)
+@contextmanager
+def capture_queries():
+    global _examples
+    with _lock:
+        previous, _examples = _examples, {}
+        examples = _examples
+    try:
+        yield examples
+    finally:
+        with _lock:
+            _examples = previous
+
+
+# Função para registrar a medição de uma query já executada
+def record_query(query, duration_ms, rowcount=-1, caller=None, values=None):
+    shape = normalize_query(query)
+    caller = caller or find_caller()
+    slow = duration_ms >= SLOW_QUERY_MS
+
+    with _lock:
+        _samples[shape].append(duration_ms)
+        totals = _totals[shape]
+        totals["count"] += 1
+        totals["total_ms"] += duration_ms
+        totals["rows"] += max(rowcount, 0)
+        totals["slow"] += slow
+        _callers[shape].add(caller)
+        if _examples is not None and shape not in _examples:
+            _examples[shape] = (query, values, caller)
+
+    if slow:
+        _get_slow_logger().warning(
+            f"{duration_ms:.1f}ms rows={rowcount} caller={caller} sql={shape}"
+        )
+
+
+# Context manager que mede o tempo da query executada dentro do bloco
+@contextmanager
+def timed_query(query, caller=None, values=None):
+    timer = QueryTimer(query, values)
+    caller = caller or find_caller()
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        record_query(query, duration_ms, timer.rowcount, caller, timer.values)
+
+
+def _percentile(ordered, fraction):
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Função para obter o resumo p50/p95/p99 por formato de query
+def get_query_summary():
+    with _lock:
+        snapshot = {
+            shape: (sorted(samples), dict(_totals[shape]), sorted(_callers[shape]))
+            for shape, samples in _samples.items()
+        }
+
+    summary = {}
+    for shape, (ordered, totals, callers) in snapshot.items():
+        if not ordered:
+            continue
+        summary[shape] = {
+            "count": totals["count"],
+            "slow": totals["slow"],
+            "rows": totals["rows"],
+            "total_ms": round(totals["total_ms"], 3),
+            "p50_ms": round(_percentile(ordered, 0.50), 3),
+            "p95_ms": round(_percentile(ordered, 0.95), 3),
+            "p99_ms": round(_percentile(ordered, 0.99), 3),
+            "max_ms": round(ordered[-1], 3),
+            "callers": callers,
+        }
+    return summary
+
+
+# Função para imprimir o resumo das queries, da mais custosa para a menos custosa
+def print_query_summary():
+    summary = get_query_summary()
+    for shape, stats in sorted(
+        summary.items(), key=lambda item: item[1]["total_ms"], reverse=True
+    ):
+        print(
+            f"{stats['count']:>6}x  p50={stats['p50_ms']:.1f}ms  "
+            f"p95={stats['p95_ms']:.1f}ms  p99={stats['p99_ms']:.1f}ms  "
+            f"[{', '.join(stats['callers'])}]  {shape}"
+        )
+
+
+# Função para zerar as medições acumuladas
+def reset_query_stats():
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+        _callers.clear()
@@ -1,4 +1,5 @@
 from db_utils import create_read_query, read_data, update_data, create_update_query
+from db_utils import KeysetQuery, stream_batches
 from db_utils import create_delete_query, delete_data
 from tkinter import messagebox
 import datetime
@@ -9,26 +10,48 @@ def read_user(
     connection, nome=None, usuario_id=None, email=None, status=None, telefone=None
 ):
     query = create_read_query("usuarios", ["*"])
+    values = None
     if nome:
-        query += f" WHERE nome LIKE '{nome}'"
+        query += " WHERE nome LIKE %s"
+        values = (nome,)
     elif usuario_id:
-        query += f" WHERE usuario_id = '{usuario_id}'"
+        query += " WHERE usuario_id = %s"
+        values = (usuario_id,)
     elif email:
-        query += f" WHERE email = '{email}'"
+        query += " WHERE email = %s"
+        values = (email,)
     elif status:
-        query += f" WHERE status_usuario = '{status}'"
+        query += " WHERE status_usuario = %s"
+        values = (status,)
     elif telefone:
-        query += f" WHERE telefone = '{telefone}'"
-    result = read_data(connection, query)
+        query += " WHERE telefone = %s"
+        values = (telefone,)
+    result = read_data(connection, query, values)
     return result
 
 
+# Função para ler todos os usuários em lotes, ordenados pelo usuario_id
+def stream_users(connection):
+    query = "SELECT * FROM usuarios ORDER BY usuario_id"
+    return stream_batches(connection, query)
+
+
+USERS_PAGE = KeysetQuery("SELECT * FROM usuarios WHERE {seek}", ["usuario_id"], [0])
+
+
+# Função para ler uma página de usuários a partir do último usuario_id da página anterior
+def read_users_page(connection, after=None, limit=None):
+    return USERS_PAGE.page(connection, after, limit)
+
+
 # Função para ler o endereco com base na tabela usuarioendereco usando usuario_id como chave estrangeira
 def read_user_address(connection, usuario_id=None):
     query = create_read_query("endereco", ["*"])
+    values = None
     if usuario_id:
-        query += f" WHERE endereco_id IN (SELECT endereco_id FROM usuarioendereco WHERE usuario_id = '{usuario_id}')"
-    result = read_data(connection, query)
+        query += " WHERE endereco_id IN (SELECT endereco_id FROM usuarioendereco WHERE usuario_id = %s)"
+        values = (usuario_id,)
+    result = read_data(connection, query, values)
 
     return result
 
@@ -191,9 +214,8 @@ def update_user(connection, usuario_id=None, email=None, updates=None):
 
     if updates:
         try:
-            condition = f"usuario_id = {row[0]}"
-            query = create_update_query("usuarios", updates.keys(), condition)
-            update_data(connection, query, tuple(updates.values()))
+            query = create_update_query("usuarios", updates.keys(), "usuario_id = %s")
+            update_data(connection, query, (*updates.values(), row[0]))
             print("\nUsuário atualizado com sucesso!")
             return True
         except Exception as e:
@@ -242,17 +264,16 @@ def atualizar_endereco(connection, usuario_id):
         if novo_valor is not None:  # Permite valor None para número
             try:
                 # Primeiro, obtemos o endereco_id
-                query = f"""
+                query = """
                 SELECT endereco_id 
                 FROM usuarioendereco 
-                WHERE usuario_id = {usuario_id}
+                WHERE usuario_id = %s
                 """
-                result = read_data(connection, query)
+                result = read_data(connection, query, (usuario_id,))
                 if result and result[0]:
                     endereco_id = result[0][0]
-                    condition = f"endereco_id = {endereco_id}"
-                    query = create_update_query("endereco", [campo], condition)
-                    update_data(connection, query, (novo_valor,))
+                    query = create_update_query("endereco", [campo], "endereco_id = %s")
+                    update_data(connection, query, (novo_valor, endereco_id))
                     messagebox.showinfo("Sucesso", f"{label} atualizado com sucesso!")
                 else:
                     messagebox.showerror("Erro", "Endereço não encontrado para este usuário.")
@@ -307,19 +328,16 @@ def delete_user(connection, usuario_id=None, email=None):
             connection.start_transaction()
 
             # Deletar o row na tabela usuarioendereco
-            condition_usuarioendereco = f"usuario_id = {row[0]}"
-            query = create_delete_query("usuarioendereco", condition_usuarioendereco)
-            delete_data(connection, query, None)
+            query = create_delete_query("usuarioendereco", "usuario_id = %s")
+            delete_data(connection, query, (row[0],))
 
             # Deletar o row na tabela endereco
-            condition_endereco = f"endereco_id = {endereco_id}"
-            query = create_delete_query("endereco", condition_endereco)
-            delete_data(connection, query, None)
+            query = create_delete_query("endereco", "endereco_id = %s")
+            delete_data(connection, query, (endereco_id,))
 
             # Deletar o row na tabela usuarios
-            condition = f"usuario_id = {row[0]}"
-            query = create_delete_query("usuarios", condition)
-            delete_data(connection, query, None)
+            query = create_delete_query("usuarios", "usuario_id = %s")
+            delete_data(connection, query, (row[0],))
 
             # Confirmar transação
             connection.commit()
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from db_utils import read_data
+
+
+# Tempo de vida (segundos) das tabelas de referência em cache; 0 mantém até a invalidação
+REFERENCE_CACHE_TTL = float(os.getenv("DB_REFERENCE_CACHE_TTL", "0"))
+
+
+class ReferenceTable:
+    """
+    Cache em memória de uma tabela de referência pequena (id, nome).
+    A tabela é lida inteira na primeira consulta e mantida até ser invalidada
+    pelas telas que gravam nela ou até o TTL expirar.
+    """
+
+    def __init__(self, table, id_column, name_column, ttl=None):
+        self.table = table
+        self.id_column = id_column
+        self.name_column = name_column
+        self.ttl = REFERENCE_CACHE_TTL if ttl is None else ttl
+        self._rows = None
+        self._by_id = {}
+        self._by_name = {}
+        self._loaded_at = 0.0
+        # Incrementada a cada invalidação: uma leitura iniciada antes dela não é guardada
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _expired(self):
+        return self.ttl > 0 and time.monotonic() - self._loaded_at > self.ttl
+
+    # Retorna (linhas, por id, por nome) de uma mesma leitura da tabela
+    def _load(self, connection):
+        with self._lock:
+            if self._rows is not None and not self._expired():
+                self._stats["hits"] += 1
+                return self._rows, self._by_id, self._by_name
+            self._stats["misses"] += 1
+            generation = self._generation
+
+        query = (
+            f"SELECT {self.id_column}, {self.name_column} "
+            f"FROM {self.table} ORDER BY {self.name_column}"
+        )
+        rows = read_data(connection, query)
+        if rows is None:
+            # Erro na leitura: não guarda nada para tentar de novo na próxima consulta
+            return [], {}, {}
+
+        rows = [tuple(row) for row in rows]
+        by_id = {row[0]: row[1] for row in rows}
+        by_name = {str(row[1]).strip().lower(): row[0] for row in rows}
+        with self._lock:
+            if generation != self._generation:
+                # A tabela foi alterada durante a leitura: estas linhas podem ser anteriores
+                # à gravação, então valem só para esta consulta e a próxima relê a tabela
+                return rows, by_id, by_name
+            self._rows = rows
+            self._by_id = by_id
+            self._by_name = by_name
+            self._loaded_at = time.monotonic()
+        return rows, by_id, by_name
+
+    def rows(self, connection):
+        """Retorna a lista de (id, nome) ordenada por nome"""
+        return list(self._load(connection)[0])
+
+    def get(self, connection, row_id):
+        """Retorna o nome do registro com o id informado, ou None"""
+        return self._load(connection)[1].get(row_id)
+
+    def get_by_name(self, connection, name):
+        """Retorna o id do registro com o nome informado (sem diferenciar maiúsculas), ou None"""
+        return self._load(connection)[2].get(str(name).strip().lower())
+
+    def contains(self, connection, row_id):
+        """Verifica se existe um registro com o id informado"""
+        return row_id in self._load(connection)[1]
+
+    def missing(self, connection, row_ids):
+        """Retorna o conjunto dos ids informados que não existem na tabela"""
+        by_id = self._load(connection)[1]
+        return {row_id for row_id in row_ids if row_id not in by_id}
+
+    def invalidate(self):
+        """Descarta o conteúdo em cache; a próxima consulta relê a tabela"""
+        with self._lock:
+            self._rows = None
+            self._by_id = {}
+            self._by_name = {}
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+            stats["rows"] = len(self._rows) if self._rows is not None else 0
+            return stats
+
+
+authors = ReferenceTable("autores", "autor_id", "nome")
+categories = ReferenceTable("categorias", "categoria_id", "nome")
+
+
+# Função para obter a lista de autores (autor_id, nome) a partir do cache
+def get_authors(connection):
+    return authors.rows(connection)
+
+
+# Função para obter a lista de categorias (categoria_id, nome) a partir do cache
+def get_categories(connection):
+    return categories.rows(connection)
+
+
+# Função para descartar o cache de autores após uma gravação
+def invalidate_authors():
+    authors.invalidate()
+
+
+# Função para descartar o cache de categorias após uma gravação
+def invalidate_categories():
+    categories.invalidate()
+
+
+# Função para obter as estatísticas de acerto do cache de referência
+def get_reference_cache_stats():
+    return {"autores": authors.stats(), "categorias": categories.stats()}
@@ -0,0 +1,125 @@
+import os
+
+
+# Espera (ms) após a última tecla antes de disparar uma busca
+SEARCH_DELAY_MS = int(os.getenv("SEARCH_DELAY_MS", "250"))
+
+
+class Debouncer:
+    """
+    Adia uma chamada até o usuário parar de digitar: cada schedule cancela o
+    agendamento anterior e agenda callback(*args) para daqui a delay_ms.
+    """
+
+    def __init__(self, widget, callback, delay_ms=SEARCH_DELAY_MS):
+        self.widget = widget
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self._job = None
+
+    @property
+    def pending(self):
+        return self._job is not None
+
+    def schedule(self, *args):
+        self.cancel()
+        self._job = self.widget.after(self.delay_ms, self._fire, args)
+
+    def flush(self, *args):
+        """Chama o callback imediatamente, descartando o agendamento pendente"""
+        self.cancel()
+        self.callback(*args)
+
+    def cancel(self):
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                # O widget já foi destruído junto com o agendamento
+                pass
+            self._job = None
+
+    def _fire(self, args):
+        self._job = None
+        self.callback(*args)
+
+
+class SearchController:
+    """
+    Busca de uma caixa de pesquisa executada no DatabaseExecutor.
+
+    search(connection, *args) roda fora da thread do Tk. schedule(*args) espera
+    o usuário parar de digitar; trigger(*args) busca na hora (botão ou Enter).
+    Uma nova busca cancela a anterior que ainda estiver em andamento,
+    interrompendo a query no servidor, e só o resultado da busca mais recente
+    chega a on_result.
+    """
+
+    def __init__(
+        self, widget, executor, search, on_result, on_error=None, delay_ms=SEARCH_DELAY_MS
+    ):
+        self.widget = widget
+        self.executor = executor
+        self.search = search
+        self.on_result = on_result
+        self.on_error = on_error
+        self.debouncer = Debouncer(widget, self.trigger, delay_ms)
+        self._task = None
+        self._generation = 0
+        self._last_args = None
+
+    def bind(self, entry, read=None):
+        """
+        Liga uma caixa de texto ao controlador: digitar agenda a busca e Enter
+        busca na hora. read(entry) monta os argumentos (padrão: o texto sem espaços).
+        """
+        read = read or (lambda widget: (widget.get().strip(),))
+        entry.bind("<KeyRelease>", lambda event: self.schedule(*read(entry)))
+        entry.bind("<Return>", lambda event: self.trigger(*read(entry)))
+
+    def schedule(self, *args):
+        # Teclas que não mudam o texto (setas, Shift, o próprio Enter) não geram nova busca
+        if args == self._last_args and not self.debouncer.pending:
+            return
+        self._last_args = args
+        self.debouncer.schedule(*args)
+
+    def trigger(self, *args):
+        self.debouncer.cancel()
+        self._last_args = args
+        self._cancel_running()
+        self._generation += 1
+        generation = self._generation
+        self._task = self.executor.submit(
+            self.search,
+            *args,
+            on_success=lambda result: self._deliver(generation, result),
+            on_error=lambda error: self._fail(generation, error),
+            widget=self.widget,
+        )
+
+    def cancel(self):
+        """Descarta a busca agendada e a que estiver em andamento"""
+        self.debouncer.cancel()
+        self._generation += 1
+        self._last_args = None
+        self._cancel_running()
+
+    def _cancel_running(self):
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel(interrupt=True)
+
+    def _deliver(self, generation, result):
+        if generation == self._generation:
+            self._task = None
+            self.on_result(result)
+
+    def _fail(self, generation, error):
+        if generation != self._generation:
+            return
+        self._task = None
+        if self.on_error is not None:
+            self.on_error(error)
+        else:
+            print(f"Erro na busca: {error}")
@@ -0,0 +1,152 @@
+import bisect
+import functools
+import os
+import re
+import time
+import unicodedata
+
+
+# Tempo de vida (segundos) de um índice de busca; depois disso ele é reconstruído em segundo plano
+SEARCH_INDEX_TTL = float(os.getenv("SEARCH_INDEX_TTL", "300"))
+
+# Uma busca só filtra o resultado da anterior se ele for menor que esta fração do índice
+NARROW_FRACTION = 0.05
+
+_RE_TOKEN = re.compile(r"\w+")
+
+
+# Função para normalizar um texto para busca: sem acentos e sem diferenciar maiúsculas
+def normalize(text):
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+# As mesmas palavras se repetem muito em um catálogo: a normalização de cada uma fica em cache
+_normalize_word = functools.lru_cache(maxsize=65536)(normalize)
+
+
+# Função para separar um texto em palavras normalizadas
+def tokenize(text):
+    text = str(text)
+    if not text.isascii():
+        # Acentos decompostos (letra + marca) viram um único caractere antes da separação
+        text = unicodedata.normalize("NFC", text)
+    return [_normalize_word(word) for word in _RE_TOKEN.findall(text)]
+
+
+class InvertedIndex:
+    """
+    Índice invertido em memória: cada palavra aponta para o conjunto de chaves
+    dos registros que a contêm. A busca ignora acentos e aceita prefixos
+    ("dom casm" encontra "Dom Casmurro"); todas as palavras da busca precisam
+    aparecer no registro.
+
+    O índice é montado uma vez (por exemplo, em uma thread do DatabaseExecutor)
+    e depois atualizado registro a registro com add e remove.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = SEARCH_INDEX_TTL if ttl is None else ttl
+        self._postings = {}
+        self._docs = {}
+        # Palavras em ordem alfabética para achar os prefixos com bisect (refeita sob demanda)
+        self._tokens = []
+        self._tokens_dirty = False
+        self._built_at = time.monotonic()
+        # Última busca: uma busca que só estende a anterior filtra o resultado dela
+        self._last = None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, key):
+        return key in self._docs
+
+    @property
+    def expired(self):
+        return self.ttl > 0 and time.monotonic() - self._built_at > self.ttl
+
+    def add(self, key, row, text):
+        """Indexa (ou reindexa) o registro row sob a chave key, a partir do texto informado"""
+        if key in self._docs:
+            self.remove(key)
+        tokens = frozenset(tokenize(text))
+        for token in tokens:
+            keys = self._postings.get(token)
+            if keys is None:
+                self._postings[token] = keys = set()
+                self._tokens_dirty = True
+            keys.add(key)
+        self._docs[key] = (row, tokens)
+        self._last = None
+
+    def remove(self, key):
+        """Remove o registro da chave key (sem efeito se ele não estiver indexado)"""
+        entry = self._docs.pop(key, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            keys = self._postings[token]
+            keys.discard(key)
+            if not keys:
+                del self._postings[token]
+                self._tokens_dirty = True
+        self._last = None
+
+    def row(self, key):
+        entry = self._docs.get(key)
+        return entry[0] if entry else None
+
+    def _keys_with_prefix(self, prefix):
+        if self._tokens_dirty:
+            self._tokens = sorted(self._postings)
+            self._tokens_dirty = False
+        tokens = self._tokens
+        start = bisect.bisect_left(tokens, prefix)
+        end = bisect.bisect_left(tokens, prefix + "\uffff", start)
+        if end - start == 1:
+            return self._postings[tokens[start]]
+        keys = set()
+        for token in tokens[start:end]:
+            keys.update(self._postings[token])
+        return keys
+
+    def _matches(self, key, prefixes):
+        tokens = self._docs[key][1]
+        return all(any(token.startswith(prefix) for token in tokens) for prefix in prefixes)
+
+    def search_keys(self, query):
+        """Retorna o conjunto de chaves dos registros que contêm todas as palavras da busca"""
+        prefixes = tuple(dict.fromkeys(tokenize(query)))
+        if not prefixes:
+            return set(self._docs)
+
+        last = self._last
+        if last is not None and last[0] == prefixes:
+            return last[1]
+        if (
+            last is not None
+            and len(last[0]) == len(prefixes)
+            and len(last[1]) <= NARROW_FRACTION * len(self._docs)
+            and all(new.startswith(old) for old, new in zip(last[0], prefixes))
+        ):
+            # O usuário continuou digitando: o resultado só pode encolher
+            keys = {key for key in last[1] if self._matches(key, prefixes)}
+        else:
+            candidates = sorted((self._keys_with_prefix(p) for p in prefixes), key=len)
+            keys = set(candidates[0])
+            for other in candidates[1:]:
+                if not keys:
+                    break
+                keys &= other
+
+        self._last = (prefixes, keys)
+        return keys
+
+    def search(self, query):
+        """Retorna os registros encontrados, em ordem de chave"""
+        docs = self._docs
+        return [docs[key][0] for key in sorted(self.search_keys(query))]
@@ -0,0 +1,806 @@
+"""
+Regras de negócio da biblioteca, independentes da interface gráfica.
+
+As telas do Tk, os scripts de carga e o benchmark chamam as mesmas funções,
+sempre recebendo uma conexão já aberta. Cada operação de escrita roda em uma
+única transação (com nova tentativa em deadlock) e retorna dados tipados;
+erros de banco são propagados para quem chamou.
+"""
+
+import datetime
+import functools
+from dataclasses import dataclass, field
+from typing import Optional
+import catalog_summary
+from db_backends import get_backend
+from db_utils import (
+    PAGE_SIZE,
+    KeysetQuery,
+    Page,
+    StaleReadError,
+    create_delete_query,
+    create_insert_query,
+    create_update_query,
+    delete_data,
+    insert_data,
+    insert_many,
+    read_data,
+    run_in_transaction,
+    update_data,
+    update_many,
+)
+from create_user import insert_user_with_address
+from search_index import tokenize
+
+
+# Valor da multa por dia de atraso na devolução
+FINE_PER_DAY = 2.00
+
+
+@dataclass(frozen=True)
+class BookInput:
+    """Dados de um livro com seus autores e sua categoria"""
+
+    titulo: str
+    isbn: str
+    ano_publicacao: int
+    editora: str
+    quantidade_copias: int
+    localizacao_estante: str
+    autor_ids: tuple = ()
+    categoria_id: Optional[int] = None
+
+    def columns(self):
+        return {
+            "titulo": self.titulo,
+            "isbn": self.isbn,
+            "ano_publicacao": self.ano_publicacao,
+            "editora": self.editora,
+            "quantidade_copias": self.quantidade_copias,
+            "localizacao_estante": self.localizacao_estante,
+        }
+
+
+@dataclass(frozen=True)
+class UserInput:
+    """Dados de cadastro de um usuário"""
+
+    nome: str
+    email: str
+    telefone: str
+    data_cadastro: datetime.datetime = field(default_factory=datetime.datetime.now)
+
+    def values(self):
+        return (
+            self.nome,
+            self.email,
+            self.telefone,
+            self.data_cadastro.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+
+
+@dataclass(frozen=True)
+class AddressInput:
+    """Endereço de um usuário"""
+
+    logradouro: str
+    numero: Optional[int]
+    complemento: str
+    bairro: str
+    cep: str
+    cidade: str
+    estado: str
+
+    def values(self):
+        return (
+            self.logradouro,
+            self.numero,
+            self.complemento,
+            self.bairro,
+            self.cep,
+            self.cidade,
+            self.estado,
+        )
+
+
+@dataclass(frozen=True)
+class ReturnResult:
+    """Resultado de uma devolução; multa é None quando não houve atraso"""
+
+    emprestimo_id: int
+    devolvido: bool
+    dias_atraso: int = 0
+    multa: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class ReserveResult:
+    """Resultado da criação de uma reserva"""
+
+    ok: bool
+    mensagem: str
+    reserva_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class CheckoutResult:
+    """Resultado de um empréstimo; emprestimo_id é None quando o livro não pôde ser emprestado"""
+
+    livro_id: int
+    ok: bool
+    mensagem: str
+    emprestimo_id: Optional[int] = None
+
+
+LOAN_INSERT_COLUMNS = [
+    "livro_id",
+    "usuario_id",
+    "data_emprestimo",
+    "data_devolucao_prevista",
+    "status_emprestimo",
+]
+LOAN_INSERT_QUERY = create_insert_query("emprestimos", LOAN_INSERT_COLUMNS)
+
+# Baixa condicional: só altera a linha se ainda houver cópia, e a trava até o commit.
+# Dois balcões disputando a última cópia não conseguem deixar o estoque negativo.
+TAKE_COPY_QUERY = """
+    UPDATE livros
+    SET quantidade_copias = quantidade_copias - 1
+    WHERE livro_id = %s
+    AND quantidade_copias > 0
+"""
+
+BOOK_UNAVAILABLE = "Livro indisponível: não há cópias para empréstimo"
+BOOK_NOT_FOUND = "Livro não encontrado"
+BOOK_REPEATED = "Livro repetido na cesta"
+
+
+# Função para explicar por que a baixa no estoque de um livro não alterou nenhuma linha
+def _unavailable(connection, livro_id):
+    exists = read_data(connection, "SELECT 1 FROM livros WHERE livro_id = %s", (livro_id,))
+    return CheckoutResult(livro_id, False, BOOK_UNAVAILABLE if exists else BOOK_NOT_FOUND)
+
+
+# Função para dar baixa em uma cópia e registrar o empréstimo (dentro de uma transação)
+def _insert_loan(connection, livro_id, usuario_id, data_devolucao):
+    # A baixa vem antes do insert: é ela que trava o livro e decide se há cópia
+    if not update_data(connection, TAKE_COPY_QUERY, (livro_id,)):
+        return _unavailable(connection, livro_id)
+
+    values = (livro_id, usuario_id, datetime.date.today(), data_devolucao, "Ativo")
+    emprestimo_id = insert_data(connection, LOAN_INSERT_QUERY, values)
+    catalog_summary.sync_copies(connection, livro_id)
+    return CheckoutResult(livro_id, True, "Empréstimo realizado com sucesso!", emprestimo_id)
+
+
+# Função para emprestar um livro a um usuário, retornando um CheckoutResult
+# (ok=False, sem alterar nada, quando não há cópia disponível)
+def checkout(connection, livro_id, usuario_id, data_devolucao):
+    return run_in_transaction(
+        connection, _insert_loan, int(livro_id), int(usuario_id), data_devolucao
+    )
+
+
+# Queries do empréstimo em cesta para n livros; o mesmo objeto de query é reaproveitado pelos
+# cursores preparados. No MySQL a leitura do estoque já trava as linhas (FOR UPDATE); no SQLite
+# a transação enxerga um retrato do banco e uma escrita concorrente faz a baixa falhar e repetir.
+@functools.lru_cache(maxsize=None)
+def _basket_statements(size, lock):
+    placeholders = ", ".join(["%s"] * size)
+    stock_query = f"""
+        SELECT livro_id, quantidade_copias
+        FROM livros
+        WHERE livro_id IN ({placeholders})
+        ORDER BY livro_id{lock}
+    """
+    take_query = f"""
+        UPDATE livros
+        SET quantidade_copias = quantidade_copias - 1
+        WHERE livro_id IN ({placeholders})
+        AND quantidade_copias > 0
+    """
+    return stock_query, take_query
+
+
+# Função para emprestar a cesta (dentro de uma transação): uma leitura do estoque de todos os
+# livros, uma baixa condicional e o insert só dos que têm cópia
+def _insert_basket(connection, livro_ids, usuario_id, data_devolucao):
+    lock = "" if get_backend().name == "sqlite" else " FOR UPDATE"
+    # Ordenados, para que duas cestas travem os livros sempre na mesma ordem
+    requested = sorted(set(livro_ids))
+    stock_query = _basket_statements(len(requested), lock)[0]
+    stock = dict(read_data(connection, stock_query, requested) or [])
+
+    available = [livro_id for livro_id in requested if stock.get(livro_id, 0) > 0]
+    loans = {}
+    if available:
+        take_query = _basket_statements(len(available), lock)[1]
+        if update_data(connection, take_query, available) != len(available):
+            # Algum livro acabou entre a leitura e a baixa: desfaz tudo e repete a transação,
+            # que relê o estoque e devolve esse livro como indisponível
+            raise StaleReadError(msg="O estoque mudou durante o empréstimo da cesta")
+        today = datetime.date.today()
+        # Um insert por livro, pelo mesmo cursor preparado, para ter o id real de cada
+        # empréstimo: os ids de um insert de várias linhas não são garantidamente consecutivos
+        for livro_id in available:
+            loans[livro_id] = insert_data(
+                connection, LOAN_INSERT_QUERY, (livro_id, usuario_id, today, data_devolucao, "Ativo")
+            )
+        catalog_summary.sync_copies_many(connection, available)
+
+    results = []
+    seen = set()
+    for livro_id in livro_ids:
+        if livro_id in seen:
+            results.append(CheckoutResult(livro_id, False, BOOK_REPEATED))
+        elif livro_id in loans:
+            results.append(
+                CheckoutResult(livro_id, True, "Empréstimo realizado com sucesso!", loans[livro_id])
+            )
+        else:
+            results.append(
+                CheckoutResult(livro_id, False, BOOK_UNAVAILABLE if livro_id in stock else BOOK_NOT_FOUND)
+            )
+        seen.add(livro_id)
+    return results
+
+
+# Função para emprestar vários livros a um usuário com um único commit, retornando um
+# CheckoutResult por livro da cesta, na mesma ordem (os indisponíveis não impedem os demais)
+def checkout_many(connection, livro_ids, usuario_id, data_devolucao):
+    livro_ids = [int(livro_id) for livro_id in livro_ids]
+    if not livro_ids:
+        return []
+    return run_in_transaction(
+        connection, _insert_basket, livro_ids, int(usuario_id), data_devolucao
+    )
+
+
+# Função para inserir a multa de um empréstimo, retornando o valor gerado
+def _insert_fine(connection, emprestimo_id, dias_atraso):
+    valor_multa = FINE_PER_DAY * dias_atraso
+    columns = ["emprestimo_id", "valor", "status_multas", "data_geracao"]
+    query = create_insert_query("multas", columns)
+    values = (emprestimo_id, valor_multa, "Devendo", datetime.date.today())
+    insert_data(connection, query, values)
+    return valor_multa
+
+
+# Função para gerar a multa de um empréstimo com atraso
+def generate_fine(connection, emprestimo_id, dias_atraso):
+    return run_in_transaction(connection, _insert_fine, int(emprestimo_id), dias_atraso)
+
+
+# Função para registrar a devolução, devolver o livro ao estoque e gerar a multa por atraso
+def _return_loan(connection, emprestimo_id, generate_fines, return_date):
+    query = """
+        SELECT data_devolucao_prevista, livro_id
+        FROM emprestimos
+        WHERE emprestimo_id = %s
+        AND status_emprestimo = 'Ativo'
+    """
+    result = read_data(connection, query, (emprestimo_id,))
+    if not result:
+        return ReturnResult(emprestimo_id, devolvido=False)
+
+    data_prevista, livro_id = result[0]
+
+    update_query = """
+        UPDATE emprestimos
+        SET status_emprestimo = 'Devolvido',
+            data_devolucao_real = %s
+        WHERE emprestimo_id = %s
+        AND status_emprestimo = 'Ativo'
+    """
+    if not update_data(connection, update_query, (return_date, emprestimo_id)):
+        # Devolvido por outra sessão entre a leitura e a atualização
+        return ReturnResult(emprestimo_id, devolvido=False)
+
+    update_query = """
+        UPDATE livros
+        SET quantidade_copias = quantidade_copias + 1
+        WHERE livro_id = %s
+    """
+    update_data(connection, update_query, (livro_id,))
+    catalog_summary.sync_copies(connection, livro_id)
+
+    dias_atraso = max((return_date - data_prevista).days, 0)
+    multa = None
+    if generate_fines and dias_atraso > 0:
+        multa = _insert_fine(connection, emprestimo_id, dias_atraso)
+    return ReturnResult(emprestimo_id, True, dias_atraso, multa)
+
+
+# Função para devolver um empréstimo ativo, gerando a multa por atraso na mesma transação
+def return_loan(connection, emprestimo_id, generate_fines=True, return_date=None):
+    return run_in_transaction(
+        connection,
+        _return_loan,
+        int(emprestimo_id),
+        generate_fines,
+        return_date or datetime.date.today(),
+    )
+
+
+# Função para conferir uma lista de ids: uma string ou um número soltos seriam percorridos
+# (ou recusados) de forma enganosa, então só listas, tuplas e conjuntos de inteiros são aceitos
+def _require_ids(ids, field):
+    if not isinstance(ids, (list, tuple, set, frozenset)):
+        raise ValueError(f"{field} deve ser uma lista de ids")
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in ids):
+        raise ValueError(f"{field} deve conter apenas ids inteiros")
+    return ids
+
+
+# Função para quitar as multas pendentes informadas, retornando quantas foram quitadas.
+# Todas na mesma transação: uma falha no meio do lote não deixa parte das multas quitada.
+def pay_fines(connection, multa_ids):
+    _require_ids(multa_ids, "multa_ids")
+    update_query = """
+        UPDATE multas
+        SET status_multas = 'Quitado',
+            data_pagamento = %s
+        WHERE multa_id = %s
+        AND status_multas = 'Devendo'
+    """
+    today = datetime.date.today()
+    values = [(today, multa_id) for multa_id in multa_ids]
+    if not values:
+        return 0
+    return run_in_transaction(connection, update_many, update_query, values)
+
+
+# Função para verificar se o usuário já tem uma reserva pendente para o livro
+def has_active_reservation(connection, livro_id, usuario_id):
+    query = """
+    SELECT COUNT(*)
+    FROM reservas
+    WHERE livro_id = %s
+    AND usuario_id = %s
+    AND status_reservas = 'Pendente'
+    """
+    result = read_data(connection, query, (livro_id, usuario_id))
+    return bool(result and result[0][0] > 0)
+
+
+def _insert_reservation(connection, livro_id, usuario_id):
+    if has_active_reservation(connection, livro_id, usuario_id):
+        return ReserveResult(False, "Você já possui uma reserva ativa para este livro")
+
+    columns = ["livro_id", "usuario_id", "data_reserva", "status_reservas"]
+    query = create_insert_query("reservas", columns)
+    values = (livro_id, usuario_id, datetime.date.today(), "Pendente")
+    reserva_id = insert_data(connection, query, values)
+    return ReserveResult(True, "Reserva realizada com sucesso!", reserva_id)
+
+
+# Função para criar uma reserva, recusando reservas pendentes duplicadas
+def create_reservation(connection, livro_id, usuario_id):
+    return run_in_transaction(
+        connection, _insert_reservation, int(livro_id), int(usuario_id)
+    )
+
+
+# Função para gravar os autores e a categoria de um livro
+def _insert_book_relations(connection, livro_id, book):
+    if book.autor_ids:
+        insert_many(
+            connection,
+            "INSERT INTO livrosautores (livro_id, autor_id) VALUES (%s, %s)",
+            [(livro_id, autor_id) for autor_id in book.autor_ids],
+        )
+    if book.categoria_id is not None:
+        query = create_insert_query("livroscategorias", ["livro_id", "categoria_id"])
+        insert_data(connection, query, (livro_id, book.categoria_id))
+
+
+def _insert_book(connection, book):
+    columns = book.columns()
+    livro_id = insert_data(
+        connection,
+        create_insert_query("livros", columns.keys()),
+        tuple(columns.values()),
+    )
+    if livro_id is None:
+        raise RuntimeError("Erro ao obter livro_id após inserção.")
+    _insert_book_relations(connection, livro_id, book)
+    catalog_summary.refresh_books(connection, [livro_id])
+    return livro_id
+
+
+# Função para cadastrar um livro com autores e categoria, retornando o livro_id
+def save_book(connection, book):
+    return run_in_transaction(connection, _insert_book, book)
+
+
+def _update_book(connection, livro_id, book):
+    columns = book.columns()
+    query = create_update_query("livros", columns.keys(), "livro_id = %s")
+    update_data(connection, query, (*columns.values(), livro_id))
+
+    # Relacionamentos são regravados por inteiro
+    delete_data(connection, create_delete_query("livrosautores", "livro_id = %s"), (livro_id,))
+    delete_data(connection, create_delete_query("livroscategorias", "livro_id = %s"), (livro_id,))
+    _insert_book_relations(connection, livro_id, book)
+    catalog_summary.refresh_books(connection, [livro_id])
+
+
+# Função para atualizar um livro e substituir seus autores e sua categoria
+def update_book(connection, livro_id, book):
+    run_in_transaction(connection, _update_book, int(livro_id), book)
+
+
+def _delete_book(connection, livro_id):
+    delete_data(connection, create_delete_query("livrosautores", "livro_id = %s"), (livro_id,))
+    delete_data(connection, create_delete_query("livroscategorias", "livro_id = %s"), (livro_id,))
+    delete_data(connection, create_delete_query("livros", "livro_id = %s"), (livro_id,))
+    catalog_summary.refresh_books(connection, [livro_id])
+
+
+# Função para remover um livro e seus relacionamentos
+def delete_book(connection, livro_id):
+    run_in_transaction(connection, _delete_book, int(livro_id))
+
+
+def _update_author(connection, autor_id, nome, nacionalidade):
+    query = create_update_query("autores", ["nome", "nacionalidade"], "autor_id = %s")
+    update_data(connection, query, (nome, nacionalidade, autor_id))
+    catalog_summary.refresh_author(connection, autor_id)
+
+
+# Função para atualizar um autor e o nome dele no resumo do catálogo
+def update_author(connection, autor_id, nome, nacionalidade):
+    run_in_transaction(connection, _update_author, int(autor_id), nome, nacionalidade)
+
+
+def _update_category(connection, categoria_id, nome, descricao):
+    query = create_update_query("categorias", ["nome", "descricao"], "categoria_id = %s")
+    update_data(connection, query, (nome, descricao, categoria_id))
+    catalog_summary.rename_category(connection, categoria_id, nome)
+
+
+# Função para atualizar uma categoria e o nome dela no resumo do catálogo
+def update_category(connection, categoria_id, nome, descricao):
+    run_in_transaction(connection, _update_category, int(categoria_id), nome, descricao)
+
+
+# Função para cadastrar um usuário com endereço, retornando o usuario_id
+def create_user(connection, user, address):
+    return run_in_transaction(
+        connection, insert_user_with_address, user.values(), address.values()
+    )
+
+
+@dataclass(frozen=True)
+class DeleteUserResult:
+    """Resultado da remoção de um usuário; removido é False quando ele não existe ou tem histórico"""
+
+    usuario_id: int
+    removido: bool
+    mensagem: str
+
+
+USER_NOT_FOUND = "Usuário não encontrado"
+
+# Empréstimos (com as multas deles) e reservas que impedem a remoção do usuário
+USER_HISTORY_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM emprestimos WHERE usuario_id = %s),
+        (SELECT COUNT(*) FROM reservas WHERE usuario_id = %s)
+"""
+
+
+def _delete_user(connection, usuario_id):
+    exists = read_data(
+        connection, "SELECT 1 FROM usuarios WHERE usuario_id = %s", (usuario_id,)
+    )
+    if not exists:
+        return DeleteUserResult(usuario_id, False, USER_NOT_FOUND)
+
+    loans, reservations = read_data(connection, USER_HISTORY_QUERY, (usuario_id, usuario_id))[0]
+    if loans or reservations:
+        return DeleteUserResult(
+            usuario_id,
+            False,
+            f"O usuário tem histórico na biblioteca ({loans} empréstimo(s), "
+            f"{reservations} reserva(s)) e não pode ser excluído",
+        )
+
+    address_ids = read_data(
+        connection,
+        "SELECT endereco_id FROM usuarioendereco WHERE usuario_id = %s",
+        (usuario_id,),
+    ) or []
+    delete_data(connection, create_delete_query("usuarioendereco", "usuario_id = %s"), (usuario_id,))
+    for (endereco_id,) in address_ids:
+        delete_data(connection, create_delete_query("endereco", "endereco_id = %s"), (endereco_id,))
+    delete_data(connection, create_delete_query("usuarios", "usuario_id = %s"), (usuario_id,))
+    return DeleteUserResult(usuario_id, True, "Usuário e dados relacionados excluídos com sucesso!")
+
+
+# Função para remover um usuário com seus endereços, retornando um DeleteUserResult
+# (removido=False, sem alterar nada, se o usuário não existe ou tem empréstimos ou reservas)
+def delete_user(connection, usuario_id):
+    return run_in_transaction(connection, _delete_user, int(usuario_id))
+
+
+# Colunas retornadas pelas consultas abaixo, na ordem das tuplas
+ACTIVE_LOAN_COLUMNS = (
+    "emprestimo_id", "livro_id", "titulo", "data_emprestimo", "data_devolucao_prevista",
+)
+LOAN_COLUMNS = ACTIVE_LOAN_COLUMNS + ("data_devolucao_real", "status_emprestimo")
+FINE_COLUMNS = (
+    "multa_id", "emprestimo_id", "valor", "status_multas", "data_geracao", "data_pagamento",
+)
+RESERVE_BOOK_COLUMNS = ("livro_id", "titulo", "quantidade_copias", "reservas_ativas")
+BOOK_COLUMNS = (
+    "livro_id", "titulo", "isbn", "ano_publicacao", "editora",
+    "quantidade_copias", "localizacao_estante",
+)
+BOOK_LIST_COLUMNS = BOOK_COLUMNS + ("autores", "categoria")
+USER_COLUMNS = ("usuario_id", "nome", "email", "telefone", "data_cadastro", "status_usuario")
+ADDRESS_COLUMNS = (
+    "endereco_id", "logradouro", "numero", "complemento", "bairro", "cidade", "estado", "cep",
+)
+
+
+# Função para consultar os empréstimos ativos de um usuário
+def active_loans(connection, usuario_id):
+    query = """
+        SELECT e.emprestimo_id, e.livro_id, l.titulo,
+            e.data_emprestimo, e.data_devolucao_prevista
+        FROM emprestimos e
+        JOIN livros l ON e.livro_id = l.livro_id
+        WHERE e.usuario_id = %s
+        AND e.status_emprestimo = 'Ativo'
+    """
+    return read_data(connection, query, (int(usuario_id),))
+
+
+# Função para consultar todos os empréstimos de um usuário, do mais recente ao mais antigo
+def user_loans(connection, usuario_id):
+    query = """
+        SELECT e.emprestimo_id, e.livro_id, l.titulo,
+               e.data_emprestimo, e.data_devolucao_prevista,
+               e.data_devolucao_real, e.status_emprestimo
+        FROM emprestimos e
+        JOIN livros l ON e.livro_id = l.livro_id
+        WHERE e.usuario_id = %s
+        ORDER BY e.data_emprestimo DESC
+    """
+    return read_data(connection, query, (int(usuario_id),))
+
+
+USER_LOANS_PAGE = KeysetQuery(
+    """
+    SELECT e.emprestimo_id, e.livro_id, l.titulo,
+           e.data_emprestimo, e.data_devolucao_prevista,
+           e.data_devolucao_real, e.status_emprestimo
+    FROM emprestimos e
+    JOIN livros l ON e.livro_id = l.livro_id
+    WHERE e.usuario_id = %s
+    AND {seek}
+    """,
+    ["e.data_emprestimo", "e.emprestimo_id"],
+    [3, 0],
+    descending=True,
+)
+
+
+# Função para consultar uma página dos empréstimos de um usuário (mais recentes primeiro)
+def user_loans_page(connection, usuario_id, after=None, limit=None):
+    return USER_LOANS_PAGE.page(connection, after, limit, (int(usuario_id),))
+
+
+# Função para consultar as multas de um usuário
+def user_fines(connection, usuario_id):
+    query = """
+        SELECT m.multa_id, m.emprestimo_id, m.valor,
+               m.status_multas, m.data_geracao, m.data_pagamento
+        FROM multas m
+        JOIN emprestimos e ON m.emprestimo_id = e.emprestimo_id
+        WHERE e.usuario_id = %s
+        ORDER BY m.data_geracao DESC
+    """
+    return read_data(connection, query, (int(usuario_id),))
+
+
+USER_FINES_PAGE = KeysetQuery(
+    """
+    SELECT m.multa_id, m.emprestimo_id, m.valor,
+           m.status_multas, m.data_geracao, m.data_pagamento
+    FROM multas m
+    JOIN emprestimos e ON m.emprestimo_id = e.emprestimo_id
+    WHERE e.usuario_id = %s
+    AND {seek}
+    """,
+    ["m.data_geracao", "m.multa_id"],
+    [4, 0],
+    descending=True,
+)
+
+
+# Função para consultar uma página das multas de um usuário (mais recentes primeiro)
+def user_fines_page(connection, usuario_id, after=None, limit=None):
+    return USER_FINES_PAGE.page(connection, after, limit, (int(usuario_id),))
+
+
+# Livros com cópia para empréstimo, pelo início do título (índice de catalogo_resumo.titulo)
+AVAILABLE_BOOKS_PAGE = KeysetQuery(
+    """
+    SELECT livro_id, titulo, quantidade_copias
+    FROM catalogo_resumo
+    WHERE titulo LIKE %s
+    AND quantidade_copias > 0
+    AND {seek}
+    """,
+    ["titulo", "livro_id"],
+    [1, 0],
+)
+
+USER_CHOICES_PAGE = KeysetQuery(
+    """
+    SELECT usuario_id, nome
+    FROM usuarios
+    WHERE nome LIKE %s
+    AND {seek}
+    """,
+    ["usuario_id"],
+    [0],
+)
+
+
+# Função para consultar uma página dos livros disponíveis cujo título começa com o texto
+def available_books_page(connection, text="", after=None, limit=None):
+    return AVAILABLE_BOOKS_PAGE.page(connection, after, limit, (f"{text}%",))
+
+
+# Função para consultar uma página dos usuários (usuario_id, nome) cujo nome começa com o texto
+def user_choices_page(connection, text="", after=None, limit=None):
+    return USER_CHOICES_PAGE.page(connection, after, limit, (f"{text}%",))
+
+
+# Função para consultar os livros sem cópias disponíveis, que podem ser reservados
+def books_for_reserve(connection):
+    query = """
+    SELECT l.livro_id, l.titulo, l.quantidade_copias,
+        COALESCE(r.total_reservas, 0) as reservas_ativas
+    FROM livros l
+    LEFT JOIN (
+        SELECT livro_id, COUNT(*) as total_reservas
+        FROM reservas
+        WHERE status_reservas = 'Pendente'
+        GROUP BY livro_id
+    ) r ON l.livro_id = r.livro_id
+    WHERE l.quantidade_copias = 0
+    ORDER BY l.titulo
+    """
+    return read_data(connection, query)
+
+
+# Lista de livros com autores e categoria, lida do resumo do catálogo (catalog_summary);
+# {seek} recebe a condição de filtro ou paginação
+BOOK_LIST_QUERY = f"""
+    SELECT {', '.join(BOOK_LIST_COLUMNS)}
+    FROM catalogo_resumo
+    WHERE {{seek}}
+"""
+
+
+# Busca textual: (livro_id, relevancia) dos livros encontrados, do mais relevante ao menos relevante.
+# No MySQL usa os índices FULLTEXT de livros (titulo, editora) e autores (nome);
+# no SQLite, a tabela FTS5 livros_busca (título com peso maior que autores e editora)
+MYSQL_BOOK_SEARCH = """
+    SELECT livro_id, SUM(relevancia) AS relevancia
+    FROM (
+        SELECT livro_id, MATCH(titulo, editora) AGAINST (%s IN BOOLEAN MODE) AS relevancia
+        FROM livros
+        WHERE MATCH(titulo, editora) AGAINST (%s IN BOOLEAN MODE)
+        UNION ALL
+        SELECT la.livro_id, MATCH(a.nome) AGAINST (%s IN BOOLEAN MODE)
+        FROM autores a
+        JOIN livrosautores la ON la.autor_id = a.autor_id
+        WHERE MATCH(a.nome) AGAINST (%s IN BOOLEAN MODE)
+    ) resultados
+    GROUP BY livro_id
+    ORDER BY relevancia DESC, livro_id
+    LIMIT %s OFFSET %s
+"""
+SQLITE_BOOK_SEARCH = """
+    SELECT rowid, -bm25(livros_busca, 10.0, 2.0, 5.0) AS relevancia
+    FROM livros_busca
+    WHERE livros_busca MATCH %s
+    ORDER BY relevancia DESC, rowid
+    LIMIT %s OFFSET %s
+"""
+
+
+# Função para buscar livros por palavras (ou começo de palavras) do título, da editora e dos autores.
+# Retorna uma db_utils.Page com as linhas de BOOK_LIST_COLUMNS em ordem de relevância;
+# next_key é o deslocamento da próxima página, no formato aceito pela PageBar
+def search_books(connection, text, after=None, limit=None):
+    words = tokenize(text)
+    if not words:
+        return Page([], None)
+    limit = int(limit or PAGE_SIZE)
+    offset = int(after[0]) if after else 0
+
+    # As palavras já vêm sem acentos e sem operadores; cada uma vale como prefixo
+    if get_backend().name == "sqlite":
+        term = " OR ".join(f'"{word}"*' for word in words)
+        ranked = read_data(connection, SQLITE_BOOK_SEARCH, (term, limit + 1, offset))
+    else:
+        term = " ".join(f"{word}*" for word in words)
+        ranked = read_data(
+            connection, MYSQL_BOOK_SEARCH, (term, term, term, term, limit + 1, offset)
+        )
+    ranked = ranked or []
+    next_key = (offset + limit,) if len(ranked) > limit else None
+    livro_ids = [row[0] for row in ranked[:limit]]
+    if not livro_ids:
+        return Page([], None)
+
+    placeholders = ", ".join(["%s"] * len(livro_ids))
+    query = BOOK_LIST_QUERY.format(seek=f"livro_id IN ({placeholders})")
+    rows = {row[0]: row for row in read_data(connection, query, livro_ids) or []}
+    return Page([rows[livro_id] for livro_id in livro_ids if livro_id in rows], next_key)
+
+
+# Função para listar livros em páginas ordenadas pelo livro_id (após o id informado)
+def list_books(connection, after_id=0, limit=100):
+    query = """
+        SELECT livro_id, titulo, isbn, ano_publicacao, editora,
+               quantidade_copias, localizacao_estante
+        FROM livros
+        WHERE livro_id > %s
+        ORDER BY livro_id
+        LIMIT %s
+    """
+    return read_data(connection, query, (int(after_id), int(limit)))
+
+
+# Função para consultar um livro com os ids de seus autores e de sua categoria
+def get_book(connection, livro_id):
+    query = """
+        SELECT livro_id, titulo, isbn, ano_publicacao, editora,
+               quantidade_copias, localizacao_estante
+        FROM livros
+        WHERE livro_id = %s
+    """
+    result = read_data(connection, query, (int(livro_id),))
+    if not result:
+        return None
+    book = dict(zip(BOOK_COLUMNS, result[0]))
+    authors = read_data(
+        connection, "SELECT autor_id FROM livrosautores WHERE livro_id = %s", (book["livro_id"],)
+    ) or []
+    category = read_data(
+        connection, "SELECT categoria_id FROM livroscategorias WHERE livro_id = %s", (book["livro_id"],)
+    )
+    book["autor_ids"] = [row[0] for row in authors]
+    book["categoria_id"] = category[0][0] if category else None
+    return book
+
+
+# Função para consultar um usuário com seus endereços
+def get_user(connection, usuario_id):
+    result = read_data(
+        connection,
+        f"SELECT {', '.join(USER_COLUMNS)} FROM usuarios WHERE usuario_id = %s",
+        (int(usuario_id),),
+    )
+    if not result:
+        return None
+    user = dict(zip(USER_COLUMNS, result[0]))
+    addresses = read_data(
+        connection,
+        f"""
+        SELECT {', '.join('e.' + column for column in ADDRESS_COLUMNS)}
+        FROM endereco e
+        JOIN usuarioendereco ue ON ue.endereco_id = e.endereco_id
+        WHERE ue.usuario_id = %s
+        """,
+        (user["usuario_id"],),
+    ) or []
+    user["enderecos"] = [dict(zip(ADDRESS_COLUMNS, row)) for row in addresses]
+    return user
@@ -0,0 +1,55 @@
+"""
+Fixtures dos testes: um banco SQLite em arquivo temporário, criado pelo script do
+projeto e populado pelo generate_data com uma massa pequena.
+
+    python -m pytest -q
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_backends import SQLiteBackend  # noqa: E402
+from db_utils import close_connection_pool, get_database_connection, use_backend  # noqa: E402
+from generate_data import DatasetGenerator, clear_tables, populate  # noqa: E402
+import reference_cache  # noqa: E402
+
+
+# Massa pequena: suficiente para emprestar, devolver e paginar sem deixar os testes lentos
+TAMANHOS = {
+    "categorias": 5,
+    "autores": 30,
+    "livros": 60,
+    "usuarios": 20,
+    "emprestimos": 80,
+    "reservas": 10,
+}
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """Banco SQLite vazio (só o esquema), usado pelo pool de conexões durante o teste"""
+    backend = use_backend(SQLiteBackend(str(tmp_path / "biblioteca.db")))
+    reference_cache.invalidate_authors()
+    reference_cache.invalidate_categories()
+    yield backend
+    close_connection_pool()
+    reference_cache.invalidate_authors()
+    reference_cache.invalidate_categories()
+
+
+@pytest.fixture
+def connection(backend):
+    """Conexão do pool com o banco populado"""
+    connection = get_database_connection()
+    with contextlib.redirect_stdout(io.StringIO()):
+        clear_tables(connection)
+        populate(connection, DatasetGenerator(TAMANHOS, seed=7))
+    yield connection
+    connection.close()
@@ -0,0 +1,143 @@
+import asyncio
+import datetime
+
+import pytest
+
+import api_server
+
+
+RETURN_DATE = str(datetime.date.today() + datetime.timedelta(days=7))
+
+BOOK = {
+    "titulo": "Livro de Teste",
+    "isbn": "9781111111111",
+    "ano_publicacao": 2001,
+    "editora": "Editora",
+    "quantidade_copias": 2,
+    "localizacao_estante": "ABC12",
+}
+
+ADDRESS = {"logradouro": "Rua A", "numero": "10", "cep": "01234567", "cidade": "São Paulo", "estado": "SP"}
+USER = {"nome": "Ana", "email": "ana@exemplo.com", "telefone": "11912345678", "endereco": ADDRESS}
+
+
+@pytest.fixture
+def call(connection):
+    server = api_server.ApiServer(max_workers=2)
+
+    def call(method, target, body=None):
+        return asyncio.run(server.dispatch(method, target, body or {}))
+
+    yield call
+    server.workers.shutdown(wait=True)
+
+
+@pytest.mark.parametrize(
+    "target",
+    [
+        "/livros?limite=-1",
+        "/livros?limite=0",
+        "/livros?limite=abc",
+        "/livros?apos=-1",
+        "/livros/busca?q=a&pagina=0",
+        "/livros/busca?q=a&limite=-1",
+        "/livros/busca?q=a&pagina=x",
+    ],
+)
+def test_page_parameters_are_validated(call, target):
+    status, data = call("GET", target)
+    assert status == 400
+    assert "erro" in data
+
+
+def test_page_size_is_capped(call, monkeypatch):
+    monkeypatch.setattr(api_server, "MAX_PAGE_SIZE", 5)
+    status, data = call("GET", "/livros?limite=1000")
+    assert status == 200
+    assert len(data) == 5
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        {"autor_ids": "12"},
+        {"autor_ids": [1, "2"]},
+        {"autor_ids": [True]},
+        {"autor_ids": {"1": 1}},
+        {"categoria_id": "3"},
+    ],
+)
+def test_create_book_rejects_malformed_references(call, extra):
+    status, data = call("POST", "/livros", {**BOOK, **extra})
+    assert status == 400
+    assert "erro" in data
+
+
+def test_create_book_with_authors_and_category(call):
+    status, data = call("POST", "/livros", {**BOOK, "autor_ids": [1, 2], "categoria_id": 1})
+    assert status == 201
+    status, book = call("GET", f"/livros/{data['livro_id']}")
+    assert status == 200
+
+
+def test_create_book_unknown_author(call):
+    status, data = call("POST", "/livros", {**BOOK, "autor_ids": [999999]})
+    assert status == 400
+    assert "999999" in data["erro"]
+
+
+def test_duplicate_isbn_is_a_conflict_without_driver_text(call):
+    assert call("POST", "/livros", BOOK)[0] == 201
+    status, data = call("POST", "/livros", BOOK)
+    assert status == 409
+    assert "UNIQUE" not in data["erro"]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {**USER, "endereco": "x"},
+        {key: value for key, value in USER.items() if key != "endereco"},
+        {**USER, "nome": 5},
+        {**USER, "email": "ana"},
+        {**USER, "telefone": "123"},
+        {**USER, "endereco": {**ADDRESS, "cep": "1"}},
+        {**USER, "endereco": {**ADDRESS, "estado": "S1"}},
+        {**USER, "endereco": {**ADDRESS, "numero": "dez"}},
+        {**USER, "endereco": {**ADDRESS, "bairro": [1]}},
+    ],
+)
+def test_create_user_validates_body(call, body):
+    status, data = call("POST", "/usuarios", body)
+    assert status == 400
+    assert "erro" in data
+
+
+def test_create_user_and_duplicate_email(call):
+    status, data = call("POST", "/usuarios", USER)
+    assert status == 201
+    assert "usuario_id" in data
+    assert call("POST", "/usuarios", USER)[0] == 409
+
+
+def test_loan_for_unknown_user_is_a_client_error(call):
+    status, data = call(
+        "POST", "/emprestimos", {"livro_id": 1, "usuario_id": 999999, "data_devolucao": RETURN_DATE}
+    )
+    assert status == 400
+    assert "FOREIGN KEY" not in data["erro"]
+
+
+@pytest.mark.parametrize("multa_ids", ["12", [], [1, "2"], [True]])
+def test_pay_fines_requires_integer_ids(call, multa_ids):
+    status, _ = call("POST", "/multas/pagamento", {"multa_ids": multa_ids})
+    assert status == 400
+
+
+def test_basket_loan_requires_integer_ids(call):
+    status, _ = call(
+        "POST",
+        "/emprestimos/cesta",
+        {"livro_ids": "123", "usuario_id": 1, "data_devolucao": RETURN_DATE},
+    )
+    assert status == 400
@@ -0,0 +1,112 @@
+import sqlite3
+
+import pytest
+
+from db_backends import (
+    DUPLICATE_ENTRY_ERRNO,
+    FOREIGN_KEY_ERRNO,
+    SCHEMA_FILE,
+    IntegrityError,
+    translate_query,
+    translate_schema,
+)
+from db_utils import insert_data, read_data, run_in_transaction
+
+
+def test_translate_query_placeholders_and_functions():
+    query = "SELECT LAST_INSERT_ID(), NOW(), CURDATE() FROM livros WHERE livro_id = %s AND titulo = %s"
+    assert translate_query(query) == (
+        "SELECT last_insert_rowid(), CURRENT_TIMESTAMP, CURRENT_DATE "
+        "FROM livros WHERE livro_id = ? AND titulo = ?"
+    )
+
+
+def test_translate_query_group_concat_separator():
+    assert (
+        translate_query("SELECT GROUP_CONCAT(a.nome SEPARATOR ', ') FROM autores a")
+        == "SELECT GROUP_CONCAT(a.nome, ', ') FROM autores a"
+    )
+
+
+def test_translate_query_group_concat_distinct_uses_aggregate():
+    assert (
+        translate_query("SELECT GROUP_CONCAT(DISTINCT a.nome SEPARATOR '; ') FROM autores a")
+        == "SELECT group_concat_distinct(a.nome, '; ') FROM autores a"
+    )
+
+
+def test_translate_schema_statements():
+    script = """
+        CREATE DATABASE biblioteca;
+        USE biblioteca;
+        -- comentário
+        CREATE TABLE Autores (
+            autor_id INT PRIMARY KEY AUTO_INCREMENT,
+            nome VARCHAR(100)
+        );
+        CREATE INDEX idx_nome ON Autores (nome);
+        CREATE FULLTEXT INDEX ft_nome ON Autores (nome);
+    """
+    statements = translate_schema(script)
+    assert len(statements) == 2
+    assert statements[0].startswith("CREATE TABLE IF NOT EXISTS Autores")
+    assert "INTEGER PRIMARY KEY AUTOINCREMENT" in statements[0]
+    assert "comentário" not in statements[0]
+    assert statements[1] == "CREATE INDEX IF NOT EXISTS idx_nome ON Autores (nome)"
+
+
+def test_translate_schema_runs_project_script():
+    with open(SCHEMA_FILE, encoding="utf-8") as file:
+        statements = translate_schema(file.read())
+    raw = sqlite3.connect(":memory:")
+    for statement in statements:
+        raw.execute(statement)
+    tables = {row[0].lower() for row in raw.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"livros", "autores", "usuarios", "emprestimos", "multas", "reservas"} <= tables
+
+
+def test_group_concat_distinct_keeps_commas_in_values(connection):
+    def add_authors(connection):
+        for autor_id, nome in ((901, "Silva, Ana"), (902, "Souza, Bruno")):
+            insert_data(
+                connection, "INSERT INTO autores (autor_id, nome) VALUES (%s, %s)", (autor_id, nome)
+            )
+            # Os dois livros repetem os autores: o DISTINCT precisa remover as repetições
+            for livro_id in (1, 2):
+                insert_data(
+                    connection,
+                    "INSERT INTO livrosautores (livro_id, autor_id) VALUES (%s, %s)",
+                    (livro_id, autor_id),
+                )
+
+    run_in_transaction(connection, add_authors)
+    rows = read_data(
+        connection,
+        """
+        SELECT GROUP_CONCAT(DISTINCT a.nome SEPARATOR ' | ')
+        FROM livrosautores la
+        JOIN autores a ON a.autor_id = la.autor_id
+        WHERE la.livro_id IN (1, 2) AND a.autor_id IN (901, 902)
+        """,
+    )
+    assert sorted(rows[0][0].split(" | ")) == ["Silva, Ana", "Souza, Bruno"]
+
+
+@pytest.mark.parametrize(
+    "query, values, errno",
+    [
+        ("UPDATE usuarios SET email = (SELECT email FROM usuarios WHERE usuario_id = 2) "
+         "WHERE usuario_id = %s", (1,), DUPLICATE_ENTRY_ERRNO),
+        ("INSERT INTO reservas (livro_id, usuario_id, data_reserva, status_reservas) "
+         "VALUES (%s, %s, CURDATE(), 'Pendente')", (1, 999999), FOREIGN_KEY_ERRNO),
+    ],
+)
+def test_integrity_errors_carry_mysql_errno(connection, query, values, errno):
+    cursor = connection.cursor()
+    try:
+        with pytest.raises(IntegrityError) as raised:
+            cursor.execute(query, values)
+    finally:
+        cursor.close()
+        connection.rollback()
+    assert raised.value.errno == errno
@@ -0,0 +1,106 @@
+import pytest
+
+from db_utils import (
+    Error,
+    KeysetQuery,
+    StaleReadError,
+    get_transaction_stats,
+    read_data,
+    run_in_transaction,
+    update_data,
+)
+
+
+BOOKS = KeysetQuery(
+    "SELECT livro_id, titulo FROM livros WHERE ano_publicacao >= %s AND {seek}",
+    key_columns=("livro_id",),
+    key_indexes=(0,),
+)
+
+BOOKS_BY_TITLE = KeysetQuery(
+    "SELECT titulo, livro_id FROM livros WHERE {seek}",
+    key_columns=("titulo", "livro_id"),
+    key_indexes=(0, 1),
+    descending=True,
+)
+
+
+def _all_pages(query, connection, limit, values=()):
+    pages = []
+    after = None
+    while True:
+        page = query.page(connection, after, limit, values)
+        pages.append(page.rows)
+        if page.next_key is None:
+            return pages
+        after = page.next_key
+
+
+def test_keyset_query_builds_first_and_next_queries():
+    assert BOOKS.first_query == (
+        "SELECT livro_id, titulo FROM livros WHERE ano_publicacao >= %s AND 1 = 1 "
+        "ORDER BY livro_id LIMIT %s"
+    )
+    assert BOOKS.next_query == (
+        "SELECT livro_id, titulo FROM livros WHERE ano_publicacao >= %s AND livro_id > %s "
+        "ORDER BY livro_id LIMIT %s"
+    )
+    assert "(titulo, livro_id) < (%s, %s)" in BOOKS_BY_TITLE.next_query
+    assert BOOKS_BY_TITLE.next_query.endswith("ORDER BY titulo DESC, livro_id DESC LIMIT %s")
+
+
+def test_keyset_pages_cover_every_row_once(connection):
+    expected = read_data(
+        connection,
+        "SELECT livro_id, titulo FROM livros WHERE ano_publicacao >= %s ORDER BY livro_id",
+        (1990,),
+    )
+    pages = _all_pages(BOOKS, connection, 7, (1990,))
+    assert all(len(rows) == 7 for rows in pages[:-1])
+    assert 0 < len(pages[-1]) <= 7
+    assert [row for rows in pages for row in rows] == expected
+
+
+def test_keyset_composite_descending_key(connection):
+    # Títulos repetidos: só a chave composta (titulo, livro_id) mantém a ordem sem pular linhas
+    update_data(connection, "UPDATE livros SET titulo = %s WHERE livro_id <= %s", ("Repetido", 10))
+    expected = read_data(
+        connection, "SELECT titulo, livro_id FROM livros ORDER BY titulo DESC, livro_id DESC"
+    )
+    pages = _all_pages(BOOKS_BY_TITLE, connection, 4)
+    assert [row for rows in pages for row in rows] == expected
+
+
+def test_keyset_last_page_has_no_next_key(connection):
+    total = read_data(connection, "SELECT COUNT(*) FROM livros")[0][0]
+    page = BOOKS.page(connection, None, total, (0,))
+    assert len(page.rows) == total
+    assert page.next_key is None
+
+
+def test_run_in_transaction_retries_stale_read(connection):
+    attempts = []
+
+    def work(connection):
+        attempts.append(1)
+        update_data(connection, "UPDATE livros SET quantidade_copias = %s WHERE livro_id = %s", (3, 1))
+        if len(attempts) == 1:
+            raise StaleReadError(msg="estoque mudou")
+        return "ok"
+
+    retries = get_transaction_stats()["retries"]
+    assert run_in_transaction(connection, work) == "ok"
+    assert len(attempts) == 2
+    assert get_transaction_stats()["retries"] == retries + 1
+
+
+def test_run_in_transaction_rolls_back_on_error(connection):
+    before = read_data(connection, "SELECT quantidade_copias FROM livros WHERE livro_id = 1")[0][0]
+
+    def work(connection):
+        update_data(connection, "UPDATE livros SET quantidade_copias = %s WHERE livro_id = %s", (99, 1))
+        raise Error(msg="falha")
+
+    with pytest.raises(Error):
+        run_in_transaction(connection, work)
+    assert read_data(connection, "SELECT quantidade_copias FROM livros WHERE livro_id = 1")[0][0] == before
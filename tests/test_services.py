@@ -0,0 +1,142 @@
+import datetime
+
+import pytest
+
+import catalog_summary
+import db_utils
+from db_utils import Error, read_data, update_data
+import services
+
+
+RETURN_DATE = datetime.date.today() + datetime.timedelta(days=14)
+USUARIO_ID = 3
+
+
+def _set_stock(connection, stock):
+    for livro_id, copies in stock.items():
+        update_data(
+            connection,
+            "UPDATE livros SET quantidade_copias = %s WHERE livro_id = %s",
+            (copies, livro_id),
+        )
+    catalog_summary.refresh_books(connection, list(stock))
+
+
+def _stock(connection, livro_id):
+    return read_data(
+        connection, "SELECT quantidade_copias FROM livros WHERE livro_id = %s", (livro_id,)
+    )[0][0]
+
+
+def _loan(connection, emprestimo_id):
+    rows = read_data(
+        connection,
+        "SELECT livro_id, usuario_id, status_emprestimo FROM emprestimos WHERE emprestimo_id = %s",
+        (emprestimo_id,),
+    )
+    return rows[0] if rows else None
+
+
+def test_checkout_takes_a_copy_and_returns_the_loan_id(connection):
+    _set_stock(connection, {5: 2})
+    result = services.checkout(connection, 5, USUARIO_ID, RETURN_DATE)
+    assert result.ok
+    assert _stock(connection, 5) == 1
+    assert _loan(connection, result.emprestimo_id) == (5, USUARIO_ID, "Ativo")
+
+
+def test_checkout_without_copies_changes_nothing(connection):
+    _set_stock(connection, {5: 0})
+    loans = read_data(connection, "SELECT COUNT(*) FROM emprestimos")[0][0]
+    result = services.checkout(connection, 5, USUARIO_ID, RETURN_DATE)
+    assert not result.ok
+    assert result.mensagem == services.BOOK_UNAVAILABLE
+    assert _stock(connection, 5) == 0
+    assert read_data(connection, "SELECT COUNT(*) FROM emprestimos")[0][0] == loans
+
+
+def test_checkout_unknown_book(connection):
+    result = services.checkout(connection, 999999, USUARIO_ID, RETURN_DATE)
+    assert not result.ok
+    assert result.mensagem == services.BOOK_NOT_FOUND
+
+
+def test_checkout_many_results_stock_and_ids(connection):
+    _set_stock(connection, {7: 2, 8: 0, 9: 1})
+    results = services.checkout_many(connection, [9, 8, 7, 7, 999999], USUARIO_ID, RETURN_DATE)
+
+    assert [(result.livro_id, result.ok, result.mensagem) for result in results] == [
+        (9, True, "Empréstimo realizado com sucesso!"),
+        (8, False, services.BOOK_UNAVAILABLE),
+        (7, True, "Empréstimo realizado com sucesso!"),
+        (7, False, services.BOOK_REPEATED),
+        (999999, False, services.BOOK_NOT_FOUND),
+    ]
+    assert (_stock(connection, 7), _stock(connection, 8), _stock(connection, 9)) == (1, 0, 0)
+    for result in results:
+        if result.ok:
+            assert _loan(connection, result.emprestimo_id) == (result.livro_id, USUARIO_ID, "Ativo")
+    summary = read_data(
+        connection,
+        "SELECT livro_id, quantidade_copias FROM catalogo_resumo WHERE livro_id IN (7, 8, 9) ORDER BY livro_id",
+    )
+    assert summary == [(7, 1), (8, 0), (9, 0)]
+
+
+def test_checkout_many_retries_when_stock_changes(connection, monkeypatch):
+    # A primeira leitura do estoque enxerga uma cópia que já não existe na hora da baixa
+    _set_stock(connection, {7: 1, 8: 0})
+    read = services.read_data
+    stale = []
+
+    def stale_read(connection, query, values=None):
+        rows = read(connection, query, values)
+        if "ORDER BY livro_id" in query and not stale:
+            stale.append(query)
+            return [(livro_id, 1) for livro_id, _ in rows]
+        return rows
+
+    monkeypatch.setattr(services, "read_data", stale_read)
+    results = services.checkout_many(connection, [7, 8], USUARIO_ID, RETURN_DATE)
+
+    assert [(result.livro_id, result.ok) for result in results] == [(7, True), (8, False)]
+    assert results[1].mensagem == services.BOOK_UNAVAILABLE
+    assert (_stock(connection, 7), _stock(connection, 8)) == (0, 0)
+
+
+def test_pay_fines_is_all_or_nothing(connection, monkeypatch):
+    multa_ids = [
+        row[0]
+        for row in read_data(
+            connection, "SELECT multa_id FROM multas WHERE status_multas = 'Devendo' ORDER BY multa_id"
+        )
+    ][:4]
+    assert len(multa_ids) >= 2
+    monkeypatch.setattr(db_utils, "BATCH_SIZE", 1)
+    executemany = db_utils.timed_executemany
+    calls = []
+
+    def failing(cursor, query, values):
+        calls.append(values)
+        if len(calls) == 2:
+            raise Error(msg="falha no segundo lote")
+        return executemany(cursor, query, values)
+
+    monkeypatch.setattr(db_utils, "timed_executemany", failing)
+    with pytest.raises(Error):
+        services.pay_fines(connection, multa_ids)
+    placeholders = ", ".join(["%s"] * len(multa_ids))
+    paid = read_data(
+        connection,
+        f"SELECT COUNT(*) FROM multas WHERE status_multas = 'Quitado' AND multa_id IN ({placeholders})",
+        multa_ids,
+    )[0][0]
+    assert paid == 0
+
+    monkeypatch.setattr(db_utils, "timed_executemany", executemany)
+    assert services.pay_fines(connection, multa_ids) == len(multa_ids)
+
+
+def test_pay_fines_rejects_non_integer_ids(connection):
+    with pytest.raises(ValueError):
+        services.pay_fines(connection, "12")
@@ -1,4 +1,5 @@
-from db_utils import create_read_query, read_data
+from db_utils import read_data
+from reference_cache import authors, categories
 
 
 # Função completa validar email
@@ -38,6 +39,29 @@ def validate_location(location):
 
 # Função validar existência de um autor na base de dados 
 def check_author_exists(connection, autor_id):
-    query = create_read_query("autores", ["autor_id"])
-    result = read_data(connection, query)
-    return any(row[0] == autor_id for row in result)
\ No newline at end of file
+    return authors.contains(connection, autor_id)
+
+
+# Função para descobrir quais ids não existem na tabela, com uma única query indexada
+def find_missing_ids(connection, table, id_column, ids):
+    ids = sorted(set(ids))
+    if not ids:
+        return set()
+    placeholders = ", ".join(["%s"] * len(ids))
+    query = f"SELECT {id_column} FROM {table} WHERE {id_column} IN ({placeholders})"
+    result = read_data(connection, query, tuple(ids)) or []
+    return set(ids) - {row[0] for row in result}
+
+
+# Função para validar vários autores de uma vez, retornando os ids não cadastrados
+def find_missing_authors(connection, autor_ids, cached=False):
+    if cached:
+        return authors.missing(connection, autor_ids)
+    return find_missing_ids(connection, "autores", "autor_id", autor_ids)
+
+
+# Função para validar várias categorias de uma vez, retornando os ids não cadastrados
+def find_missing_categories(connection, categoria_ids, cached=False):
+    if cached:
+        return categories.missing(connection, categoria_ids)
+    return find_missing_ids(connection, "categorias", "categoria_id", categoria_ids)
\ No newline at end of file
@@ -0,0 +1,480 @@
+import datetime
+from decimal import Decimal
+from tkinter import messagebox, ttk
+from db_utils import PAGE_SIZE
+
+
+# Linhas roladas por movimento da roda do mouse
+WHEEL_ROWS = 3
+
+# Opções de linhas por página oferecidas pela PageBar
+PAGE_SIZES = (50, 100, 200, 500, 1000)
+
+# Máscara dos modificadores Shift e Control em event.state
+_ADDITIVE_STATE = 0x0001 | 0x0004
+
+
+def _sort_key(value):
+    """Chave de ordenação que aceita colunas com None e tipos diferentes"""
+    if value is None:
+        return (3, "")
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return (0, value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return (1, value.isoformat())
+    return (2, str(value).lower())
+
+
+class GridModel:
+    """
+    Modelo de linhas da VirtualGrid: guarda as tuplas vindas do banco e a
+    visão atual (posições filtradas e ordenadas) sem criar widgets.
+    """
+
+    def __init__(self):
+        self.rows = []
+        # None = todas as linhas na ordem de chegada (evita uma lista de índices)
+        self._view = None
+        self._filter = None
+        self._sort = None
+
+    def __len__(self):
+        return len(self.rows) if self._view is None else len(self._view)
+
+    def clear(self):
+        self.rows = []
+        self._view = None if self._filter is None and self._sort is None else []
+
+    def append(self, rows):
+        start = len(self.rows)
+        self.rows.extend(rows)
+        if self._view is None:
+            return
+        indexes = range(start, len(self.rows))
+        if self._filter is not None:
+            indexes = [i for i in indexes if self._filter(self.rows[i])]
+        self._view.extend(indexes)
+        if self._sort is not None:
+            # A visão já está ordenada: o timsort só intercala o lote novo
+            self._apply_sort()
+
+    def set_filter(self, predicate):
+        self._filter = predicate
+        self._rebuild()
+
+    def sort(self, column, reverse=False):
+        self._sort = (column, reverse)
+        self._rebuild()
+
+    @property
+    def sort_state(self):
+        return self._sort
+
+    def _rebuild(self):
+        if self._filter is None and self._sort is None:
+            self._view = None
+            return
+        if self._filter is None:
+            self._view = list(range(len(self.rows)))
+        else:
+            self._view = [i for i, row in enumerate(self.rows) if self._filter(row)]
+        if self._sort is not None:
+            self._apply_sort()
+
+    def _apply_sort(self):
+        column, reverse = self._sort  # type: ignore
+        rows = self.rows
+        self._view.sort(key=lambda i: _sort_key(rows[i][column]), reverse=reverse)  # type: ignore
+
+    def index(self, position):
+        """Índice em rows da linha exibida na posição informada"""
+        return position if self._view is None else self._view[position]
+
+    def row(self, position):
+        return self.rows[self.index(position)]
+
+    def view_rows(self):
+        """Linhas na ordem exibida (após filtro e ordenação)"""
+        if self._view is None:
+            return iter(self.rows)
+        return (self.rows[i] for i in self._view)
+
+
+class VirtualGrid(ttk.Frame):
+    """
+    Tabela para resultados grandes: as linhas ficam no GridModel e o Treeview
+    contém apenas os itens da janela visível, que são reaproveitados na rolagem.
+    Ordenação (clique no cabeçalho) e filtro são feitos no modelo.
+
+    formatter(row) converte uma linha do banco nos valores exibidos; é chamado
+    apenas para as linhas visíveis. Quando a ordem das colunas exibidas difere
+    da linha do banco, source_indexes informa a posição de cada coluna na linha
+    (usada na ordenação).
+    """
+
+    def __init__(self, parent, columns, formatter=None, selectmode="extended",
+                 height=15, xscroll=False, sortable=True, source_indexes=None):
+        super().__init__(parent)
+        self.columns = tuple(columns)
+        self.source_indexes = tuple(source_indexes or range(len(self.columns)))
+        self.model = GridModel()
+        self.formatter = formatter
+        self.selectmode = selectmode
+        self.sortable = sortable
+        self.offset = 0
+        self.cursor = None
+        self.selected = set()
+        self._items = []
+        self._attached = 0
+        self._rendered_selection = ()
+        self._additive = False
+        self._tree_height = None
+        self._headings = {column: column for column in self.columns}
+
+        self.tree = ttk.Treeview(
+            self, columns=self.columns, show="headings",
+            selectmode=selectmode, height=height,
+        )
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        if xscroll:
+            x_scrollbar = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+            self.tree.configure(xscrollcommand=x_scrollbar.set)
+            x_scrollbar.grid(row=1, column=0, sticky="ew")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        for column in self.columns:
+            self.heading(column, text=column)
+
+        self._resize(height)
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<ButtonPress-1>", self._on_press)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self._scroll_by(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda event: self._scroll_by(WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda event: self._move_cursor(-1))
+        self.tree.bind("<Down>", lambda event: self._move_cursor(1))
+        self.tree.bind("<Prior>", lambda event: self._move_cursor(-self.page_size))
+        self.tree.bind("<Next>", lambda event: self._move_cursor(self.page_size))
+
+    def __len__(self):
+        return len(self.model)
+
+    @property
+    def page_size(self):
+        return max(len(self._items), 1)
+
+    # Configuração das colunas (mesma assinatura do Treeview)
+    def heading(self, column, **options):
+        if "text" in options:
+            self._headings[column] = options["text"]
+        if self.sortable and "command" not in options:
+            options["command"] = lambda c=column: self.sort_by(c)
+        return self.tree.heading(column, **options)
+
+    def column(self, column, **options):
+        return self.tree.column(column, **options)
+
+    # Dados
+    def set_rows(self, rows):
+        """Substitui todas as linhas da tabela"""
+        self.model.clear()
+        self.selected.clear()
+        self.offset = 0
+        self.cursor = None
+        self.append_rows(rows)
+
+    def append_rows(self, rows):
+        """Acrescenta um lote de linhas (por exemplo, um lote de fetchmany)"""
+        self.model.append(rows)
+        self._render()
+
+    def clear(self):
+        self.set_rows([])
+
+    def set_filter(self, predicate):
+        """Exibe apenas as linhas para as quais predicate(row) é verdadeiro (None remove o filtro)"""
+        self.model.set_filter(predicate)
+        self.selected.clear()
+        self.offset = 0
+        self.cursor = None
+        self._render()
+
+    def sort_by(self, column, reverse=None):
+        """Ordena pela coluna; sem reverse, alterna a direção a cada clique"""
+        index = self.source_indexes[self.columns.index(column)]
+        if reverse is None:
+            state = self.model.sort_state
+            reverse = bool(state and state[0] == index and not state[1])
+        self.model.sort(index, reverse)
+        self.cursor = None
+        for name in self.columns:
+            arrow = (" ▼" if reverse else " ▲") if name == column else ""
+            self.tree.heading(name, text=self._headings[name] + arrow)
+        self._render()
+
+    def selected_rows(self):
+        """Linhas selecionadas (como vieram do banco), na ordem de chegada"""
+        return [self.model.rows[i] for i in sorted(self.selected)]
+
+    def view_rows(self):
+        """Linhas exibidas, na ordem atual, como vieram do banco"""
+        return self.model.view_rows()
+
+    def display_rows(self):
+        """Linhas exibidas, na ordem atual, com os valores formatados"""
+        return (self._format(row) for row in self.model.view_rows())
+
+    def headings(self):
+        return [self._headings[column] for column in self.columns]
+
+    # Janela visível
+    def _format(self, row):
+        return tuple(self.formatter(row)) if self.formatter else tuple(row)
+
+    def _resize(self, count):
+        count = max(count, 1)
+        while len(self._items) < count:
+            item = self.tree.insert("", "end", values=())
+            self.tree.detach(item)
+            self._items.append(item)
+        while len(self._items) > count:
+            self.tree.delete(self._items.pop())
+        self._attached = min(self._attached, count)
+
+    def _on_configure(self, event):
+        self._tree_height = event.height
+        self._fit()
+
+    def _fit(self):
+        """Ajusta a quantidade de itens à altura disponível para o Treeview"""
+        if not self._attached or self._tree_height is None:
+            return
+        bbox = self.tree.bbox(self._items[0])
+        if not bbox:
+            return
+        top, row_height = bbox[1], bbox[3]
+        count = max((self._tree_height - top) // max(row_height, 1), 1)
+        if count != len(self._items):
+            self._resize(count)
+            self._render()
+
+    def _render(self):
+        was_empty = not self._attached
+        total = len(self.model)
+        visible = min(len(self._items), total)
+        self.offset = max(0, min(self.offset, total - len(self._items)))
+
+        for index, item in enumerate(self._items):
+            if index < visible:
+                row = self.model.row(self.offset + index)
+                self.tree.item(item, values=self._format(row))
+                if index >= self._attached:
+                    self.tree.move(item, "", index)
+            elif index < self._attached:
+                self.tree.detach(item)
+        self._attached = visible
+
+        selection = [
+            item for index, item in enumerate(self._items[:visible])
+            if self.model.index(self.offset + index) in self.selected
+        ]
+        self._rendered_selection = tuple(selection)
+        self.tree.selection_set(selection)
+        if self.cursor is not None and self.offset <= self.cursor < self.offset + visible:
+            self.tree.focus(self._items[self.cursor - self.offset])
+
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + visible) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+        if was_empty and visible:
+            # Primeira linha exibida: já é possível medir a altura das linhas
+            self.after_idle(self._fit)
+
+    def _scroll_by(self, rows):
+        self.offset += rows
+        self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.model))
+            self._render()
+        elif action == "scroll":
+            step = self.page_size if unit == "pages" else 1
+            self._scroll_by(int(amount) * step)
+
+    def _on_wheel(self, event):
+        return self._scroll_by(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS)
+
+    def _move_cursor(self, rows):
+        total = len(self.model)
+        if not total:
+            return "break"
+        current = self.offset if self.cursor is None else self.cursor
+        self.cursor = max(0, min(current + rows, total - 1))
+        if self.cursor < self.offset:
+            self.offset = self.cursor
+        elif self.cursor >= self.offset + self.page_size:
+            self.offset = self.cursor - self.page_size + 1
+        if self.selectmode != "none":
+            self.selected = {self.model.index(self.cursor)}
+        self._render()
+        return "break"
+
+    # Seleção: guardada por índice no modelo, independente dos itens reaproveitados
+    def _on_press(self, event):
+        self._additive = self.selectmode == "extended" and bool(event.state & _ADDITIVE_STATE)
+
+    def _on_select(self, event):
+        current = self.tree.selection()
+        if set(current) == set(self._rendered_selection):
+            # Evento gerado pelo próprio _render
+            return
+        positions = {item: self.offset + index for index, item in enumerate(self._items[:self._attached])}
+        if self._additive:
+            self.selected -= {self.model.index(p) for p in positions.values()}
+        else:
+            self.selected = set()
+        self.selected |= {self.model.index(positions[item]) for item in current if item in positions}
+        self._rendered_selection = tuple(current)
+
+        focus = self.tree.focus()
+        if focus in positions:
+            self.cursor = positions[focus]
+
+
+class PageBar(ttk.Frame):
+    """
+    Navegação entre páginas de uma KeysetQuery.
+
+    fetch(connection, *args, after, limit) roda no DatabaseExecutor e retorna
+    uma db_utils.Page; on_page(rows) recebe as linhas da página exibida.
+    Assim que uma página é exibida, a seguinte é buscada em segundo plano,
+    então "Próxima" normalmente não espera pelo banco.
+    """
+
+    def __init__(self, parent, executor, fetch, on_page, page_size=PAGE_SIZE, on_error=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.fetch = fetch
+        self.on_page = on_page
+        self.on_error = on_error or (
+            lambda e: messagebox.showerror("Erro", f"Erro ao carregar página: {str(e)}")
+        )
+        self.args = ()
+        self.page_size = page_size
+        # keys[i] é a chave após a qual começa a página i (None = primeira)
+        self.keys = [None]
+        self.index = 0
+        self.pages = {}
+        self._pending = set()
+        self._wanted = None
+        self._generation = 0
+
+        self.previous_button = ttk.Button(self, text="◀ Anterior", command=self.previous_page)
+        self.previous_button.pack(side="left", padx=5)
+        self.page_label = ttk.Label(self, text="Página 1")
+        self.page_label.pack(side="left", padx=5)
+        self.next_button = ttk.Button(self, text="Próxima ▶", command=self.next_page)
+        self.next_button.pack(side="left", padx=5)
+
+        ttk.Label(self, text="Por página:").pack(side="left", padx=(15, 5))
+        self.size_combo = ttk.Combobox(
+            self, values=sorted(set(PAGE_SIZES) | {page_size}), width=6, state="readonly"
+        )
+        self.size_combo.set(page_size)
+        self.size_combo.bind("<<ComboboxSelected>>", self._on_size_selected)
+        self.size_combo.pack(side="left")
+        self._update_controls()
+
+    def reload(self, *args):
+        """Descarta as páginas carregadas e exibe a primeira (args são repassados a fetch)"""
+        self.args = args
+        self._generation += 1
+        self.keys = [None]
+        self.index = 0
+        self.pages = {}
+        self._pending = set()
+        self._show(0)
+
+    def show_current(self):
+        """Exibe de novo a página atual (da memória, se ela ainda estiver carregada)"""
+        self._show(self.index)
+
+    def next_page(self):
+        if self.index + 1 < len(self.keys):
+            self._show(self.index + 1)
+
+    def previous_page(self):
+        if self.index > 0:
+            self._show(self.index - 1)
+
+    def _on_size_selected(self, event):
+        self.page_size = int(self.size_combo.get())
+        self.reload(*self.args)
+
+    def _show(self, index):
+        self._wanted = index
+        if index in self.pages:
+            self._display(index)
+        else:
+            self._request(index)
+        self._update_controls()
+
+    def _request(self, index):
+        if index in self._pending:
+            return
+        self._pending.add(index)
+        generation = self._generation
+        self.executor.submit(
+            self.fetch,
+            *self.args,
+            self.keys[index],
+            self.page_size,
+            on_success=lambda page: self._loaded(generation, index, page),
+            on_error=lambda e: self._failed(generation, index, e),
+            widget=self,
+        )
+
+    def _loaded(self, generation, index, page):
+        if generation != self._generation:
+            # Resultado de uma carga anterior ao último reload
+            return
+        self._pending.discard(index)
+        self.pages[index] = page
+        if page.next_key is not None and len(self.keys) == index + 1:
+            self.keys.append(page.next_key)
+        if self._wanted == index:
+            self._display(index)
+        self._update_controls()
+
+    def _failed(self, generation, index, error):
+        if generation != self._generation:
+            return
+        self._pending.discard(index)
+        if self._wanted == index:
+            self.on_error(error)
+
+    def _display(self, index):
+        self.index = index
+        # Mantém em memória apenas a página atual e as vizinhas
+        self.pages = {i: page for i, page in self.pages.items() if abs(i - index) <= 1}
+        page = self.pages[index]
+        self.on_page(page.rows)
+        self._update_controls()
+
+        # Pré-carrega a próxima página enquanto o usuário lê a atual
+        if page.next_key is not None and index + 1 not in self.pages:
+            self._request(index + 1)
+
+    def _update_controls(self):
+        self.page_label.config(text=f"Página {self.index + 1}")
+        self.previous_button.state(["!disabled" if self.index > 0 else "disabled"])
+        has_next = self.index + 1 < len(self.keys)
+        self.next_button.state(["!disabled" if has_next else "disabled"])